@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Headless batch plotting for simulation data.
+
+Renders the same plots as the Viewer tab of the GUI without opening a
+window, so figures for many runs can be produced from the command line.
+Runs (or groups of runs) are loaded and rendered in parallel across
+processes.
+
+
+Example
+-------
+    One PNG per run of the X/Y missile position, using four processes:
+
+        $ python batch_plot.py ../runs -x "Missile Position - East" \\
+              -y "Missile Position - North" --group-size 1 --workers 4
+
+    A single 3D figure of every run, saved as SVG and PDF:
+
+        $ python batch_plot.py ../runs -x "Missile Position - East" \\
+              -y "Missile Position - North" -z "Missile Position - Up" \\
+              --formats svg pdf
+
+    Every run rendered with a preset saved from the GUI:
+
+        $ python batch_plot.py ../runs --preset my_preset.json
+"""
+
+# Imports and settings for rendering off-screen
+# The backend must be chosen before the plotting code imports pyplot
+import matplotlib
+matplotlib.use("Agg")
+
+# File Imports
+import extra_functions as ef
+import plotting_functions as plf
+
+# Module-Level Imports
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def parseArgs(argv: list = None) -> argparse.Namespace:
+    """
+    Reads the command-line arguments.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The arguments to parse. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments
+
+    """
+    parser = argparse.ArgumentParser(
+                description='Render plots of simulation runs without the GUI')
+
+    # Data selection
+    parser.add_argument('topDir', help='Directory containing the run(s)')
+    parser.add_argument('--preset', default=None,
+                        help='Plot preset (JSON) saved from the GUI. Any '
+                             'other options given are ignored.')
+    parser.add_argument('-x', '--x-col', default='',
+                        help='Column to plot on the X axis')
+    parser.add_argument('-y', '--y-col', default='',
+                        help='Column to plot on the Y axis')
+    parser.add_argument('-z', '--z-col', default='',
+                        help='Column to plot on the Z axis (3D plot)')
+    parser.add_argument('--runs', type=int, nargs='+', default=None,
+                        help='Only plot these run numbers')
+    parser.add_argument('--group-size', type=int, default=0,
+                        help='Runs per figure (0 puts all runs in one figure)')
+    parser.add_argument('--run', type=int, default=None,
+                        help='Highlight a single run within each figure')
+    parser.add_argument('--fade', action='store_true',
+                        help='With --run, show the other runs faded out')
+    parser.add_argument('--no-assets', action='store_true',
+                        help='Do not draw fixed assets')
+
+    # Style options
+    parser.add_argument('--style', choices=['line', 'scatter'],
+                        default='line', help='Plot style')
+    parser.add_argument('--line-style', default='-',
+                        help='Line style for line plots')
+    parser.add_argument('--marker', default='o',
+                        help='Marker for scatter plots')
+    parser.add_argument('--color', default=None,
+                        help='Single color for every trajectory '
+                             '(auto color if not given)')
+    parser.add_argument('--no-legend', action='store_true',
+                        help='Do not show the legend')
+    parser.add_argument('--legend-loc', choices=['Best', 'Outside Right'],
+                        default='Best', help='Legend location')
+    parser.add_argument('--no-labels', action='store_true',
+                        help='Do not label the axes')
+    parser.add_argument('--no-grid', action='store_true',
+                        help='Do not show major gridlines')
+    parser.add_argument('--minor-grid', action='store_true',
+                        help='Show minor gridlines')
+    for axis in ('x', 'y', 'z'):
+        parser.add_argument(f'--{axis}lim', type=float, nargs=2,
+                            default=(None, None), metavar=('MIN', 'MAX'),
+                            help=f'Limits for the {axis.upper()} axis')
+    parser.add_argument('--title', default='', help='Plot title')
+    parser.add_argument('--title-size', type=int, default=15,
+                        help='Title font size')
+    parser.add_argument('--title-color', default='#000000',
+                        help='Title color')
+    parser.add_argument('--bold', action='store_true', help='Bold title')
+    parser.add_argument('--italic', action='store_true', help='Italic title')
+    parser.add_argument('--xkcd', action='store_true',
+                        help='Render in xkcd style')
+
+    # Output options
+    parser.add_argument('-o', '--out', default='plots',
+                        help='Directory to write the figures to')
+    parser.add_argument('--formats', nargs='+', default=['png'],
+                        choices=['png', 'svg', 'pdf'],
+                        help='File format(s) for each figure')
+    parser.add_argument('--size', type=float, nargs=2, default=(8, 6),
+                        metavar=('WIDTH', 'HEIGHT'),
+                        help='Figure size in inches')
+    parser.add_argument('--dpi', type=int, default=150,
+                        help='Resolution for raster formats')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of processes used to render')
+
+    return parser.parse_args(argv)
+
+
+def plotOptions(args: argparse.Namespace) -> plf.PlotSpec:
+    """
+    Converts the command-line arguments (or the preset they name) into
+    a plot configuration.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed arguments
+
+    Returns
+    -------
+    PlotSpec
+        The plot configuration
+
+    """
+    if args.preset is not None:
+        return plf.PlotSpec.load(args.preset)
+
+    return plf.PlotSpec(
+        xCol=args.x_col,
+        yCol=args.y_col,
+        zCol=args.z_col,
+        plotStyle=args.style,
+        lineStyle=args.line_style,
+        scatterStyle=args.marker,
+        autoColor=args.color is None,
+        plotColor=args.color or plf.PlotSpec().plotColor,
+        showAllRuns=args.run is None,
+        transparentRuns=args.fade,
+        run=args.run,
+        showLegend=not args.no_legend,
+        legendLoc=args.legend_loc,
+        showXLabel=not args.no_labels,
+        showYLabel=not args.no_labels,
+        showZLabel=not args.no_labels,
+        gridMajor=not args.no_grid,
+        gridMinor=args.minor_grid and not args.xkcd,
+        limits=(tuple(args.xlim), tuple(args.ylim), tuple(args.zlim)),
+        title=args.title,
+        titleSize=args.title_size,
+        titleColor=args.title_color,
+        titleBold=args.bold,
+        titleItalic=args.italic,
+        showAssets=not args.no_assets,
+        xkcd=args.xkcd, )
+
+
+def runGroups(missileFiles: list, groupSize: int) -> list:
+    """
+    Splits the missile files into the groups plotted on each figure.
+
+    Parameters
+    ----------
+    missileFiles : list
+        The path to each missile file
+    groupSize : int
+        The number of files per group. 0 puts every file in one group.
+
+    Returns
+    -------
+    list
+        Pairs of (name, files) for each group
+
+    """
+    def runName(path):
+        return os.path.basename(os.path.dirname(path))
+
+    if groupSize <= 0:
+        return [('all_runs', missileFiles)]
+
+    groups = []
+    for start in range(0, len(missileFiles), groupSize):
+        files = missileFiles[start:start + groupSize]
+        name = runName(files[0])
+        if len(files) > 1:
+            name += f'_to_{runName(files[-1])}'
+        groups.append((name, files))
+    return groups
+
+
+def renderGroup(job: tuple) -> list:
+    """
+    Loads a group of runs and saves its figure in each requested format.
+    Runs in a worker process.
+
+    Parameters
+    ----------
+    job : tuple
+        (name, missileFiles, spec, runs, outDir, formats, figsize, dpi)
+
+    Returns
+    -------
+    list
+        The paths of the files written (empty if there was no data)
+
+    """
+    name, missileFiles, spec, runs, outDir, formats, figsize, dpi = job
+
+    # Loading the data the same way the GUI does
+    missileDF = ef.loadMissileData(missileFiles)
+    assets = ef.assetsDF(ef.loadAssetData(missileFiles))
+    if runs is not None:
+        missileDF = missileDF[missileDF.RunNumber.isin(runs)]
+        assets = assets[assets.run.isin(runs)]
+    if len(missileDF) == 0 or plf.plotDimensions(spec) == 0:
+        return []
+
+    figure, _ = plf.plotFigure(missileDF, assets, spec, figsize=figsize)
+
+    written = []
+    for fmt in formats:
+        outFile = os.path.join(outDir, f'{name}.{fmt}')
+        figure.savefig(outFile, dpi=dpi, bbox_inches='tight')
+        written.append(outFile)
+    return written
+
+
+def main(argv: list = None) -> int:
+    """
+    Renders every requested figure.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command-line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    int
+        The exit code
+
+    """
+    args = parseArgs(argv)
+    try:
+        spec = plotOptions(args)
+    except (OSError, ValueError, TypeError) as err:
+        print(f'Could not read preset {args.preset}: {err}', file=sys.stderr)
+        return 1
+
+    if not os.path.isdir(args.topDir):
+        print(f'{args.topDir} is not a valid directory', file=sys.stderr)
+        return 1
+    if plf.plotDimensions(spec) == 0:
+        print('Plot needs distinct X and Y columns', file=sys.stderr)
+        return 1
+
+    startTime = time.time()
+    missileFiles = sorted(ef.allMissileFiles(ef.dirTree(args.topDir)))
+    if len(missileFiles) == 0:
+        print(f'No run files found in {args.topDir}', file=sys.stderr)
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [(name, files, spec, args.runs, args.out, args.formats,
+             tuple(args.size), args.dpi)
+            for name, files in runGroups(missileFiles, args.group_size)]
+
+    if len(jobs) > 1 and args.workers != 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(renderGroup, jobs))
+    else:
+        results = [renderGroup(job) for job in jobs]
+
+    for written in results:
+        for outFile in written:
+            print(outFile)
+
+    N = sum(len(written) > 0 for written in results)
+    totalTime = time.time() - startTime
+    print(f'Rendered {N} figure' + 's' * (N != 1) + f' in {totalTime:.1f}s')
+    return 0
+
+
+# To prevent this running automatically if imported
+if __name__ == "__main__":
+    sys.exit(main())
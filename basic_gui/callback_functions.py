@@ -1,13 +1,24 @@
 # -*- coding: utf-8 -*-
 
+import catalog_functions as cat
 import extra_functions as ef
+import filter_functions as flt
+import memory_functions as mem
+import plotting_functions as plf
+import profile_functions as pf
+import proximity_functions as prox
+import store_functions as stf
+import summary_functions as sf
+import timing_functions as tm
 
 import numpy as np
 import os
+import sqlite3
 import time
 import tkinter as tk
 from tkinter import messagebox as mb
 from tkinter import filedialog
+from tkinter import ttk
 import tkinter.colorchooser as tkColorChooser
 
 
@@ -305,42 +316,6 @@ def setRunOptions(gui, event=None) -> None:
         gui.runChoice.set(newval)
 
 
-def setVals(gui) -> None:
-    """
-    Checks whether user has selected X, Y, or Z columns from the
-    ComboBox (drop-down) and sets the x, y, and z vectors from
-    those choices.
-
-    If both X and Y are not selected, nothing happens.
-    If X and Y are selected but not Z, then a 2D plot will be rendered.
-    If X, Y, and Z are selected, a 3D plot will be rendered.
-
-    Returns
-    -------
-    None
-
-    """
-
-    # Guarantees dimensions are up to date
-    setDimensions(gui)
-
-    # If no dimensions, set values to nothing
-    if gui.dimensions == 0:
-        gui.x, gui.y, gui.z = [], [], []
-
-    # If only 2D plot, only set x and y
-    elif gui.dimensions == 2:
-        gui.x = gui.missileDF[gui.xCol.get()].values
-        gui.y = gui.missileDF[gui.yCol.get()].values
-
-    # If 3D plot, set x, y, and z
-    elif gui.dimensions == 3:
-        gui.x = gui.missileDF[gui.xCol.get()].values
-        gui.y = gui.missileDF[gui.yCol.get()].values
-        gui.z = gui.missileDF[gui.zCol.get()].values
-    return
-
-
 def getTopDir(gui) -> None:
     """
     Opens a file browswer for the run files. Once selected,
@@ -394,7 +369,60 @@ def loadFromTopDir(gui) -> None:
 
     # This should already be true, but setting just in case
     gui.topDir = os.path.abspath(gui.topDir)
-    loadMissileFiles(gui)
+    capture = startProfile(gui, 'load')
+    if capture is None:
+        loadMissileFiles(gui)
+        return
+    with capture.profiled():
+        loadMissileFiles(gui)
+    finishProfile(gui, capture)
+
+
+def startProfile(gui, label: str):
+    """
+    Starts profiling, if the user asked for the next load or plot to be
+    profiled. The request is used up, so only one operation is profiled.
+
+    Parameters
+    ----------
+    label : str
+        What is about to be profiled, 'load' or 'plot'
+
+    Returns
+    -------
+    ProfileCapture
+        The capture (see profile_functions), or None if profiling was
+        not asked for
+
+    """
+    if not gui.profileNext.get():
+        return None
+    gui.profileNext.set(False)
+    return pf.ProfileCapture(label)
+
+
+def finishProfile(gui, capture) -> None:
+    """
+    Writes the reports of a profile to the profiles directory of the
+    load cache and shows the slowest functions and the report files in
+    the status bar.
+
+    Parameters
+    ----------
+    capture : ProfileCapture
+        The capture (see profile_functions)
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        report = capture.finish(ef.cacheDir(gui.topDir, 'profiles'))
+    except OSError as err:
+        gui.status.set(f'Could not save the profile: {err}')
+        return
+    gui.status.set(report.summary)
 
 
 def loadMissileFiles(gui, write_csv=True) -> str:
@@ -410,34 +438,146 @@ def loadMissileFiles(gui, write_csv=True) -> str:
     Returns
     -------
     str
-        The absolute path to the missile file
+        The absolute path to the missile file, or None if the load was
+        refused for not fitting in the memory budget
 
     """
     gui.status.set(f'Searching {gui.topDir} for files')  # updating user
 
-    # Looking for files to read in directory
-    tree = ef.dirTree(gui.topDir)
-    missileFiles = ef.allMissileFiles(tree)
-    assetDirs = [os.path.abspath(os.path.join(x, os.pardir))
-                 for x in missileFiles]
-    allAssets = ef.allAssets(assetDirs,)
-    gui.assets = ef.assetsDF(allAssets, unique=False)
-
     # Counting time for process to occur
     startTime = time.time()
 
-    # Making massive DataFrame of all the missile files in tree
+    # Looking for files to read in directory
+    with tm.timer('load.walk'):
+        tree = ef.dirTree(gui.topDir)
+        missileFiles = ef.allMissileFiles(tree)
+
+    # A selection of runs only reads the files the catalog says hold them
+    try:
+        runs = cat.parseRuns(gui.loadRuns.get())
+    except ValueError as err:
+        mb.showerror('Invalid Runs', f'Runs to load: {err}')
+        return None
+    catalog = openCatalog(gui)
+    catalogNote = None if catalog is not None else 'no run catalog'
+    try:
+        if catalog is not None:
+            catalog.prune(missileFiles)
+            if runs is not None:
+                missileFiles = catalog.filesForRuns(missileFiles, runs)
+    except sqlite3.Error as err:
+        catalogNote = f'run catalog not used: {err}'
+        gui.status.set(f'Run catalog not used, reading every file: {err}')
+        catalog.close()
+        catalog = None
+    if len(missileFiles) == 0:
+        gui.status.set('No files hold the runs selected')
+        if catalog is not None:
+            catalog.close()
+        return None
+
+    # Data loaded before is mapped from its store rather than read again
+    version = ef.dataVersion(missileFiles, runs=runs)
+    storeDir = ef.cacheDir(gui.topDir, 'store')
+    stored = stf.hasStore(storeDir, version)
+
+    # Nothing is replaced if the new data would not fit in memory (mapped
+    # data is held by the page cache, not counted against the budget)
+    if not stored and not checkLoadBudget(gui, missileFiles):
+        if catalog is not None:
+            catalog.close()
+        return None
+    gui.renderPointLimit = None
+
+    # The editor shows the runs and columns of the data loaded
+    gui.buildViewer()
+
+    assetErrors = []
+    with tm.timer('load.assets'):
+        gui.assetTable = ef.loadAssetData(missileFiles, errors=assetErrors)
+        gui.assets = ef.assetsDF(gui.assetTable, unique=False)
+        gui.assetPlotCache.clear()
+        # Proximity is per run, so every run keeps its own assets here
+        # (uniqueAssets would merge identical assets of different runs)
+        gui.assetIndex = prox.AssetIndex(ef.assetsDF(gui.assetTable,
+                                                     unique=True))
+
+    # Malformed asset lines are skipped, so let the user know where
+    gui.assetErrors = assetErrors
+    showAssetErrors(gui)
+
     N = len(missileFiles)
-    gui.status.set(f'Loading {N} file' + 's' * (N > 1))
-    gui.missileDF = ef.combinedMissleDF(missileFiles)
-    gui.missileDF.rename(columns=ef.dictMap(), inplace=True)
-    gui.missileDF.sort_values(by=['Time', 'RunNumber'], inplace=True)
+    opened = None
+    if stored:
+        with tm.timer('load.store'):
+            opened = stf.openStore(storeDir, version)
+    if opened is not None:
+        gui.missileDF, gui.trajectoryIndex = opened
+        if catalog is not None:
+            catalog.close()
+    else:
+        # Making massive DataFrame of all the missile files in tree
+        gui.status.set(f'Loading {N} file' + 's' * (N > 1))
+        gui.missileDF = ef.loadMissileData(missileFiles)
+
+        # Every file read is cataloged, including runs not selected
+        if catalog is not None:
+            with tm.timer('load.catalog'):
+                try:
+                    catalog.record(missileFiles, gui.missileDF, gui.assets)
+                except sqlite3.Error as err:
+                    catalogNote = f'run catalog not updated: {err}'
+                    gui.status.set(f'Run catalog not updated: {err}')
+            catalog.close()
+        if runs is not None and 'RunNumber' in gui.missileDF.columns:
+            keep = gui.missileDF.RunNumber.isin(runs).to_numpy()
+            gui.missileDF = gui.missileDF[keep].reset_index(drop=True)
+
+        with tm.timer('load.index'):
+            gui.trajectoryIndex = plf.TrajectoryIndex(gui.missileDF)
+
+        # The data read is swapped for a mapping of its new store, so
+        # plots select from the page cache instead of a private copy
+        with tm.timer('load.store'):
+            mapToStore(gui, storeDir, version)
+
+    # Plots of the previous data can no longer be shown
+    gui.dataVersion = version
+    gui.figureCache.clear()
+
+    # The run summary is only computed when the data has changed
+    summaryDir = ef.cacheDir(gui.topDir)
+    gui.runSummary = sf.loadSummary(summaryDir, gui.dataVersion,
+                                    gui.trajectoryIndex)
+    if gui.runSummary is None:
+        gui.status.set('Summarizing runs')
+        with tm.timer('load.summary'):
+            gui.runSummary = sf.trajectorySummary(gui.missileDF,
+                                                  gui.trajectoryIndex,
+                                                  gui.assetIndex)
+        sf.saveSummary(gui.runSummary, summaryDir, gui.dataVersion)
+    gui.trajectoryFilter = flt.TrajectoryFilter(gui.missileDF,
+                                                gui.trajectoryIndex,
+                                                summary=gui.runSummary)
 
     # Updating user on the operation and its total time
-    totalTime = int(time.time() - startTime)
-    newStatus = f'Loaded {N} file' + 's' * (N > 1) + f' in {totalTime}s'
+    totalTime = time.time() - startTime
+    tm.timings.add('load.total', totalTime)
+    newStatus = (f'Loaded {N} file' + 's' * (N > 1) +
+                 f' in {totalTime:.1f}s')
+    if opened is not None:
+        newStatus += ' (from the trajectory store)'
+    if runs is not None:
+        newStatus += f' ({len(runs)} run(s) selected)'
+    if len(assetErrors) > 0:
+        newStatus += (f' ({len(assetErrors)} asset line(s) skipped, '
+                      'listed on the Diagnostics tab)')
+    if catalogNote is not None:
+        newStatus += f' ({catalogNote})'
     gui.status.set(newStatus)
 
+    setTimeRange(gui)
+
     # Determining available runs based upon unique IDs
     if 'RunNumber' in gui.missileDF.columns:
         gui.availableRuns = gui.missileDF.RunNumber.unique()
@@ -453,6 +593,7 @@ def loadMissileFiles(gui, write_csv=True) -> str:
     gui.xCB['values'] = gui.plotCols
     gui.yCB['values'] = gui.plotCols
     gui.zCB['values'] = gui.plotCols
+    enforceMemoryBudget(gui)
 
     outFile = os.path.join(gui.topDir, 'out.csv')
     if write_csv:
@@ -460,6 +601,350 @@ def loadMissileFiles(gui, write_csv=True) -> str:
     return outFile
 
 
+def openCatalog(gui):
+    """
+    Opens the run catalog of the directory being loaded. The catalog
+    only speeds loading up, so failing to open it is not an error.
+
+    Returns
+    -------
+    RunCatalog
+        The catalog (see catalog_functions), or None if it could not
+        be opened
+
+    """
+    try:
+        return cat.RunCatalog(gui.topDir)
+    except (sqlite3.Error, OSError) as err:
+        gui.status.set(f'Could not open the run catalog: {err}')
+        return None
+
+
+def showCatalog(gui) -> None:
+    """
+    Lists every run in the catalog of the chosen directory in a new
+    window, without reading any data files. Double-clicking a row adds
+    that run to the runs to load.
+
+    Returns
+    -------
+    None
+
+    """
+    if not os.path.isfile(cat.catalogPath(gui.topDir)):
+        gui.status.set('No run catalog yet: load the directory once')
+        return
+    catalog = openCatalog(gui)
+    if catalog is None:
+        return
+    try:
+        table = catalog.runs()
+    except sqlite3.Error as err:
+        gui.status.set(f'Could not read the run catalog: {err}')
+        return
+    finally:
+        catalog.close()
+    if len(table) == 0:
+        gui.status.set('The run catalog is empty')
+        return
+
+    tree = showTable(gui, 'Run Catalog', table)
+
+    def addRun(event: tk.Event) -> None:
+        item = tree.identify_row(event.y)
+        if not item:
+            return
+        run = tree.set(item, 'RunNumber')
+        current = gui.loadRuns.get().strip()
+        gui.loadRuns.set(f'{current}, {run}' if current else run)
+
+    tree.bind('<Double-1>', addRun)
+
+
+def setTimeRange(gui, timeRange: tuple = (None, None)) -> None:
+    """
+    Spans the time range sliders over the times in the loaded data and
+    moves them to a new range.
+
+    Parameters
+    ----------
+    timeRange : tuple, optional
+        The (start, end) to show, where None puts a slider at that end
+        of the data. The default is (None, None).
+
+    Returns
+    -------
+    None
+
+    """
+    times = gui.trajectoryIndex.times
+    if times is not None and np.isfinite(times).any():
+        gui.timeBounds = (float(np.nanmin(times)), float(np.nanmax(times)))
+    else:
+        gui.timeBounds = (0.0, 0.0)
+
+    # Without rounding, a slider at the end of its scale stays there
+    first, last = gui.timeBounds
+    for scale in (gui.timeStartScale, gui.timeEndScale):
+        scale.configure(from_=first, to=last, resolution=0)
+    start, end = timeRange
+    gui.timeStart.set(first if start is None else start)
+    gui.timeEnd.set(last if end is None else end)
+
+
+def showClosestApproach(gui) -> None:
+    """
+    Computes the closest approach of every loaded trajectory to every
+    asset and displays the results, nearest first, in a new window.
+
+    Returns
+    -------
+    None
+
+    """
+    if len(gui.missileDF) == 0 or 'RunNumber' not in gui.missileDF.columns:
+        gui.status.set('Load data to compute closest approaches')
+        return
+
+    startTime = time.time()
+    results = gui.assetIndex.closestApproach(gui.missileDF,
+                                             sameRun=gui.proxSameRun.get(),
+                                             index=gui.trajectoryIndex)
+    totalTime = time.time() - startTime
+    gui.status.set(f'Closest approach computed in {totalTime:.1f}s')
+
+    showTable(gui, 'Closest Approach', results)
+
+
+def showRunSummary(gui) -> None:
+    """
+    Displays the summary statistics of every loaded trajectory in a new
+    window. Double-clicking a row plots that run alone.
+
+    Returns
+    -------
+    None
+
+    """
+    if len(gui.runSummary) == 0:
+        gui.status.set('Load data to summarize runs')
+        return
+
+    tree = showTable(gui, 'Run Summary', gui.runSummary)
+
+    def selectRun(event: tk.Event) -> None:
+        item = tree.identify_row(event.y)
+        if not item:
+            return
+        run = int(tree.set(item, 'RunNumber'))
+        if run in gui.availableRuns:
+            gui.showAllRuns.set(False)
+            gui.run.set(run)
+            setRunOptions(gui)
+            gui.startPlot(1)
+
+    tree.bind('<Double-1>', selectRun)
+
+
+def showTable(gui, title: str, table) -> ttk.Treeview:
+    """
+    Displays a DataFrame in a new window as a table that can be sorted
+    by clicking on its column headings.
+
+    Parameters
+    ----------
+    title : str
+        The title of the window
+    table : pd.DataFrame
+        The rows to display
+
+    Returns
+    -------
+    ttk.Treeview
+        The table, so callers can bind to its events
+
+    """
+    window = tk.Toplevel(gui)
+    window.title(title)
+    cols = list(table.columns)
+    tree = ttk.Treeview(window, columns=cols, show='headings')
+    for col in cols:
+        tree.heading(col, text=col,
+                     command=lambda c=col: sortTreeview(tree, c, False))
+        tree.column(col, width=90, anchor=tk.CENTER)
+    for row in table.itertuples(index=False):
+        vals = [f'{v:.1f}' if isinstance(v, float) else v for v in row]
+        tree.insert('', tk.END, values=vals)
+
+    scroll = ttk.Scrollbar(window, orient=tk.VERTICAL, command=tree.yview)
+    tree.configure(yscrollcommand=scroll.set)
+    scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    return tree
+
+
+def sortTreeview(tree, col: str, descending: bool) -> None:
+    """
+    Sorts the rows of a Treeview by the values in a column. Clicking the
+    same heading again reverses the order.
+
+    Parameters
+    ----------
+    tree : ttk.Treeview
+        The Treeview to sort
+    col : str
+        The column to sort by
+    descending : bool
+        Whether to sort in descending order
+
+    Returns
+    -------
+    None
+
+    """
+    rows = [(tree.set(item, col), item) for item in tree.get_children('')]
+
+    # Numeric columns should sort by value, not alphabetically
+    try:
+        rows.sort(key=lambda r: float(r[0]), reverse=descending)
+    except ValueError:
+        rows.sort(reverse=descending)
+
+    for k, (_, item) in enumerate(rows):
+        tree.move(item, '', k)
+    tree.heading(col, command=lambda: sortTreeview(tree, col, not descending))
+
+
+def applyPlotSpec(gui, spec: plf.PlotSpec) -> None:
+    """
+    Sets every plot option in the editor from a PlotSpec and renders
+    the plot once. Columns or runs that are not in the loaded data
+    are left unselected.
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The plot configuration to show
+
+    Returns
+    -------
+    None
+
+    """
+    # Fields to plot
+    for axis in ('x', 'y', 'z'):
+        col = getattr(spec, f'{axis}Col')
+        getattr(gui, f'{axis}Col').set(col if col in gui.plotCols else '')
+
+    # Limits
+    for axis, (lo, hi) in zip(('x', 'y', 'z'), spec.limits):
+        getattr(gui, f'{axis}Limits').set(lo is not None or hi is not None)
+        for entry, val in (('Min', lo), ('Max', hi)):
+            widget = getattr(gui, f'{axis}{entry}Entry')
+            widget.delete(0, tk.END)
+            widget.insert(0, entry if val is None else str(val))
+            if getattr(gui, f'{axis}Limits').get():
+                widget.grid(row=getattr(gui, f'{axis}LimitsRow'),
+                            column=2 if entry == 'Min' else 3)
+            else:
+                widget.grid_remove()
+
+    # Title
+    gui.titleText.set(spec.title)
+    gui.titleSize.set(str(spec.titleSize))
+    gui.titleColorHex.set(spec.titleColor)
+    gui.titleColorRGB = ef.hex2rgb(spec.titleColor)
+    gui.boldTitleOn, gui.itTitleOn = spec.titleBold, spec.titleItalic
+    gui.boldTitleButton.config(
+                        relief=tk.SUNKEN if gui.boldTitleOn else tk.FLAT)
+    gui.itTitleButton.config(
+                        relief=tk.SUNKEN if gui.itTitleOn else tk.FLAT)
+
+    # Plot style
+    gui.plotStyle.set(spec.plotStyle)
+    gui.lineStyle.set(spec.lineStyle)
+    gui.scatterStyle.set(spec.scatterStyle)
+    isLine = spec.plotStyle == 'line'
+    gui.lineStyleCB.config(state='readonly' if isLine else 'disabled')
+    gui.scatterStyleCB.config(state='disabled' if isLine else 'readonly')
+    gui.showLegend.set(spec.showLegend)
+    gui.legendLoc.set(spec.legendLoc)
+    gui.legendLocCB['state'] = 'readonly' if spec.showLegend else 'disabled'
+    gui.autoColor.set(spec.autoColor)
+    gui.plotColorHex.set(spec.plotColor)
+    colorState = 'disabled' if spec.autoColor else 'normal'
+    gui.plotColorEntry['state'] = colorState
+    gui.plotColorButton['state'] = colorState
+
+    # Additional options
+    gui.gridMajor.set(spec.gridMajor)
+    gui.gridMinor.set(spec.gridMinor)
+    gui.showXLabel.set(spec.showXLabel)
+    gui.showYLabel.set(spec.showYLabel)
+    gui.showZLabel.set(spec.showZLabel)
+    gui.xkcdMode.set(spec.xkcd)
+
+    # Run filters
+    gui.filterModels.set(', '.join(spec.filterModels))
+    gui.filterInstances.set(', '.join(spec.filterInstances))
+    for field in ('Runs', 'Times', 'Alts'):
+        for end, val in zip(('Min', 'Max'), getattr(spec, f'filter{field}')):
+            text = '' if val is None else f'{val:g}'
+            getattr(gui, f'filter{field}{end}').set(text)
+    setTimeRange(gui, spec.timeRange)
+
+    # Runs
+    gui.showAllRuns.set(spec.showAllRuns)
+    gui.transparentRuns.set(spec.transparentRuns)
+    if spec.run is not None and spec.run in gui.availableRuns:
+        gui.run.set(spec.run)
+    setRunOptions(gui)
+
+    gui.startPlot(1)
+
+
+def savePlotPreset(gui) -> None:
+    """
+    Saves the current plot options to a JSON file chosen by the user.
+
+    Returns
+    -------
+    None
+
+    """
+    outFile = filedialog.asksaveasfilename(
+                                title='Save Plot Preset',
+                                defaultextension='.json',
+                                filetypes=[('Plot Presets', '*.json')])
+    if outFile in ['', ()]:
+        return
+    gui.plotSettings().save(outFile)
+    gui.status.set(f'Saved plot preset to {os.path.basename(outFile)}')
+
+
+def loadPlotPreset(gui) -> None:
+    """
+    Loads plot options from a JSON file chosen by the user and
+    applies them to the editor.
+
+    Returns
+    -------
+    None
+
+    """
+    inFile = filedialog.askopenfilename(
+                                title='Load Plot Preset',
+                                filetypes=[('Plot Presets', '*.json')])
+    if inFile in ['', ()]:
+        return
+    try:
+        spec = plf.PlotSpec.load(inFile)
+    except (OSError, ValueError, TypeError) as err:
+        mb.showerror('Invalid Preset', f'Could not read {inFile}:\n{err}')
+        return
+    applyPlotSpec(gui, spec)
+
+
 def setStatusBarOptions(gui, event=None) -> None:
     """
     Updates the the elements displayed in the status bar.
@@ -481,11 +966,282 @@ def setStatusBarOptions(gui, event=None) -> None:
     if tab == 0:  # Data Input Tab
         gui.xkcdModeCB.pack_forget()
     elif tab == 1:  # Viewer Tab
+        gui.buildViewer()
         gui.xkcdModeCB.pack(fill=tk.BOTH, side=tk.RIGHT)
+    elif tab == 2:  # Diagnostics Tab
+        gui.xkcdModeCB.pack_forget()
+        refreshDiagnostics(gui)
     else:
         gui.status.set(f'You are on tab {tab} which must be new')
 
 
+def diagnosticsExtra(gui) -> dict:
+    """
+    The statistics of the plot scheduler and figure cache, stored
+    alongside the timings.
+
+    Returns
+    -------
+    dict
+        scheduler: see render_functions.PlotScheduler.stats
+        figureCache: the figures held and the cache hits and misses
+        memory: the bytes held by each part of the loaded data
+        (see memoryUsage)
+        mapped: the bytes of trajectory data mapped from its store,
+        shared through the page cache
+
+    """
+    return {'scheduler': gui.plotScheduler.stats(),
+            'figureCache': {'entries': len(gui.figureCache),
+                            'hits': gui.figureCache.hits,
+                            'misses': gui.figureCache.misses, },
+            'memory': memoryUsage(gui),
+            'mapped': mem.mappedBytes(gui.missileDF), }
+
+
+def refreshDiagnostics(gui) -> None:
+    """
+    Shows the latest timings in the Diagnostics tab.
+
+    Returns
+    -------
+    None
+
+    """
+    tree = gui.diagnosticsTree
+    tree.delete(*tree.get_children())
+    for name, stats in tm.timings.snapshot().items():
+        tree.insert('', tk.END, values=(
+                        name, stats['count'], f'{stats["total"]:.3f}',
+                        *(f'{1000*stats[key]:.1f}'
+                          for key in ('mean', 'min', 'max', 'last'))))
+
+    extra = diagnosticsExtra(gui)
+    scheduler, cache = extra['scheduler'], extra['figureCache']
+    usage = extra['memory']
+    memoryText = ', '.join(f'{name.lower()}: {mem.formatBytes(size)}'
+                           for name, size in usage.items())
+    gui.diagnosticsInfo.set(
+        f'Plot requests: {scheduler["requests"]}, '
+        f'plots: {scheduler["plots"]}, '
+        f'renders: {scheduler["renders"]}, '
+        f'skipped: {scheduler["skipped"]}, '
+        f'coalesced: {scheduler["coalesced"]}\n'
+        f'Figure cache: {cache["entries"]} held, '
+        f'{cache["hits"]} hits, {cache["misses"]} misses\n'
+        f'Memory: {mem.formatBytes(sum(usage.values()))} of '
+        f'{mem.formatBytes(memoryBudget(gui))} ({memoryText}), '
+        f'mapped (shared): {mem.formatBytes(extra["mapped"])}')
+
+
+def showAssetErrors(gui) -> None:
+    """
+    Lists the asset lines skipped by the last load on the Diagnostics tab.
+
+    Returns
+    -------
+    None
+
+    """
+    gui.assetErrorList.delete(0, tk.END)
+    for err in gui.assetErrors:
+        gui.assetErrorList.insert(tk.END,
+                                  f'{err.path}:{err.line}: {err.message}')
+
+
+def resetDiagnostics(gui) -> None:
+    """
+    Clears the timings collected so far.
+
+    Returns
+    -------
+    None
+
+    """
+    tm.timings.reset()
+    refreshDiagnostics(gui)
+
+
+def saveDiagnostics(gui) -> None:
+    """
+    Saves the timings, with the plot scheduler and figure cache
+    statistics, to a JSON file chosen by the user.
+
+    Returns
+    -------
+    None
+
+    """
+    outFile = filedialog.asksaveasfilename(
+                                title='Save Diagnostics',
+                                defaultextension='.json',
+                                filetypes=[('Diagnostics', '*.json')])
+    if outFile in ['', ()]:
+        return
+    try:
+        tm.timings.dump(outFile, extra=diagnosticsExtra(gui))
+    except OSError as err:
+        mb.showerror('Save Failed', f'Could not write {outFile}:\n{err}')
+        return
+    gui.status.set(f'Saved diagnostics to {os.path.basename(outFile)}')
+
+
+def memoryBudget(gui) -> int:
+    """
+    The memory budget set on the Diagnostics tab.
+
+    Returns
+    -------
+    int
+        The budget in bytes. An invalid entry counts as the default
+        budget (see memory_functions.defaultBudget).
+
+    """
+    try:
+        budget = gui.memoryBudget.get()
+    except tk.TclError:
+        budget = 0
+    if budget <= 0:
+        budget = mem.defaultBudget()
+    return budget * 2**20
+
+
+def memoryUsage(gui) -> dict:
+    """
+    Measures the memory held by the loaded data, its derived structures,
+    and rendered figures.
+
+    Returns
+    -------
+    dict
+        A mapping of what holds the memory to its size in bytes
+
+    """
+    figures = [rendered[0] for rendered in gui.figureCache.entries.values()]
+    if gui.figure is not None and gui.figure not in figures:
+        figures.append(gui.figure)
+    assetPlots = sum(mem.frameBytes(aDF)
+                     for aDF in gui.assetPlotCache.values())
+
+    return {'Trajectories': mem.frameBytes(gui.missileDF),
+            'Index': (mem.arrayBytes(gui.trajectoryIndex) +
+                      mem.arrayBytes(gui.trajectoryFilter)),
+            'Summary': mem.frameBytes(gui.runSummary),
+            'Assets': mem.frameBytes(gui.assets) + assetPlots,
+            'Figures': sum(mem.figureBytes(figure) for figure in figures), }
+
+
+def mapToStore(gui, storeDir: str, version: str) -> bool:
+    """
+    Writes the loaded trajectory data to a store and replaces it with a
+    memory map of the store (see store_functions). If the store cannot
+    be written or opened, the data stays as it is.
+
+    Parameters
+    ----------
+    storeDir : str
+        The directory holding the stores of the campaign
+    version : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    bool
+        True if the data is now mapped
+
+    """
+    if not stf.saveStore(gui.missileDF, gui.trajectoryIndex, storeDir,
+                         version):
+        return False
+    opened = stf.openStore(storeDir, version)
+    if opened is None:
+        return False
+    gui.missileDF, gui.trajectoryIndex = opened
+    return True
+
+
+def checkLoadBudget(gui, missileFiles: list) -> bool:
+    """
+    Checks whether loading some files would fit in the memory budget,
+    warning the user if not. The data currently loaded is replaced by
+    the load, so only what is kept (figures) counts against it.
+
+    Parameters
+    ----------
+    missileFiles : list
+        The missile files to load
+
+    Returns
+    -------
+    bool
+        True if the load fits
+
+    """
+    needed = mem.estimateLoadBytes(missileFiles)
+    budget = memoryBudget(gui)
+    if needed <= budget:
+        return True
+
+    N = len(missileFiles)
+    gui.status.set(f'Not loaded: {N} files need about '
+                   f'{mem.formatBytes(needed)}')
+    mb.showwarning('Over Memory Budget',
+                   f'Loading {N} file' + 's' * (N > 1) +
+                   f' needs about {mem.formatBytes(needed)}, more than the '
+                   f'memory budget of {mem.formatBytes(budget)}.\n\n'
+                   'Load a directory with fewer runs, or raise the budget '
+                   'on the Diagnostics tab.')
+    return False
+
+
+def enforceMemoryBudget(gui) -> None:
+    """
+    Brings the memory held back under the budget, as far as possible
+    without discarding loaded data: first the cached figures and asset
+    plot data are dropped, then plots are thinned to
+    memory_functions.degradedPoints points per trajectory. Once the
+    memory held fits again (the budget was raised, or memory was freed),
+    plots show every point again. The user is told which was done.
+
+    Called after every load and plot, and whenever the budget changes.
+
+    Returns
+    -------
+    None
+
+    """
+    budget = memoryBudget(gui)
+    used = sum(memoryUsage(gui).values())
+    dropped = False
+    if used > budget:
+        # The figure on display stays; the rest can be drawn again
+        gui.figureCache.clear()
+        gui.assetPlotCache.clear()
+        used = sum(memoryUsage(gui).values())
+        dropped = True
+
+    # Thinning does not change the memory measured, so lifting it cannot
+    # push the memory held back over the budget
+    if used <= budget:
+        messages = []
+        if dropped:
+            messages.append('Over the memory budget: cached plots were '
+                            'dropped')
+        if gui.renderPointLimit is not None:
+            gui.renderPointLimit = None
+            messages.append('Within the memory budget: plots show every '
+                            'point again')
+        if len(messages) > 0:
+            gui.status.set('. '.join(messages))
+        return
+
+    if gui.renderPointLimit is None:
+        gui.renderPointLimit = mem.degradedPoints
+    gui.status.set(f'Over the memory budget ({mem.formatBytes(used)} of '
+                   f'{mem.formatBytes(budget)}): plots show at most '
+                   f'{gui.renderPointLimit} points per trajectory')
+
+
 def setPlotStyleOptions(gui) -> None:
     """
     Checks whether the radio button for 'line' or 'scatter' is selected.
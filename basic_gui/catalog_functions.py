@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+
+"""
+A catalog of the runs in a campaign directory, kept in SQLite.
+
+Loading a campaign records, for every missile file, its size and
+modification time, the trajectories (model and instance) it holds with
+their row counts and time ranges, and the assets of each run. The
+catalog lives in the load cache of the campaign, so later sessions can
+list every run without reading any data file, and can load a selection
+of runs by reading only the files that hold them.
+
+A file whose size or modification time no longer matches its entry is
+treated as unknown, and entries for files that have gone are removed.
+The catalog is an index, not a store: losing it only means the next load
+reads every file again.
+"""
+
+# File Imports
+import extra_functions as ef
+
+# Module-Level Imports
+import os
+import re
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Bumped whenever the tables change; older catalogs are rebuilt
+catalogVersion = 1
+
+catalogSchema = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime INTEGER,
+    rows INTEGER,
+    startTime REAL,
+    endTime REAL
+);
+CREATE TABLE IF NOT EXISTS trajectories (
+    path TEXT,
+    run INTEGER,
+    model TEXT,
+    instance TEXT,
+    rows INTEGER,
+    startTime REAL,
+    endTime REAL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    run INTEGER,
+    category TEXT,
+    count INTEGER
+);
+CREATE INDEX IF NOT EXISTS trajectoriesByPath ON trajectories (path);
+CREATE INDEX IF NOT EXISTS trajectoriesByRun ON trajectories (run);
+CREATE INDEX IF NOT EXISTS assetsByRun ON assets (run);
+'''
+
+# One row per run, as listed by RunCatalog.runs
+catalogCols = ['RunNumber', 'Files', 'Trajectories', 'Models', 'Rows',
+               'Start Time', 'End Time', 'Assets', 'Size (MB)']
+
+
+def catalogPath(topDir: str) -> str:
+    """
+    The file the catalog of a campaign is stored in.
+
+    Parameters
+    ----------
+    topDir : str
+        The campaign directory
+
+    Returns
+    -------
+    str
+        The path of the catalog, which may not exist yet
+
+    """
+    return os.path.join(ef.cacheDir(topDir), 'catalog.sqlite')
+
+
+def parseRuns(text: str) -> list:
+    """
+    Reads a selection of runs such as '3, 10-20, 42'.
+
+    Parameters
+    ----------
+    text : str
+        Run numbers and inclusive ranges, separated by commas or spaces
+
+    Raises
+    ------
+    ValueError
+        If the text is not a selection of runs
+
+    Returns
+    -------
+    list
+        The sorted run numbers, or None if the text is blank (all runs)
+
+    """
+    runs = set()
+    for part in re.split(r'[,\s]+', text.strip()):
+        if part == '':
+            continue
+        match = re.fullmatch(r'(\d+)(?:-(\d+))?', part)
+        if match is None:
+            raise ValueError(f"'{part}' is not a run number or range")
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else first
+        if last < first:
+            raise ValueError(f"'{part}' is an empty range")
+        runs.update(range(first, last + 1))
+    return sorted(runs) if runs else None
+
+
+def fileStat(path: str) -> tuple:
+    """
+    The size and modification time a catalog entry is checked against.
+
+    Parameters
+    ----------
+    path : str
+        The file
+
+    Returns
+    -------
+    tuple
+        (size in bytes, modification time in nanoseconds), or None if
+        the file cannot be read
+
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class RunCatalog():
+    def __init__(self, topDir: str) -> None:
+        """
+        Opens the catalog of a campaign, creating it if needed.
+
+        Parameters
+        ----------
+        topDir : str
+            The campaign directory
+
+        Raises
+        ------
+        sqlite3.Error
+            If the catalog cannot be opened or created
+        OSError
+            If the cache directory cannot be created
+
+        Returns
+        -------
+        None
+
+        """
+        self.topDir = os.path.abspath(topDir)
+        self.path = catalogPath(self.topDir)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != catalogVersion:
+            with self.db:
+                for table in ('files', 'trajectories', 'assets'):
+                    self.db.execute(f'DROP TABLE IF EXISTS {table}')
+        self.db.executescript(catalogSchema)
+        self.db.execute(f'PRAGMA user_version = {catalogVersion}')
+
+    def close(self) -> None:
+        """
+        Closes the catalog.
+
+        Returns
+        -------
+        None
+
+        """
+        self.db.close()
+
+    def relative(self, path: str) -> str:
+        """
+        The key of a file in the catalog: its path within the campaign,
+        so the campaign directory can be moved.
+
+        Parameters
+        ----------
+        path : str
+            The file
+
+        Returns
+        -------
+        str
+            The path relative to the campaign directory, with '/'
+            separators
+
+        """
+        rel = os.path.relpath(os.path.abspath(path), self.topDir)
+        return rel.replace(os.sep, '/')
+
+    def fresh(self, missileFiles: list) -> set:
+        """
+        The files whose catalog entries still describe them.
+
+        Parameters
+        ----------
+        missileFiles : list
+            The missile files of the campaign
+
+        Returns
+        -------
+        set
+            The paths (as given) of the files that are cataloged and
+            unchanged since
+
+        """
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.db.execute('SELECT path, size, mtime FROM files')}
+        return {path for path in missileFiles
+                if known.get(self.relative(path)) == fileStat(path)}
+
+    def prune(self, missileFiles: list) -> None:
+        """
+        Removes the entries of files that are no longer in the campaign.
+
+        Parameters
+        ----------
+        missileFiles : list
+            The missile files of the campaign
+
+        Returns
+        -------
+        None
+
+        """
+        present = {self.relative(path) for path in missileFiles}
+        gone = [(path, ) for (path, ) in
+                self.db.execute('SELECT path FROM files')
+                if path not in present]
+        if len(gone) == 0:
+            return
+        with self.db:
+            self.db.executemany('DELETE FROM files WHERE path = ?', gone)
+            self.db.executemany('DELETE FROM trajectories WHERE path = ?',
+                                gone)
+            self.db.execute('DELETE FROM assets WHERE run NOT IN '
+                            '(SELECT run FROM trajectories)')
+
+    def filesForRuns(self, missileFiles: list, runs: list) -> list:
+        """
+        The files that must be read to load a selection of runs: those
+        cataloged as holding any of the runs, and those that are not
+        cataloged (or have changed), whose runs are unknown.
+
+        Parameters
+        ----------
+        missileFiles : list
+            The missile files of the campaign
+        runs : list
+            The runs to load
+
+        Returns
+        -------
+        list
+            The files to read, in the order of missileFiles
+
+        """
+        fresh = self.fresh(missileFiles)
+        self.db.execute('CREATE TEMP TABLE IF NOT EXISTS selected '
+                        '(run INTEGER PRIMARY KEY)')
+        with self.db:
+            self.db.execute('DELETE FROM selected')
+            self.db.executemany('INSERT OR IGNORE INTO selected VALUES (?)',
+                                [(int(run), ) for run in runs])
+        holding = {path for (path, ) in self.db.execute(
+                        'SELECT DISTINCT path FROM trajectories '
+                        'WHERE run IN (SELECT run FROM selected)')}
+        return [path for path in missileFiles
+                if path not in fresh or self.relative(path) in holding]
+
+    def record(self, missileFiles: list, missileDF: pd.DataFrame,
+               assets: pd.DataFrame = None) -> None:
+        """
+        Records the files just loaded, replacing their old entries.
+
+        Parameters
+        ----------
+        missileFiles : list
+            The missile files that were read
+        missileDF : pd.DataFrame
+            The trajectory data read from them, with its Path column
+            (see extra_functions.loadMissileData)
+        assets : pd.DataFrame, optional
+            The assets of the runs read (see extra_functions.assetsDF).
+            If None, no asset summary is recorded. The default is None.
+
+        Returns
+        -------
+        None
+
+        """
+        groupCols = ['Path', 'RunNumber', 'Model', 'Instance']
+        if not set(groupCols).issubset(missileDF.columns):
+            return
+
+        # The rows and time range of every trajectory of every file
+        if 'Time' in missileDF.columns:
+            groups = missileDF.groupby(groupCols, sort=False)['Time']
+            traj = groups.agg(['size', 'min', 'max']).reset_index()
+        else:
+            traj = missileDF.groupby(groupCols, sort=False).size()
+            traj = traj.rename('size').reset_index()
+            traj['min'], traj['max'] = np.nan, np.nan
+        traj['Path'] = [self.relative(path) for path in traj['Path']]
+        perFile = traj.groupby('Path').agg(rows=('size', 'sum'),
+                                           start=('min', 'min'),
+                                           end=('max', 'max'))
+
+        fileRows = []
+        for path in missileFiles:
+            stat = fileStat(path)
+            if stat is None:
+                continue
+            key = self.relative(path)
+            if key in perFile.index:
+                rows, start, end = perFile.loc[key]
+            else:
+                rows, start, end = 0, np.nan, np.nan
+            fileRows.append((key, *stat, int(rows), nullable(start),
+                             nullable(end)))
+        trajRows = [(path, int(run), str(model), str(instance), int(size),
+                     nullable(start), nullable(end))
+                    for path, run, model, instance, size, start, end
+                    in traj.itertuples(index=False)]
+
+        keys = [(row[0], ) for row in fileRows]
+        with self.db:
+            self.db.executemany('DELETE FROM files WHERE path = ?', keys)
+            self.db.executemany('DELETE FROM trajectories WHERE path = ?',
+                                keys)
+            self.db.executemany('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                                fileRows)
+            self.db.executemany('INSERT INTO trajectories VALUES '
+                                '(?, ?, ?, ?, ?, ?, ?)', trajRows)
+
+            if assets is not None and 'category' in assets.columns:
+                counts = assets.groupby(['run', 'category']).size()
+                runs = {(int(run), ) for run in traj['RunNumber']}
+                self.db.executemany('DELETE FROM assets WHERE run = ?', runs)
+                self.db.executemany(
+                        'INSERT INTO assets VALUES (?, ?, ?)',
+                        [(int(run), str(category), int(count))
+                         for (run, category), count in counts.items()
+                         if (int(run), ) in runs])
+
+    def runs(self) -> pd.DataFrame:
+        """
+        Lists every cataloged run, without reading any data file.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per run with the columns in catalogCols
+
+        """
+        query = '''
+            SELECT t.run, COUNT(DISTINCT t.path), COUNT(*),
+                   GROUP_CONCAT(DISTINCT t.model), SUM(t.rows),
+                   MIN(t.startTime), MAX(t.endTime),
+                   COALESCE(a.count, 0),
+                   (SELECT SUM(f.size) FROM files f WHERE f.path IN
+                        (SELECT path FROM trajectories WHERE run = t.run))
+            FROM trajectories t
+            LEFT JOIN (SELECT run, SUM(count) AS count FROM assets
+                       GROUP BY run) a ON a.run = t.run
+            GROUP BY t.run
+            ORDER BY t.run
+        '''
+        table = pd.DataFrame(self.db.execute(query).fetchall(),
+                             columns=catalogCols)
+        table['Size (MB)'] = table['Size (MB)'].astype('float64') / 2**20
+        return table
+
+
+def nullable(value):
+    """
+    Converts a missing number to the None SQLite stores as NULL.
+
+    Parameters
+    ----------
+    value : float
+        The value
+
+    Returns
+    -------
+    float
+        The value, or None if it is NaN
+
+    """
+    return None if pd.isna(value) else float(value)
@@ -265,6 +265,31 @@ class FixedAsset():
 
         return True
 
+    def key(self, decimals: int = 6) -> tuple:
+        """
+        Generates a hashable key describing the asset. Two assets that
+        are equal under the "=" operator produce the same key, so the key
+        can be used with sets and dictionaries to find duplicates.
+
+        Parameters
+        ----------
+        decimals : int, optional
+            The number of decimal places coordinates are rounded to
+            before being placed in the key. The default is 6.
+
+        Returns
+        -------
+        tuple
+            (simulation, name, category, x, y, z, lat, lon, alt,
+             east, north, up)
+
+        """
+        coords = (self.x, self.y, self.z, self.lat, self.lon, self.alt,
+                  self.east, self.north, self.up)
+        return ((self.sim, self.name, self.type)
+                + tuple(None if c is None else round(float(c), decimals)
+                        for c in coords))
+
     def df(self, index: int = 0) -> pd.DataFrame:
         dict_ = {'sim': self.sim,
                  'run': self.runnum,
@@ -284,6 +309,312 @@ class FixedAsset():
         return pd.DataFrame(dict_, index=[index])
 
 
+class AssetTable():
+    # Metadata columns followed by the coordinate columns, in the same
+    # order as the DataFrame produced by FixedAsset.df()
+    metaCols = ('sim', 'run', 'name', 'category', 'id')
+    coordCols = ('x', 'y', 'z', 'lat', 'lon', 'alt', 'east', 'north', 'up')
+    columns = metaCols + coordCols
+
+    def __init__(self) -> None:
+        """
+        A column-oriented container for fixed assets. Rather than holding
+        one FixedAsset instance per asset, each attribute is stored as its
+        own column so that thousands of assets can be converted between
+        coordinate systems and into a DataFrame in a handful of
+        vectorized operations.
+
+        Assets are appended one at a time by the asset parser and the
+        columns are consolidated into NumPy arrays the first time they
+        are requested.
+
+        Returns
+        -------
+        None
+
+        """
+        self._rows = {col: [] for col in self.columns}
+        self._arrays = None
+
+    @classmethod
+    def from_assets(cls, assetList):
+        """
+        Builds a table from an iterable of FixedAsset instances.
+
+        Parameters
+        ----------
+        assetList : iterable
+            FixedAsset instances to add to the table
+
+        Returns
+        -------
+        AssetTable
+            A table holding one row per asset
+
+        """
+        table = cls()
+        for asset in assetList:
+            table._add_row((asset.sim, asset.runnum, asset.name,
+                            asset.type, asset.id,
+                            asset.x, asset.y, asset.z,
+                            asset.lat, asset.lon, asset.alt,
+                            asset.east, asset.north, asset.up))
+        return table
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Combines several tables into one, preserving their order.
+
+        Parameters
+        ----------
+        tables : iterable
+            AssetTable instances to combine
+
+        Returns
+        -------
+        AssetTable
+            A single table containing every row of the inputs
+
+        """
+        table = cls()
+        for other in tables:
+            for col in cls.columns:
+                table._rows[col].extend(other._rows[col])
+        return table
+
+    def append(self, simulation: str, name: str, category: str,
+               unique_id: int, run_number: int, *,
+               ecef: Vector = None, lla: Vector = None,
+               enu: Vector = None) -> None:
+        """
+        Adds a single asset to the table. The signature mirrors the
+        FixedAsset constructor.
+
+        Parameters
+        ----------
+        simulation : str
+            The simulation which generated the asset.
+        name : str
+            The name of the asset.
+        category : str
+            The category (e.g., radar) of the asset.
+        unique_id : int
+            An ID often specified by the simulation.
+        run_number : int
+            The run number, often specified by the simulation.
+        ecef : Vector, optional
+            ECEF asset coordinates (in meters) as 3-tuple. The default is None.
+        lla : Vector, optional
+            Latitude (deg), Longitude (deg), and Altitude (m)
+            asset coordinates as 3-tuple. The default is None.
+        enu : Vector, optional
+             ENU asset coordinates (in meters) as 3-tuple. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If no coordinate system is specified, the asset is invalid.
+
+        Returns
+        -------
+        None
+
+        """
+
+        # A coordinate system must be specified or an error is thrown
+        if all((x is None for x in (ecef, lla, enu))):
+            raise ValueError('Must enter a valid coordinate!')
+
+        # Missing coordinates are filled in (where possible) when the
+        # columns are consolidated
+        missing = (None, None, None)
+        ecef = missing if ecef is None else ecef
+        lla = missing if lla is None else lla
+        enu = missing if enu is None else enu
+
+        self._add_row((simulation, run_number, name, category, unique_id,
+                       *ecef, *lla, *enu))
+
+    def _add_row(self, row: tuple) -> None:
+        """
+        Appends a full row of values, ordered as AssetTable.columns.
+
+        Parameters
+        ----------
+        row : tuple
+            One value for each column in the table
+
+        Returns
+        -------
+        None
+
+        """
+        for col, val in zip(self.columns, row):
+            self._rows[col].append(val)
+        self._arrays = None
+
+    def arrays(self) -> dict:
+        """
+        Consolidates the columns into NumPy arrays. Missing ECEF
+        coordinates are generated from Lat/Lon/Alt and vice versa,
+        in a single vectorized pass over all assets.
+
+        Returns
+        -------
+        dict
+            A mapping of column name to NumPy array
+
+        """
+        if self._arrays is not None:
+            return self._arrays
+
+        arrays = {col: np.array(self._rows[col], dtype=object)
+                  for col in ('sim', 'name', 'category', 'id')}
+        arrays['run'] = np.array(self._rows['run'], dtype='int64')
+        for col in self.coordCols:
+            arrays[col] = np.array([np.nan if v is None else v
+                                    for v in self._rows[col]],
+                                   dtype='float64')
+
+        x, y, z = arrays['x'], arrays['y'], arrays['z']
+        lat, lon, alt = arrays['lat'], arrays['lon'], arrays['alt']
+
+        hasECEF = ~(np.isnan(x) | np.isnan(y) | np.isnan(z))
+        hasLLA = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(alt))
+
+        # Generating ECEF coordinates wherever only Lat/Lon/Alt exist
+        toECEF = hasLLA & ~hasECEF
+        if toECEF.any():
+            x[toECEF], y[toECEF], z[toECEF] = lla2ecef(lat[toECEF],
+                                                       lon[toECEF],
+                                                       alt[toECEF])
+
+        # Generating Lat/Lon/Alt coordinates wherever only ECEF exists
+        toLLA = hasECEF & ~hasLLA
+        if toLLA.any():
+            lat[toLLA], lon[toLLA], alt[toLLA] = ecef2lla(x[toLLA],
+                                                          y[toLLA],
+                                                          z[toLLA])
+
+        self._arrays = arrays
+        return arrays
+
+    def keys(self, decimals: int = 6) -> list:
+        """
+        Generates the same hashable key as FixedAsset.key() for every
+        row of the table, rounding all coordinates in one pass.
+
+        Parameters
+        ----------
+        decimals : int, optional
+            The number of decimal places coordinates are rounded to
+            before being placed in the key. The default is 6.
+
+        Returns
+        -------
+        list
+            One tuple per row of the table
+
+        """
+        arrays = self.arrays()
+        coords = []
+        for col in self.coordCols:
+            vals = np.round(arrays[col], decimals).astype(object)
+            vals[np.isnan(arrays[col])] = None
+            coords.append(vals.tolist())
+        return list(zip(arrays['sim'].tolist(), arrays['name'].tolist(),
+                        arrays['category'].tolist(), *coords))
+
+    def take(self, indices):
+        """
+        Builds a new table from a subset of the rows of this table.
+
+        Parameters
+        ----------
+        indices : iterable
+            The rows to keep, in the order they should appear
+
+        Returns
+        -------
+        AssetTable
+            A table containing only the selected rows
+
+        """
+        table = AssetTable()
+        indices = list(indices)
+        for col in self.columns:
+            rows = self._rows[col]
+            table._rows[col] = [rows[k] for k in indices]
+        return table
+
+    def df(self) -> pd.DataFrame:
+        """
+        Represents the table as a DataFrame with the same columns as
+        FixedAsset.df(), indexed in the order the assets were added.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per asset
+
+        """
+        arrays = self.arrays()
+        return pd.DataFrame({col: arrays[col] for col in self.columns})
+
+    def __len__(self) -> int:
+        """
+        The number of assets in the table.
+
+        Returns
+        -------
+        int
+            The number of rows
+
+        """
+        return len(self._rows['sim'])
+
+    def __getitem__(self, index: int) -> FixedAsset:
+        """
+        Builds a FixedAsset for a single row of the table. This keeps the
+        table usable anywhere a list of FixedAsset instances was expected.
+
+        Parameters
+        ----------
+        index : int
+            The row of interest
+
+        Returns
+        -------
+        FixedAsset
+            The asset stored in that row
+
+        """
+        row = {col: self._rows[col][index] for col in self.columns}
+        kwargs = {}
+        for key, cols in (('ecef', ('x', 'y', 'z')),
+                          ('lla', ('lat', 'lon', 'alt')),
+                          ('enu', ('east', 'north', 'up'))):
+            vals = [row[c] for c in cols]
+            if None not in vals:
+                kwargs[key] = vals
+        return FixedAsset(row['sim'], row['name'], row['category'],
+                          row['id'], row['run'], **kwargs)
+
+    def __iter__(self):
+        """
+        Iterates over the table as FixedAsset instances.
+
+        Yields
+        ------
+        FixedAsset
+            The asset stored in each row
+
+        """
+        for k in range(len(self)):
+            yield self[k]
+
+
 class ENU():
     def __init__(self, east: float, north: float, up: float) -> None:
         """
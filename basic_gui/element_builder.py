@@ -2,6 +2,7 @@
 
 import callback_functions as cf
 import extra_functions as ef
+import memory_functions as mem
 
 # Module-level imports
 import os
@@ -602,6 +603,7 @@ def buildAdditionalOptions(gui: tk.Tk, parent: tk.Frame,
     Adds elements for additional plot options:
         Grid lines (major/minor)
         Axis labels
+        Asset labels on hover
 
     Parameters
     ----------
@@ -648,6 +650,23 @@ def buildAdditionalOptions(gui: tk.Tk, parent: tk.Frame,
     gui.showAxFrame.grid(row=1, column=1, sticky=tk.W, columnspan=2)
     buildXYZGridLabels(gui, gui.showAxFrame, startPlotFunc)
 
+    # - - - - - - - - - -
+    # Row 2 - Asset Labels
+    gui.assetHover = tk.BooleanVar(value=True)
+    hover_kwargs = {'text': 'Label Assets on Hover',
+                    'variable': gui.assetHover,
+                    'command': lambda: startPlotFunc(1), }
+    gui.assetHoverCB = tk.Checkbutton(parent, **hover_kwargs)
+    gui.assetHoverCB.grid(row=2, column=0, columnspan=3, sticky=tk.W)
+
+    # - - - - - - - - - -
+    # Row 3 - Plot Cache
+    gui.diskCache = tk.BooleanVar(value=False)
+    cache_kwargs = {'text': 'Cache Plots on Disk',
+                    'variable': gui.diskCache, }
+    gui.diskCacheCB = tk.Checkbutton(parent, **cache_kwargs)
+    gui.diskCacheCB.grid(row=3, column=0, columnspan=3, sticky=tk.W)
+
 
 def buildXYZGridLabels(gui: tk.Tk, parent: tk.Frame, startPlotFunc) -> None:
     """
@@ -755,6 +774,138 @@ def buildRunSelector(gui: tk.Tk, parent: tk.Frame,
     gui.transRunsCB.grid(row=0, column=3, sticky=tk.W,)
 
 
+def buildRunFilterOptions(gui: tk.Tk, parent: tk.Frame, waitFunc) -> None:
+    """
+    Builds the elements for downselecting trajectories by their metadata
+
+    Parameters
+    ----------
+    gui : tk.Tk
+        A tkinter GUI
+    parent : tk.Frame
+        A placeholder for all of these elements
+    waitFunc : function
+        A function pointer for having the GUI wait before acting
+
+    Returns
+    -------
+    None
+
+    """
+
+    # - - - - - - - - - -
+    # Rows 0-1 - Models and Instances (comma-separated)
+    for row, (field, text) in enumerate([('Models', 'Models:'),
+                                         ('Instances', 'Instances:')]):
+        var = tk.StringVar()
+        setattr(gui, f'filter{field}', var)
+        ttk.Label(parent, text=text).grid(row=row, column=0, sticky=tk.W)
+        entry = ttk.Entry(parent, width=22, textvariable=var)
+        entry.bind('<Key>', waitFunc)
+        entry.grid(row=row, column=1, columnspan=2, sticky=tk.W)
+        setattr(gui, f'filter{field}Entry', entry)
+
+    # - - - - - - - - - -
+    # Rows 2-4 - Run, Time, and Max Altitude bounds
+    bounds = [('Runs', 'Runs:'), ('Times', 'Time (s):'),
+              ('Alts', 'Max Alt (m):')]
+    for row, (field, text) in enumerate(bounds, start=2):
+        ttk.Label(parent, text=text).grid(row=row, column=0, sticky=tk.W)
+        for column, end in enumerate(('Min', 'Max'), start=1):
+            var = tk.StringVar()
+            setattr(gui, f'filter{field}{end}', var)
+            entry = ttk.Entry(parent, width=10, textvariable=var)
+            entry.bind('<Key>', waitFunc)
+            entry.grid(row=row, column=column, sticky=tk.W)
+            setattr(gui, f'filter{field}{end}Entry', entry)
+
+    # - - - - - - - - - -
+    # Rows 5-6 - Time range shown (see callback_functions.setTimeRange)
+    gui.timeBounds = (0.0, 0.0)
+    for row, (field, text) in enumerate([('Start', 'Show From:'),
+                                         ('End', 'Show To:')], start=5):
+        var = tk.DoubleVar(value=0.0)
+        setattr(gui, f'time{field}', var)
+        ttk.Label(parent, text=text).grid(row=row, column=0, sticky=tk.W)
+        scale_kwargs = {'variable': var, 'orient': tk.HORIZONTAL,
+                        'from_': 0.0, 'to': 0.0, 'length': 150,
+                        'command': waitFunc, }
+        scale = tk.Scale(parent, **scale_kwargs)
+        scale.grid(row=row, column=1, columnspan=2, sticky=tk.W)
+        setattr(gui, f'time{field}Scale', scale)
+
+    # - - - - - - - - - -
+    # Row 7 - Number of trajectories matching
+    gui.filterCount = tk.StringVar(value='')
+    gui.filterCountLabel = ttk.Label(parent, textvariable=gui.filterCount)
+    gui.filterCountLabel.grid(row=7, column=0, columnspan=2, sticky=tk.W)
+
+    summary_kwargs = {'text': 'Summary',
+                      'command': lambda: cf.showRunSummary(gui), }
+    gui.runSummaryButton = tk.Button(parent, **summary_kwargs)
+    gui.runSummaryButton.grid(row=7, column=2, sticky=tk.E)
+
+
+def buildProximityOptions(gui: tk.Tk, parent: tk.Frame) -> None:
+    """
+    Builds the elements for finding how close trajectories came to assets
+
+    Parameters
+    ----------
+    gui : tk.Tk
+        A tkinter GUI
+    parent : tk.Frame
+        A placeholder for all of these elements
+
+    Returns
+    -------
+    None
+
+    """
+
+    # - - - - - - - - - -
+    # Row 0 - Closest Approach
+    gui.proxSameRun = tk.BooleanVar(value=True)
+    sameRun_kwargs = {'text': 'Same Run Only', 'variable': gui.proxSameRun, }
+    gui.proxSameRunCB = tk.Checkbutton(parent, **sameRun_kwargs)
+    gui.proxSameRunCB.grid(row=0, column=0, sticky=tk.W)
+
+    ca_kwargs = {'text': 'Closest Approach',
+                 'command': lambda: cf.showClosestApproach(gui), }
+    gui.closestApproachButton = tk.Button(parent, **ca_kwargs)
+    gui.closestApproachButton.grid(row=0, column=1, sticky=tk.E, padx=(5, 0))
+
+
+def buildPresetOptions(gui: tk.Tk, parent: tk.Frame) -> None:
+    """
+    Builds the elements for saving and loading plot presets
+
+    Parameters
+    ----------
+    gui : tk.Tk
+        A tkinter GUI
+    parent : tk.Frame
+        A placeholder for all of these elements
+
+    Returns
+    -------
+    None
+
+    """
+
+    # - - - - - - - - - -
+    # Row 0 - Save/Load
+    save_kwargs = {'text': 'Save Preset',
+                   'command': lambda: cf.savePlotPreset(gui), }
+    gui.savePresetButton = tk.Button(parent, **save_kwargs)
+    gui.savePresetButton.grid(row=0, column=0, sticky=tk.W)
+
+    load_kwargs = {'text': 'Load Preset',
+                   'command': lambda: cf.loadPlotPreset(gui), }
+    gui.loadPresetButton = tk.Button(parent, **load_kwargs)
+    gui.loadPresetButton.grid(row=0, column=1, sticky=tk.E, padx=(5, 0))
+
+
 def buildEditorElements(gui: tk.Tk, parent: tk.Frame,
                         plotColumns, availableRuns,
                         waitFunc, startPlotFunc) -> None:
@@ -831,6 +982,27 @@ def buildEditorElements(gui: tk.Tk, parent: tk.Frame,
     runChoiceLF.grid(row=thisrow, column=1, sticky=tk.W, pady=3,)
     buildRunSelector(gui, runChoiceLF, waitFunc, startPlotFunc, availableRuns)
 
+    # - - - - - - - - - - - - - - - -
+    # Row 6 - Run Filter
+    thisrow += 1
+    filterLF = ttk.LabelFrame(parent, relief=tk.RIDGE, text="Run Filter",)
+    filterLF.grid(row=thisrow, column=1, sticky=tk.W, pady=3,)
+    buildRunFilterOptions(gui, filterLF, waitFunc)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 7 - Asset Proximity
+    thisrow += 1
+    proxLF = ttk.LabelFrame(parent, relief=tk.RIDGE, text="Asset Proximity",)
+    proxLF.grid(row=thisrow, column=1, sticky=tk.W, pady=3,)
+    buildProximityOptions(gui, proxLF)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 8 - Plot Presets
+    thisrow += 1
+    presetLF = ttk.LabelFrame(parent, relief=tk.RIDGE, text="Presets",)
+    presetLF.grid(row=thisrow, column=1, sticky=tk.W, pady=3,)
+    buildPresetOptions(gui, presetLF)
+
 
 def buildEditAndViewPanes(parent,) -> tuple:
     """
@@ -915,3 +1087,111 @@ def buildInputElements(gui: tk.Tk, parent, ) -> None:
 
     gui.threatTypeCB.set('Infer')  # Could use .current(0)
     gui.threatTypeCB.grid(row=1, column=1, sticky=tk.W)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 2 - Runs to Load (blank loads every run)
+    gui.loadRunsLabel = tk.Label(parent, text='Runs to Load: ')
+    gui.loadRunsLabel.grid(row=2, sticky=tk.W)
+    gui.loadRuns = tk.StringVar(value='')
+    gui.loadRunsEntry = tk.Entry(parent, textvariable=gui.loadRuns,
+                                 width=40)
+    gui.loadRunsEntry.grid(row=2, column=1, sticky=tk.W)
+
+    gui.catalogButton = tk.Button(parent, text='Catalog', height=1,
+                                  command=lambda: cf.showCatalog(gui))
+    gui.catalogButton.grid(row=2, column=6, padx=4)
+
+
+def buildDiagnosticsElements(gui: tk.Tk, parent, ) -> None:
+    """
+    Adds the table of load and plot timings and the buttons for
+    refreshing, clearing, and saving them.
+
+    Parameters
+    ----------
+    gui : tk.Tk
+        The top-level GUI instance
+    parent : ttk.Frame
+        The Diagnostics tab
+
+    Returns
+    -------
+    None
+
+    """
+    # - - - - - - - - - - - - - - - -
+    # Row 0 - Buttons
+    buttonFrame = ttk.Frame(parent)
+    buttonFrame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+    refresh_kwargs = {'text': 'Refresh',
+                      'command': lambda: cf.refreshDiagnostics(gui), }
+    gui.refreshDiagnosticsButton = tk.Button(buttonFrame, **refresh_kwargs)
+    gui.refreshDiagnosticsButton.pack(side=tk.LEFT)
+
+    reset_kwargs = {'text': 'Reset',
+                    'command': lambda: cf.resetDiagnostics(gui), }
+    gui.resetDiagnosticsButton = tk.Button(buttonFrame, **reset_kwargs)
+    gui.resetDiagnosticsButton.pack(side=tk.LEFT, padx=(5, 0))
+
+    save_kwargs = {'text': 'Save JSON',
+                   'command': lambda: cf.saveDiagnostics(gui), }
+    gui.saveDiagnosticsButton = tk.Button(buttonFrame, **save_kwargs)
+    gui.saveDiagnosticsButton.pack(side=tk.LEFT, padx=(5, 0))
+
+    gui.profileNext = tk.BooleanVar(value=False)
+    profile_kwargs = {'text': 'Profile Next Load or Plot',
+                      'variable': gui.profileNext, }
+    gui.profileNextCB = tk.Checkbutton(buttonFrame, **profile_kwargs)
+    gui.profileNextCB.pack(side=tk.LEFT, padx=(10, 0))
+
+    gui.memoryBudget = tk.IntVar(value=mem.defaultBudget())
+    budget_kwargs = {'textvariable': gui.memoryBudget, 'from_': 256,
+                     'to': 2**20, 'increment': 256, 'width': 8, }
+    gui.memoryBudgetSB = tk.Spinbox(buttonFrame, **budget_kwargs)
+    gui.memoryBudgetSB.pack(side=tk.RIGHT)
+    gui.memoryBudget.set(mem.defaultBudget())  # Spinbox resets it
+    gui.memoryBudget.trace_add('write',
+                               lambda *args: cf.enforceMemoryBudget(gui))
+    gui.memoryBudgetLabel = tk.Label(buttonFrame,
+                                     text='Memory Budget (MB): ')
+    gui.memoryBudgetLabel.pack(side=tk.RIGHT)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 1 - Scheduler and Cache Statistics
+    gui.diagnosticsInfo = tk.StringVar()
+    gui.diagnosticsLabel = tk.Label(parent, anchor=tk.W, justify=tk.LEFT,
+                                    textvariable=gui.diagnosticsInfo)
+    gui.diagnosticsLabel.pack(side=tk.TOP, fill=tk.X, padx=5)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 2 - Timings Table
+    tableFrame = ttk.Frame(parent)
+    tableFrame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    cols = ('Operation', 'Count', 'Total (s)', 'Mean (ms)', 'Min (ms)',
+            'Max (ms)', 'Last (ms)')
+    gui.diagnosticsTree = ttk.Treeview(tableFrame, columns=cols,
+                                       show='headings')
+    for col in cols:
+        gui.diagnosticsTree.heading(col, text=col)
+        gui.diagnosticsTree.column(col, width=90, anchor=tk.E)
+    gui.diagnosticsTree.column('Operation', width=160, anchor=tk.W)
+
+    scroll = ttk.Scrollbar(tableFrame, orient=tk.VERTICAL,
+                           command=gui.diagnosticsTree.yview)
+    gui.diagnosticsTree.configure(yscrollcommand=scroll.set)
+    scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    gui.diagnosticsTree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    # - - - - - - - - - - - - - - - -
+    # Row 3 - Asset Lines Skipped by the Last Load
+    errorFrame = ttk.LabelFrame(parent, text='Skipped Asset Lines')
+    errorFrame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=(0, 5))
+
+    gui.assetErrorList = tk.Listbox(errorFrame, height=6)
+    errorScroll = ttk.Scrollbar(errorFrame, orient=tk.VERTICAL,
+                                command=gui.assetErrorList.yview)
+    gui.assetErrorList.configure(yscrollcommand=errorScroll.set)
+    errorScroll.pack(side=tk.RIGHT, fill=tk.Y)
+    gui.assetErrorList.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
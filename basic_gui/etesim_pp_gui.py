@@ -20,7 +20,6 @@ Todo
     * Incorporate high side datatypes
     * Use ETESim folder class as driver for input data
     * Subtype ETESim Radars and Launchers as FixedAsset datatypes
-    * Create AssetList which takes anything of type FixedAsset
     * Guarantee that ETESim Radars and Launchers use similar members
     * Add options for size/color of asset markers in GUI
     * Add option to display assets or not in GUI
@@ -31,10 +30,16 @@ Todo
 import callback_functions as cf
 import element_builder as eb
 import extra_functions as ef
+import filter_functions as flt
 import plot_options_functions as pof
+import plotting_functions as plf
+import proximity_functions as prox
+import render_functions as rf
+import summary_functions as sf
+import timing_functions as tm
 
 # Module-Level Imports
-import itertools
+import contextlib
 import time
 import multiprocessing as mp
 import numpy as np
@@ -44,16 +49,8 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 
-# matplotlib imports
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
-
-# Imports and settings for Tkinter
-import matplotlib
-matplotlib.use("TkAgg")  # To use with Tkinter
+# matplotlib is imported when the Viewer tab is first built (see
+# buildViewer), so the window appears without waiting for it
 
 mp.freeze_support()
 
@@ -96,23 +93,55 @@ class SimpleGUI(tk.Tk):
 
         """
 
+        startTime = time.time()
+
         # initializing and adding a GUI icon and title
         tk.Tk.__init__(self, *args, **kwargs)
         tk.Tk.iconbitmap(self, default="images/window_icon_radar.ico")
         tk.Tk.wm_title(self, "ETESim Plotting Suite")
         self.geometry("850x550+150+50")
 
-        # A temporary variable for waiting for the user to stop typing
-        self._after_id = None
+        # Every plot request goes through the scheduler, which waits for
+        # a burst of changes (or typing) to stop before plotting once
+        self.plotScheduler = rf.PlotScheduler(self.after, self.after_cancel,
+                                              self.drawPlot)
+
+        # Plots are rendered in the background and checked on with after()
+        self.renderer = rf.PlotRenderer()
+        self._render_id = None
+        self.renderStartTime = None
+        self.previewImage = None
+        self.renderSpec = None
+        self.renderSize = None
+        self.renderView = None
+        self.displayedView = None
+
+        # A profile of the next plot, when the user asks for one
+        self.profileCapture = None
+
+        # Plots are thinned to this many points per trajectory once the
+        # memory budget is exceeded (None draws every point)
+        self.renderPointLimit = None
+
+        # Finished plots are cached per data version and plot spec
+        self.dataVersion = ''
+        self.figureCache = rf.FigureCache()
 
         # We need to set some initial values for the GUI not to crash
         self.plotCols = ['']
         self.dimensions = 2
-        self.x = []
-        self.y = []
-        self.z = []
         self.missileDF = pd.DataFrame({' ': []})
-        self.assets = []
+        self.trajectoryIndex = plf.TrajectoryIndex(self.missileDF)
+        self.runSummary = sf.trajectorySummary(self.missileDF,
+                                               self.trajectoryIndex)
+        self.trajectoryFilter = flt.TrajectoryFilter(self.missileDF,
+                                                     self.trajectoryIndex,
+                                                     summary=self.runSummary)
+        self.assetTable = ef.allAssets([])
+        self.assets = ef.assetsDF(self.assetTable)
+        self.assetIndex = prox.AssetIndex(self.assets)
+        self.assetPlotCache = {}
+        self.assetErrors = []
         self.toolbar = None
         self.figure = None
         self.canvas = None
@@ -176,6 +205,7 @@ class SimpleGUI(tk.Tk):
                                           command=lambda: self.startPlot(1), )
         # By default, this should not be seen on the data input tab
         self.xkcdModeCB.pack_forget()
+        tm.timings.add('startup.window', time.time() - startTime)
 
     def buildTabs(self, parent: ttk.Notebook) -> None:
         """
@@ -208,33 +238,68 @@ class SimpleGUI(tk.Tk):
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         # Tab 2: Visualizer
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-        viewTab = ttk.Frame(parent,)
+        # Its contents are built when it is first needed (see buildViewer)
+        self.viewTab = ttk.Frame(parent,)
         viewTab_kwargs = {'text': 'Viewer', 'image': self.viewTabIcon,
                           'compound': tk.LEFT}
-        parent.add(viewTab, **viewTab_kwargs)
+        parent.add(self.viewTab, **viewTab_kwargs)
+        self.viewerBuilt = False
 
-        # - - - - - - - - - - - - - - - -
-        # Holder for editor/viewer
-        graphPanes = ttk.Panedwindow(viewTab, orient=tk.HORIZONTAL)
-        graphPanes.pack(fill=tk.BOTH, expand=True)
+        # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+        # Tab 3: Diagnostics
+        # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+        diagnosticsTab = ttk.Frame(parent,)
+        parent.add(diagnosticsTab, text='Diagnostics')
+        eb.buildDiagnosticsElements(self, diagnosticsTab, )
 
-        self.editPane, self.viewPane = eb.buildEditAndViewPanes(graphPanes)
+    def buildViewer(self) -> None:
+        """
+        Builds the contents of the Viewer tab: the plot editor and the
+        pane plots are shown in. Importing matplotlib for the Tk canvas
+        takes a noticeable part of startup, so this is put off until the
+        tab is first selected or data is loaded. Calling it again does
+        nothing.
 
-        eb.buildEditorElements(self, self.editPane, self.plotCols,
-                               self.availableRuns, self.waitToPlot,
-                               self.startPlot)
+        Returns
+        -------
+        None
 
-        # Setting the starting run options
-        cf.setRunOptions(self, )
+        """
+        if self.viewerBuilt:
+            return
+        self.viewerBuilt = True
+
+        with tm.timer('startup.viewer'):
+            import matplotlib
+            matplotlib.use("TkAgg")  # To use with Tkinter
+
+            # - - - - - - - - - - - - - - - -
+            # Holder for editor/viewer
+            graphPanes = ttk.Panedwindow(self.viewTab,
+                                         orient=tk.HORIZONTAL)
+            graphPanes.pack(fill=tk.BOTH, expand=True)
+
+            self.editPane, self.viewPane = eb.buildEditAndViewPanes(
+                                                                graphPanes)
+
+            # Shows snapshots of plots while they are rendered
+            self.previewLabel = tk.Label(self.viewPane)
+
+            eb.buildEditorElements(self, self.editPane, self.plotCols,
+                                   self.availableRuns, self.waitToPlot,
+                                   self.startPlot)
+
+            # Setting the starting run options
+            cf.setRunOptions(self, )
 
     ####################################################################
     # Utility functions
     ####################################################################
     def waitToPlot(self, event=None) -> None:
         """
-        Creates a queue to wait for an event to finish. This allows users
-        to enter multiple keystrokes or perform other actions before the
-        GUI automatically updates.
+        Requests a plot that waits for an event to finish. This allows
+        users to enter multiple keystrokes or perform other actions before
+        the GUI automatically updates.
 
         A particular usage is in letting users enter a title without the
         GUI trying to update the graph after after each letter.
@@ -249,13 +314,7 @@ class SimpleGUI(tk.Tk):
         None
 
         """
-
-        # cancel the old job
-        if self._after_id is not None:
-            self.after_cancel(self._after_id)
-
-        # create a new job
-        self._after_id = self.after(1500, lambda: self.startPlot(event=event))
+        self.plotScheduler.request(typing=True)
 
     def autosizer(self, tabs, event=None) -> None:
         """
@@ -277,94 +336,65 @@ class SimpleGUI(tk.Tk):
     ####################################################################
     # Plotting functions
     ####################################################################
-    def assetPlotDF(self, showAllRuns: bool, specialRun: int,) -> pd.DataFrame:
+    def assetPlotDF(self, spec: plf.PlotSpec) -> pd.DataFrame:
         """
         The DataFrame used to plot fixed assets on top of trajectories.
+        Frames are cached per column/run selection, so re-plotting the
+        same selection does not rebuild them.
 
         Parameters
         ----------
-        showAllRuns : bool
-            A flag for whether only select trajectories are being displayed
-        specialRun : int
-            The run of interest in case showAllRuns is false
+        spec : PlotSpec
+            The plot configuration (see plotSettings)
 
         Returns
         -------
         Pandas DataFrame
             An index of information containing metadata and location data for
-            the assets we intend to plot.
+            the assets we intend to plot, with duplicates removed.
 
         """
 
-        xCol, yCol, zCol = list(map(ef.assetColMap,
-                                    [self.xCol, self.yCol, self.zCol]))
-
-        if not showAllRuns:
-            assets = self.assets.query(f'run == {specialRun}')
-        else:
-            assets = self.assets
-
-        if xCol is None or yCol is None:
-            return None
-        elif self.dimensions == 3 and zCol is None:
-            return None
-        else:
-            dict_ = {'x': assets[xCol].values,
-                     'y': assets[yCol].values,
-                     'name': assets.name.values,
-                     'id': assets.id.values, }
-            if self.dimensions == 3:
-                dict_['z'] = assets[zCol].values
-
-        return pd.DataFrame(dict_)
+        # The run only matters when a single run is being shown
+        runKey = None if spec.showAllRuns else spec.run
+        zCol = spec.zCol if self.dimensions == 3 else None
+        cacheKey = (spec.xCol, spec.yCol, zCol, runKey)
+        if cacheKey not in self.assetPlotCache:
+            self.assetPlotCache[cacheKey] = plf.assetPlotDF(self.assets, spec)
+        return self.assetPlotCache[cacheKey]
 
-    def missilePlotDF(self) -> pd.DataFrame:
+    def missilePlotData(self, spec: plf.PlotSpec) -> plf.PlotData:
         """
-        Generates a smaller dataframe for plotting from the massive
-        one stored in memory
+        Hands the selected columns of the massive DataFrame stored in
+        memory to the plotting code, without copying them
+
+        Parameters
+        ----------
+        spec : PlotSpec
+            The plot configuration (see plotSettings)
 
         Returns
         -------
-        plotDF : pd.DataFrame
-            A 2 or 3 column Pandas DataFrame containing the x, y, and
-            sometimes z data for plotting
+        PlotData
+            The x, y, and sometimes z data for plotting and the
+            trajectories to draw
 
         """
-
-        # The columns we need in addition to the x/y/z data
-        keepCols = ['RunNumber', 'Model', 'Instance']
-
-        # Setting up a renaming convention to make plotting easier
-        xyzRenamer = {self.xCol.get(): 'x', self.yCol.get(): 'y',
-                      self.zCol.get(): 'z'}
-
-        # Determining which columns to keep
-        plotCols = [self.xCol.get(), self.yCol.get()]
-        if self.dimensions == 3:
-            plotCols.append(self.zCol.get())
-
-        # Downselecting DataFrame based on these columns
-        # Keeping Unique ID so we can plot each ID separately
-        pDF = self.missileDF[keepCols + plotCols].copy()
-
-        # If we don't want to show all the runs and don't
-        # want them to be transparent, we can downselect the values now
-        if not self.showAllRuns.get() and not self.transparentRuns.get():
-            pDF = pDF.query(f'RunNumber=={self.run.get()}').copy()
-
-        # This will allow us to reference plotDF.x
-        # instead of having to call plotDF[self.xCol.get()], for example
-        pDF.rename(columns=xyzRenamer, inplace=True)
+        pData = plf.missilePlotData(self.missileDF, spec,
+                                    self.trajectoryIndex,
+                                    self.trajectoryFilter)
+        self.filterCount.set(f'{len(pData.trajectories)} of '
+                             f'{len(self.trajectoryIndex)} trajectories')
 
         if self.plotEngine == 'mpl':   # No need for extra work here
-            return pDF
+            return pData
         else:
-            return ef.seabornDF(self, pDF)
+            return ef.seabornDF(self, pData)
 
     def startPlot(self, event=None, item=None, mode=None) -> None:
         """
-        Sets up all the variables and options necessary to generate
-        a plot in the viewer pane.
+        Requests a new plot in the viewer pane. The plot is made by
+        drawPlot once the plot scheduler stops receiving requests.
 
         Parameters
         ----------
@@ -386,17 +416,66 @@ class SimpleGUI(tk.Tk):
         None
 
         """
-        startTime = time.time()
 
         # If there's no reason to update, don't update
         if event is None:
             print(event, item, mode)    # This is mostly for debugging
             return
 
+        # Bursts of requests are coalesced into a single plot
+        self.plotScheduler.request()
+
+    def drawPlot(self) -> None:
+        """
+        Generates the plot in the viewer pane. Called by the plot
+        scheduler once requests have stopped coming in.
+
+        Returns
+        -------
+        None
+
+        """
+        startTime = time.time()
+        if self.profileCapture is None:
+            self.profileCapture = cf.startProfile(self, 'plot')
+
         # This originally had options for other types of graphs
         # It is left here in case that option decides to come back
         if self.plotEngine == 'mpl':
-            self.startMatPlot(startTime, event, item, mode)
+            with self.profiling():
+                self.startMatPlot(startTime)
+
+        # A plot that needed no render has been profiled in full
+        if not self.renderer.busy:
+            self.finishProfile()
+
+    def profiling(self):
+        """
+        Profiles the code run inside the with-statement if a plot is being
+        profiled (see callback_functions.startProfile).
+
+        Returns
+        -------
+        context manager
+            The profiling context, or one that does nothing
+
+        """
+        if self.profileCapture is None:
+            return contextlib.nullcontext()
+        return self.profileCapture.profiled()
+
+    def finishProfile(self) -> None:
+        """
+        Writes the reports of the plot being profiled, if any.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.profileCapture is not None:
+            cf.finishProfile(self, self.profileCapture)
+            self.profileCapture = None
 
     def startMatPlot(self, startTime: float, event=None,
                      item=None, mode=None) -> None:
@@ -426,284 +505,297 @@ class SimpleGUI(tk.Tk):
 
         """
 
-        # Close old figure and toolbar if they already exist
-        if None not in (self.figure, self.canvas, self.toolbar):
-            plt.close(self.figure)
-            self.canvas.get_tk_widget().pack_forget()
-            self.toolbar.pack_forget()
-
-        # Loading data for plotting
-        cf.setVals(self, )
+        # Guarantees dimensions are up to date
+        cf.setDimensions(self, )
 
         # Setting the run numbers to consider
         cf.setRunOptions(self, )
 
         # If there is nothing to plot, leave canvas blank
         if self.dimensions == 0:
+            self.stopRender()
+            self.closeFigure()
+            return
+
+        # Minor gridlines do not work with xkcd styling
+        if self.xkcdMode.get() and self.gridMinor.get():
+            self.gridMinor.set(False)
+            self.status.set('Minor grid not allowed in XKCD Mode')
+        spec = self.plotSettings().effective()
+
+        # Nothing to do if this plot is already shown or being rendered
+        view = (self.dataVersion, spec, self.assetHover.get())
+        if view == self.displayedView and self.canvas is not None:
+            self.stopRender()
+            self.plotScheduler.unchanged()
+            return
+        if view == self.renderView and self.renderer.busy:
+            self.plotScheduler.unchanged()
+            return
+
+        # Close old figure and toolbar if they already exist
+        self.closeFigure()
+
+        # Going back to a plot that is still in memory needs no render
+        cached = self.figureCache.get(self.dataVersion, spec)
+        if cached is not None:
+            self.renderer.cancel()
+            self.finishMatPlot(startTime, spec, *cached, cached=True)
             return
 
-        # Settng up canvas to draw plot
-        if self.xkcdMode.get():             # Easter Egg Mode
-            with plt.xkcd():
-                if self.gridMinor.get():
-                    self.gridMinor.set(False)
-                    self.status.set('Minor grid not allowed in XKCD Mode')
-                self.figure = plt.Figure(figsize=(6, 4))
-                self.finishMatPlot(startTime)
+        # Constructing dataframes that contain data for plotting
+        with tm.timer('plot.data'):
+            pData = self.missilePlotData(spec)
+            aDF = self.assetPlotDF(spec)
+
+        # Rendering at the size of the viewer so previews fit the pane
+        dpi = self.winfo_fpixels('1i')
+        width, height = (self.viewPane.winfo_width(),
+                         self.viewPane.winfo_height())
+        if width > 1 and height > 1:
+            figsize = (width / dpi, height / dpi)
         else:
-            self.figure = plt.Figure(figsize=(3, 2))
-            self.finishMatPlot(startTime)
+            figsize = None
+
+        # A bitmap cached on disk is shown until the render finishes
+        self.figureCache.cacheDir = (ef.cacheDir(self.topDir, 'plots')
+                                     if self.diskCache.get() else None)
+        self.renderSize = (width, height)
+        image = self.figureCache.getImage(self.dataVersion, spec,
+                                          self.renderSize)
+        if image is not None:
+            self.showPreview(image)
+
+        # Any render still in flight is superseded by this one
+        self.renderStartTime = startTime
+        self.renderSpec = spec
+        self.renderView = view
+        self.renderer.submit(spec, pData, aDF, figsize, dpi,
+                             capture=self.profileCapture)
 
-    def finishMatPlot(self, startTime: float) -> None:
+        # Switching out status label for a plot progress bar
+        self.status.hide()
+        self.plotProgress.set(0)
+        self.plotProgressLbl.set('')
+        self.plotProgressFrame.pack(fill=tk.BOTH, side=tk.LEFT)
+
+        if self._render_id is None:
+            self._render_id = self.after(50, self.pollRender)
+
+    def closeFigure(self) -> None:
         """
-        Generates a new plot on the figure set up in startPlot.
+        Removes the plot shown in the viewer pane, if any.
 
-        Parameters
-        ----------
-        startTime : float
-            The time plotting began. Used to update the user on total
-            rendering time.
+        Returns
+        -------
+        None
+
+        """
+        # Figures are made without pyplot, so there is nothing to close
+        if None not in (self.figure, self.canvas, self.toolbar):
+            self.canvas.get_tk_widget().destroy()
+            self.toolbar.destroy()
+            self.canvas, self.toolbar = None, None
+        self.displayedView = None
+
+    def stopRender(self) -> None:
+        """
+        Cancels the plot being rendered in the background, if any, and
+        removes its preview and progress bar.
 
         Returns
         -------
         None
 
         """
+        self.renderer.cancel()
+        self.renderView = None
+        self.previewLabel.pack_forget()
+        self.plotProgressFrame.pack_forget()
+        self.status.show()
 
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.viewPane)
-        self.canvas.draw()
+    def pollRender(self) -> None:
+        """
+        Checks on the plot being rendered in the background. Progress
+        updates the progress bar and shows any snapshot of the partially
+        drawn figure. A finished figure is handed to finishMatPlot.
 
-        # Setting up subplot for showing all the plots
-        subplot_kwargs = {'projection': '3d' if self.dimensions == 3 else None}
-        myplot = self.figure.add_subplot(111, **subplot_kwargs)
+        Returns
+        -------
+        None
 
-        # Constructing dataframe that contains data for plotting
-        pDF = self.missilePlotDF()
-        aDF = self.assetPlotDF(self.showAllRuns.get(), self.run.get())
+        """
+        self._render_id = None
+        for message in self.renderer.poll():
+            kind = message[0]
+            if kind == 'progress':
+                k, numDFs, image = message[2:]
+                self.plotProgress.set(100*(k+1)/(numDFs))
+                self.plotProgressLbl.set(f'{k+1}/{numDFs} complete')
+                if image is not None:
+                    self.showPreview(image)
+            elif kind == 'done':
+                with self.profiling():
+                    self.finishMatPlot(self.renderStartTime,
+                                       self.renderSpec, *message[2:])
+                self.finishProfile()
+            elif kind == 'error':
+                self.previewLabel.pack_forget()
+                self.plotProgressFrame.pack_forget()
+                self.status.show()
+                self.status.set(f'Plot failed: {message[2]}')
+                self.finishProfile()
+
+        # Checking back until the render finishes
+        if self.renderer.busy:
+            self._render_id = self.after(50, self.pollRender)
+
+    def showPreview(self, image: str) -> None:
+        """
+        Shows a snapshot of a partially rendered plot in the viewer pane.
 
-        # Setting all possible permutations for plotting data
-        # TODO: Figure out a less janky way to do this
-        numDFs = sum([x.RunNumber.nunique() for x in
-                      [pDF.query(f'Model=="{m}" and Instance=="{i}"')
-                       for (m, i)
-                       in itertools.product(pDF.Model.unique(),
-                                            pDF.Instance.unique())]])
+        Parameters
+        ----------
+        image : str
+            A base64-encoded PNG of the figure
 
-        # This guarantees the spectrum remains the same regardless
-        # of how many items you simultaneously plot
-        self.autoColors = cm.rainbow(np.linspace(0, 1, numDFs))
+        Returns
+        -------
+        None
 
-        # Switching out status label for a plot progress bar
-        self.status.hide()
-        self.plotProgressFrame.pack(fill=tk.BOTH, side=tk.LEFT)
+        """
+        # The image must stay referenced or tkinter will discard it
+        self.previewImage = tk.PhotoImage(data=image)
+        self.previewLabel.config(image=self.previewImage)
+        self.previewLabel.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+    def finishMatPlot(self, startTime: float, spec: plf.PlotSpec, figure,
+                      myplot, assetCollections: list,
+                      cached: bool = False) -> None:
+        """
+        Shows a figure rendered in the background on an interactive
+        canvas in the viewer pane, and caches it.
+
+        Parameters
+        ----------
+        startTime : float
+            The time plotting began. Used to update the user on total
+            rendering time.
+        spec : PlotSpec
+            The plot configuration the figure was rendered from
+        figure : matplotlib.figure.Figure
+            The rendered figure
+        myplot : matplotlib.axes._subplots.AxesSubplot
+            The subplot that was drawn
+        assetCollections : list
+            The asset collections that were drawn
+            (see plotting_functions.drawAssets)
+        cached : bool, optional
+            Whether the figure came from the cache. The default is False.
 
-        # All the random options needed to plot
-        plotOptions = self.plotOptions()
+        Returns
+        -------
+        None
 
-        # Looping through all possible unique IDs and model numbers
-        # and plotting each individual DataFrame
-        groups = ['RunNumber', 'Model', 'Instance']
-        for dataPack in enumerate(pDF.groupby(groups)):
-            k = dataPack[0]
-            if k % 20 == 0:
+        """
+        from matplotlib.backends.backend_tkagg import (FigureCanvasTkAgg,
+                                                       NavigationToolbar2Tk)
+        self.figure = figure
+        self.displayedView = (self.dataVersion, spec, self.assetHover.get())
+        # Drawing waits for any xkcd render, so its style is not picked up
+        with plf.styleLock:
+            self.canvas = FigureCanvasTkAgg(self.figure,
+                                            master=self.viewPane)
+            with tm.timer('plot.draw'):
                 self.canvas.draw()
-                self.plotProgress.set(100*(k+1)/(numDFs))
-                self.plotProgressLbl.set(f'{k+1}/{numDFs} complete')
-            makePlot(myplot, dataPack, plotOptions)
-
-        # Plotting each asset alongside the trajectories
-        # unless downselection is specified by the user
-        if aDF is not None:
-            for asset in aDF.drop_duplicates().itertuples():
-                assetArgs = [[asset.x], [asset.y], ]
-                if self.dimensions == 3:
-                    assetArgs += [[asset.z]]
-                label = f'{asset.name} - {asset.id}'
-                myplot.scatter(*assetArgs, marker='*', color='green',
-                               s=400, label=label)
-
-        # Removing the plot progress bar and setting status back to normal
-        self.plotProgressFrame.pack_forget()
-        self.status.show()
 
-        # Show legend if selected
-        if self.showLegend.get():
-            legend_kwargs = {'title': 'Run Number: Element - Instance',
-                             'fancybox': True, 'shadow': True, }
-
-            # Setting the location for the legend based on user input
-            if self.legendLoc.get() == 'Best':
-                pass
-            elif self.legendLoc.get() == 'Outside Right':
-                legend_kwargs['bbox_to_anchor'] = (1.1, 1.0)
-
-            myplot.legend(**legend_kwargs)
-
-        # Adding Axes Labels
-        if self.showXLabel.get():
-            myplot.set_xlabel(self.xCol.get())
-        if self.showYLabel.get():
-            myplot.set_ylabel(self.yCol.get())
-        if self.dimensions == 3 and self.showZLabel.get():
-            myplot.set_zlabel(self.zCol.get())
-
-        # Adding gridlines, if necessary
-        if self.gridMajor.get() and self.dimensions == 2:
-            myplot.grid(b=True, which='major', alpha=0.8)
-        if self.gridMinor.get() and self.dimensions == 2:
-            myplot.minorticks_on()
-            myplot.grid(b=True, which='minor', alpha=0.2, linestyle='--',)
+        # Caching the figure (and, if asked, a bitmap of it on disk)
+        if not cached:
+            rendered = (figure, myplot, assetCollections)
+            self.figureCache.put(self.dataVersion, spec, rendered)
+            if self.figureCache.cacheDir is not None:
+                self.figureCache.putImage(self.dataVersion, spec,
+                                          self.renderSize,
+                                          rf.canvasImage(self.canvas))
+
+        if self.assetHover.get() and len(assetCollections) > 0:
+            pof.connectAssetHover(self.canvas, myplot, assetCollections)
         else:
-            self.status.set('')
-
-        # Setting the min/max values for each variable
-        (xMin, xMax, yMin, yMax, zMin, zMax) = pof.getLimits(self, myplot)
-        myplot.set_xlim(xMin, xMax)
-        myplot.set_ylim(yMin, yMax)
-        if self.dimensions == 3:
-            myplot.set_zlim(zMin, zMax)
-
-        # Adding title with options, if necessary
-        if self.titleText.get() != '':
-            plotTitle = self.titleText.get()
-            fontdict = {'fontsize': int(self.titleSize.get()),
-                        'color': self.titleColorHex.get(),
-                        'style': 'italic' if self.itTitleOn else 'normal',
-                        'fontweight': 'bold' if self.boldTitleOn else 'normal'}
-            myplot.set_title(plotTitle, fontdict=fontdict)
+            pof.disconnectAssetHover(self.canvas, myplot)
+
+        # Removing the preview and progress bar and setting status
+        # back to normal
+        self.previewLabel.pack_forget()
+        self.previewImage = None
+        self.plotProgressFrame.pack_forget()
+        self.status.show()
 
         # Packing plot into GUI and adding toolbar
         self.canvas.get_tk_widget().pack(side=tk.BOTTOM,
                                          fill=tk.BOTH,
                                          expand=True)
-        self.toolbar = NavigationToolbar2Tk(self.canvas, self.viewPane)
-        self.toolbar.update()
+        with plf.styleLock:
+            self.toolbar = NavigationToolbar2Tk(self.canvas, self.viewPane)
+            self.toolbar.update()
         self.canvas._tkcanvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
         # Updating the user on the time it took to plot
         totalTime = time.time() - startTime
-        self.status.set(f'Plot rendered in {totalTime:.1f}s')
+        self.plotScheduler.rendered(totalTime)
+        tm.timings.add('plot.cached' if cached else 'plot.total', totalTime)
+        if cached:
+            self.status.set(f'Plot loaded from cache in {totalTime:.1f}s')
+        else:
+            self.status.set(f'Plot rendered in {totalTime:.1f}s')
 
-    def plotOptions(self) -> tuple:
+        # Rendered figures count against the memory budget too
+        cf.enforceMemoryBudget(self)
+
+    def plotSettings(self) -> plf.PlotSpec:
         """
-        A shorthand for aggregating all the different plot options
-        the user can specify
+        Gathers every plot option the user can specify from the GUI into
+        a PlotSpec, so the plotting code does not need to read tkinter
+        variables.
 
         Returns
         -------
-        plotStyle : str
-            Choices are "line" or "scatter"
-        showAllRuns : bool
-            Whether to display all runs at once or only certain ones
-        transparentRuns : bool
-            Whether, when showAllRuns is False, to display the other runs
-            faded out
-        specialRun : int
-            The user-specified run to analyze
-        autoColor : bool
-            Whether the trajectories should be colored automatically
-        plotColor : str
-            A user-specified color for trajectories
-        dimensions : int
-            Choices are 2 or 3
-        lineStyle : str
-            Options for different line styles. (Full, dashed, etc.)
-        scatterStyle : str
-            Options for different scatter plot markers.
-        colors : str
-            The colors to use if autoColor is set to True
-
-        """
-
-        plotStyle = self.plotStyle.get()
-        showAllRuns = self.showAllRuns.get()
-        transparentRuns = self.transparentRuns.get()
-        specialRun = self.run.get()
-        autoColor = self.autoColor.get()
-        plotColor = self.plotColorEntry.get()
-        dimensions = self.dimensions
-        lineStyle = self.lineStyle.get()
-        scatterStyle = self.scatterStyle.get()
-        colors = self.autoColors
-
-        return (plotStyle, showAllRuns, transparentRuns,
-                specialRun, autoColor, plotColor,
-                dimensions, lineStyle, scatterStyle, colors)
-
-
-def makePlot(ax: plt.Figure, itPack: tuple, options: tuple) -> None:
-    """
-    Generates a plot for the specified packed data with given options on
-    the supplied plot handle
-
-    Parameters
-    ----------
-    ax : plt.Figure
-        A handle for the figure to plot upon
-    itPack : tuple
-        A pack containing the following:
-            k:          An index for keeping track of colors/progress
-            run:        The run number of the trajectory
-            model:      The model of the object whose trajectory is plotted
-            instance:   The simulation instance of the object
-            df:         A DataFrame containing the trajectory data
-    options : tuple
-        A pack containing the following:
-            plotStyle : str
-                Choices are "line" or "scatter"
-            showAllRuns : bool
-                Whether to display all runs at once or only certain ones
-            transparentRuns : bool
-                Whether, when showAllRuns is False, to display the other runs
-                faded out
-            specialRun : int
-                The user-specified run to analyze
-            autoColor : bool
-                Whether the trajectories should be colored automatically
-            plotColor : str
-                A user-specified color for trajectories
-            dimensions : int
-                Choices are 2 or 3
-            lineStyle : str
-                Options for different line styles. (Full, dashed, etc.)
-            scatterStyle : str
-                Options for different scatter plot markers.
-            colors : str
-                The colors to use if autoColor is set to True
-
-    Returns
-    -------
-    None
-
-    """
-
-    k, ((run, model, instance), df) = itPack
-
-    plotStyle, showAllRuns, transparentRuns = options[0:3]
-    specialRun, autoColor, plotColor = options[3:6]
-    dimensions, lineStyle, scatterStyle, colors = options[6:10]
-
-    shouldFade = not showAllRuns and transparentRuns and run != specialRun
-
-    plot_kwargs = {'label': f'{run}: {model} - {instance}',
-                   'alpha': 1.0 - (0.8 * shouldFade),
-                   'color': colors[k] if autoColor else plotColor,
-                   }
-
-    plotlist = [df.x, df.y] + ([df.z] if dimensions == 3 else [])
-
-    if plotStyle == 'line':
-        ax.plot(*plotlist, **plot_kwargs, linestyle=lineStyle)
-    else:
-        ax.scatter(*plotlist, **plot_kwargs, marker=scatterStyle)
-    return
+        PlotSpec
+            The plot configuration currently shown in the editor
 
+        """
+        return plf.PlotSpec(
+            xCol=self.xCol.get(),
+            yCol=self.yCol.get(),
+            zCol=self.zCol.get(),
+            plotStyle=self.plotStyle.get(),
+            lineStyle=self.lineStyle.get(),
+            scatterStyle=self.scatterStyle.get(),
+            autoColor=self.autoColor.get(),
+            plotColor=self.plotColorEntry.get(),
+            showAllRuns=self.showAllRuns.get(),
+            transparentRuns=self.transparentRuns.get(),
+            run=self.run.get() if self.availableRuns.size > 0 else None,
+            showLegend=self.showLegend.get(),
+            legendLoc=self.legendLoc.get(),
+            showXLabel=self.showXLabel.get(),
+            showYLabel=self.showYLabel.get(),
+            showZLabel=self.showZLabel.get(),
+            gridMajor=self.gridMajor.get(),
+            gridMinor=self.gridMinor.get(),
+            limits=pof.userLimits(self),
+            **pof.userFilters(self),
+            maxPoints=self.renderPointLimit,
+            title=self.titleText.get(),
+            titleSize=int(self.titleSize.get()),
+            titleColor=self.titleColorHex.get(),
+            titleBold=bool(self.boldTitleOn),
+            titleItalic=bool(self.itTitleOn),
+            xkcd=self.xkcdMode.get(), )
 
 # To prevent this running automatically if imported
 if __name__ == "__main__":
     app = SimpleGUI()
     try:
-        assert Axes3D  # to silence the linter
         app.mainloop()
     except KeyboardInterrupt:
         app.destroy()
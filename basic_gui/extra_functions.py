@@ -2,16 +2,23 @@
 
 # AICET Imports
 import data_input_objects as dio
+import timing_functions as tm
 
 # Module-Level Imports
+import hashlib
 import os
 import platform
 import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Aliased Module-Level Imports
 import itertools as it
+import numpy as np
 import pandas as pd
-import tkinter as tk
+
+# A problem found while parsing an asset file
+AssetParseError = namedtuple('AssetParseError', ['path', 'line', 'message'])
 
 
 ####################################################################
@@ -190,50 +197,113 @@ def dirTree(root: str) -> list:
     return tree
 
 
-def assetGroups(assetTextList):
+def assetRecords(assetFile: str, errors: list = None):
+    """
+    A streaming parser which reads an asset file one line at a time and
+    yields each asset as soon as it is complete. Lines that cannot be
+    understood are skipped and reported rather than stopping the parse.
+
+    Each asset starts with a "# Asset" line and is followed by lines of
+    the form "<Field>: <value(s)>".
+
+    Parameters
+    ----------
+    assetFile : str
+        A file to parse
+    errors : list, optional
+        If given, an AssetParseError is appended for every line that
+        could not be parsed. The default is None.
+
+    Yields
+    ------
+    lineNum : int
+        The line number of the "# Asset" line starting the record
+    record : dict
+        A mapping of each field name to the list of its values
+
+    """
+    record, start = None, 0
+    with open(assetFile, 'r') as inFile:
+        for lineNum, line in enumerate(inFile, start=1):
+            line = line.strip()
+            if len(line) == 0:
+                continue
+
+            # A new header means the previous asset is complete
+            if line.lower() == '# asset':
+                if record is not None:
+                    yield start, record
+                record, start = {}, lineNum
+                continue
+
+            field, sep, data = line.partition(':')
+            if record is None or not sep:
+                reportAssetError(errors, assetFile, lineNum,
+                                 f'Unrecognized line "{line}"')
+                continue
+            record[field.strip()] = data.split()
+
+    if record is not None:
+        yield start, record
+
+
+def reportAssetError(errors: list, assetFile: str, lineNum: int,
+                     message: str) -> None:
+    """
+    Records a problem found while parsing an asset file.
+
+    Parameters
+    ----------
+    errors : list
+        The list to add the error to. If None, nothing is recorded.
+    assetFile : str
+        The file being parsed
+    lineNum : int
+        The line number where the problem was found
+    message : str
+        A description of the problem
+
+    Returns
+    -------
+    None
+
+    """
+    if errors is not None:
+        errors.append(AssetParseError(assetFile, lineNum, message))
+
+
+def assetCoords(values: list) -> list:
     """
-    Reads a text list containing assets and separates them into
-    a list of dictionaries where each dictionary contains the appropriate
-    metadata for each asset.
+    Converts the values for a coordinate field into three floats.
 
     Parameters
     ----------
-    assetTextList : list
-        A list of strings where each element is a sequential line
-        from a text file.
+    values : list
+        The values (as strings) read from the asset file
+
+    Raises
+    ------
+    ValueError
+        If there are not exactly three numeric values.
 
     Returns
     -------
-    groups : list
-        A list of dictionaries, each containing metadata for an asset.
-
-    """
-    groups = []
-    k = 0
-    n = len(assetTextList)
-    while k < n:
-        if assetTextList[k].lower() == '# asset':
-            subGroup = {}
-            j = k + 1
-            while j < n and assetTextList[j].lower() != '# asset':
-                _type, data = assetTextList[j].split(':')
-                data = data.split()
-                if len(data) == 1:
-                    subGroup[_type] = data[0]
-                else:
-                    subGroup[_type] = data
-                j += 1
-            groups.append(subGroup)
-            k = j
-    return groups
-
-
-def assetData(assetFile: str, simulation: str = 'etesim'):
-    """
-    A parser that performs the following:
-        (1) Strips out all empty lines
-        (2) Strips out leading/trailing whitespace and newline characters
-        (3) Converts each remaining line to an element in a list
+    list
+        The coordinate as three floats
+
+    """
+    if len(values) != 3:
+        raise ValueError(f'Expected 3 coordinates, found {len(values)}')
+    return [float(x) for x in values]
+
+
+def assetData(assetFile: str, simulation: str = 'etesim',
+              table: dio.AssetTable = None,
+              errors: list = None) -> dio.AssetTable:
+    """
+    Parses an asset file and appends each asset to an AssetTable as it
+    is read. Assets with missing or invalid fields are skipped and
+    reported with the line number where the asset begins.
 
     Parameters
     ----------
@@ -241,38 +311,50 @@ def assetData(assetFile: str, simulation: str = 'etesim'):
         A file to parse
     simulation : str, optional
         A simulation specifier for "smart" splitting. The default is 'etesim'.
+    table : dio.AssetTable, optional
+        An existing table to append the assets to. If None, a new
+        table is created. The default is None.
+    errors : list, optional
+        If given, an AssetParseError is appended for every line or
+        asset that could not be parsed. The default is None.
 
     Returns
     -------
-    objs : TYPE
-        DESCRIPTION.
-
-    """
-    with open(assetFile, 'r') as inFile:
-        items = [x.strip() for x in inFile.readlines() if len(x.strip()) > 0]
-
-    objs = []
-    for asset in assetGroups(items):
-        run_number = asset['Run']
-        category = asset['Category']
-        name = asset['Name']
-        ID = asset['UniqueID']
-        kwargs = {}
-        if 'ECEF XYZ' in asset:
-            kwargs['ecef'] = [float(x) for x in asset['ECEF XYZ']]
-        if 'LatLonAlt' in asset:
-            kwargs['lla'] = [float(x) for x in asset['LatLonAlt']]
-        if 'ENU' in asset:
-            kwargs['enu'] = [float(x) for x in asset['ENU']]
-        objs.append(dio.FixedAsset(simulation, name, category, ID,
-                                   run_number, **kwargs))
-    return objs
+    table : dio.AssetTable
+        The table holding every asset found in the file
+
+    """
+    if table is None:
+        table = dio.AssetTable()
+
+    coordFields = (('ecef', 'ECEF XYZ'), ('lla', 'LatLonAlt'), ('enu', 'ENU'))
+
+    for lineNum, asset in assetRecords(assetFile, errors=errors):
+        try:
+            run_number = int(' '.join(asset['Run']))
+            category = ' '.join(asset['Category'])
+            name = ' '.join(asset['Name'])
+            ID = ' '.join(asset['UniqueID'])
+            kwargs = {key: assetCoords(asset[field])
+                      for key, field in coordFields if field in asset}
+            table.append(simulation, name, category, ID, run_number,
+                         **kwargs)
+        except KeyError as ke:
+            reportAssetError(errors, assetFile, lineNum,
+                             f'Asset is missing field {ke}')
+        except ValueError as ve:
+            reportAssetError(errors, assetFile, lineNum,
+                             f'Invalid asset: {ve}')
+    return table
 
 
 def allAssets(dirlist, assetfileRegex: str = 'assets.txt',
-              simulation: str = 'etesim'):
+              simulation: str = 'etesim', workers: int = None,
+              errors: list = None) -> dio.AssetTable:
     """
     Finds files that represent assets in a given list of directories to search
+    and parses them into a single table. Files are parsed concurrently
+    across a pool of threads.
 
     Parameters
     ----------
@@ -283,11 +365,17 @@ def allAssets(dirlist, assetfileRegex: str = 'assets.txt',
         The default is 'assets.txt'.
     simulation : str, optional
         A simulation specifier for "smart" searching. The default is 'etesim'.
+    workers : int, optional
+        The maximum number of threads used to parse files. If None, the
+        ThreadPoolExecutor default is used. The default is None.
+    errors : list, optional
+        If given, an AssetParseError is appended for every line or
+        asset that could not be parsed. The default is None.
 
     Returns
     -------
-    list
-        A list of strings, each one a path to a file containing asset metadata
+    dio.AssetTable
+        A table containing the assets from every matching file
 
     """
 
@@ -299,52 +387,154 @@ def allAssets(dirlist, assetfileRegex: str = 'assets.txt',
             if match:
                 assetFiles.append(item.path)
 
-    assetLists = [assetData(f, simulation=simulation) for f in assetFiles]
+    # Each file gets its own error list so the results can be reported
+    # in file order regardless of which thread finishes first
+    fileErrors = [[] for _ in assetFiles]
 
-    # Guarantees one long asset list
-    return list(it.chain.from_iterable(assetLists))
+    def parse(k):
+        return assetData(assetFiles[k], simulation=simulation,
+                         errors=fileErrors[k])
+
+    if len(assetFiles) > 1 and workers != 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(parse, range(len(assetFiles))))
+    else:
+        tables = [parse(k) for k in range(len(assetFiles))]
+
+    if errors is not None:
+        errors.extend(it.chain.from_iterable(fileErrors))
+
+    # Guarantees one long asset table
+    return dio.AssetTable.concat(tables)
 
 
-def uniqueAssets(assetList):
+def uniqueAssets(assetList, tolerance: float = None, decimals: int = 6):
     """
-    Removes any duplicate assets from a list
+    Removes any duplicate assets from a list (or table), keeping the first
+    occurrence of each asset.
+
+    By default, assets are duplicates if they match under the "=" operator
+    (after rounding coordinates to the given number of decimals). Each
+    asset is reduced to a hashable key so the search is a single pass.
+
+    If a tolerance is given, assets with the same simulation, name, and
+    category are also duplicates when their ECEF positions are within
+    the tolerance of each other. Positions are binned into a uniform grid
+    with cells the size of the tolerance so only neighboring cells have
+    to be searched.
 
     Parameters
     ----------
-    assetList : list
+    assetList : list or dio.AssetTable
         A list of assets.
+    tolerance : float, optional
+        The distance (in meters) within which assets are considered
+        identical. The default is None (exact matching).
+    decimals : int, optional
+        The number of decimal places coordinates are rounded to for
+        exact matching. The default is 6.
+
+    Returns
+    -------
+    assets : list or dio.AssetTable
+        The assets with duplicates removed, in the same container type
+        as the input.
+
+    """
+    isTable = isinstance(assetList, dio.AssetTable)
+    if isTable:
+        table = assetList
+    else:
+        assetList = list(assetList)
+        table = dio.AssetTable.from_assets(assetList)
+
+    keep = uniqueAssetRows(table, tolerance=tolerance, decimals=decimals)
+
+    if isTable:
+        return table.take(keep)
+    return [assetList[k] for k in keep]
+
+
+def uniqueAssetRows(table: dio.AssetTable, tolerance: float = None,
+                    decimals: int = 6) -> list:
+    """
+    Finds the rows of an asset table that are not duplicates of an
+    earlier row. See uniqueAssets() for the matching criteria.
+
+    Parameters
+    ----------
+    table : dio.AssetTable
+        The assets to search
+    tolerance : float, optional
+        The distance (in meters) within which assets are considered
+        identical. The default is None (exact matching).
+    decimals : int, optional
+        The number of decimal places coordinates are rounded to for
+        exact matching. The default is 6.
 
     Returns
     -------
-    assets : list
-        A list of assets with duplicates removed.
-
-    """
-    assets = list(assetList)
-    n = len(assets)
-    k = n - 1
-    while k >= 0 and n >= 0:
-        asset = assets[k]
-        j = k - 1
-        while j >= 0:
-            if assets[j] == asset:
-                assets = assets[:k] + assets[k+1:]
-                j = -1
-                n = n - 1
-            j = j - 1
-        k = k - 1
-    return assets
+    list
+        The indices of the rows to keep, in ascending order
+
+    """
+    keys = table.keys(decimals)
+
+    # Exact matching only needs a set of the keys seen so far
+    if tolerance is None or tolerance <= 0:
+        seen = set()
+        keep = []
+        for k, key in enumerate(keys):
+            if key not in seen:
+                seen.add(key)
+                keep.append(k)
+        return keep
+
+    arrays = table.arrays()
+    xyz = np.column_stack([arrays['x'], arrays['y'], arrays['z']])
+    cells = np.floor(xyz / tolerance)
+    hasPosition = ~np.isnan(xyz).any(axis=1)
+    offsets = list(it.product((-1, 0, 1), repeat=3))
+
+    # Maps (sim, name, category, cell) to the kept rows in that cell
+    grid = {}
+    seen = set()
+    keep = []
+    for k, key in enumerate(keys):
+        # Assets without ECEF coordinates can only be matched exactly
+        if not hasPosition[k]:
+            if key not in seen:
+                seen.add(key)
+                keep.append(k)
+            continue
+
+        meta = key[:3]
+        cell = tuple(cells[k].astype('int64').tolist())
+        duplicate = False
+        for offset in offsets:
+            neighbor = tuple(c + o for c, o in zip(cell, offset))
+            for j in grid.get(meta + neighbor, ()):
+                if np.linalg.norm(xyz[k] - xyz[j]) <= tolerance:
+                    duplicate = True
+                    break
+            if duplicate:
+                break
+
+        if not duplicate:
+            grid.setdefault(meta + cell, []).append(k)
+            keep.append(k)
+    return keep
 
 
 def assetsDF(assetList, unique: bool = False) -> pd.DataFrame:
     """
-    Converts a list of FixedAsset type into a single DataFrame
-    containing the relevant metadata
+    Converts an AssetTable (or a list of FixedAsset type) into a single
+    DataFrame containing the relevant metadata
 
     Parameters
     ----------
-    assetList : list
-        A list of assets
+    assetList : dio.AssetTable or list
+        A table or list of assets
     unique : bool, optional
         A flag for removing duplicate assets. The default is False.
 
@@ -355,10 +545,13 @@ def assetsDF(assetList, unique: bool = False) -> pd.DataFrame:
 
     """
 
-    # Converts the assets into DataFrames and indexes them in
-    # the current order in the list
-    df = pd.concat([x.df(k) for k, x in enumerate(assetList)])
-    df.run = df.run.values.astype('int64')
+    # Lists of FixedAsset are loaded into a table so the DataFrame is
+    # built once from whole columns instead of once per asset
+    if not isinstance(assetList, dio.AssetTable):
+        assetList = dio.AssetTable.from_assets(assetList)
+
+    # Indexes the assets in the current order in the table
+    df = assetList.df()
     if unique:
         # This will not re-index to allow you to easily see what was dropped
         return df.drop_duplicates()
@@ -366,7 +559,7 @@ def assetsDF(assetList, unique: bool = False) -> pd.DataFrame:
         return df
 
 
-def assetColMap(colVal: tk.StringVar):
+def assetColMap(colVal):
     """
     For a given user selection, lists the location the values of that
     selection should go in a DataFrame.
@@ -376,8 +569,8 @@ def assetColMap(colVal: tk.StringVar):
 
     Parameters
     ----------
-    colVal : tk.StringVar
-        A GUI variable that holds a string or a None.
+    colVal : tk.StringVar or str
+        A GUI variable that holds a string or a None, or the string itself.
 
     Returns
     -------
@@ -387,7 +580,7 @@ def assetColMap(colVal: tk.StringVar):
         plotting. Returns None if the value is invalid.
 
     """
-    val = colVal.get()
+    val = colVal.get() if hasattr(colVal, 'get') else colVal
     if val is None or val == '':
         return None
     splitData = val.lower().split()
@@ -407,7 +600,8 @@ def assetColMap(colVal: tk.StringVar):
 
 def allMissileFiles(
         dirlist: list,
-        mfile_regex: str = 'NotionalETEOutput(\\d+).xlsx') -> list:
+        mfile_regex: str = 'NotionalETEOutput(\\d+)'
+                           '\\.(xlsx|csv|parquet)$') -> list:
     """
     Generates a list of files from the supplied directory list
     which match the specified pattern.
@@ -417,8 +611,9 @@ def allMissileFiles(
     dirlist : list
         A list of directories to check for files
     mfile_regex : str, optional
-        The matching criterion (regular expression).
-        The default is 'NotionalETEOutput(\\d+).xlsx'.
+        The matching criterion (regular expression). The default
+        matches Excel, CSV, and Parquet files
+        ('NotionalETEOutput(\\d+)\\.(xlsx|csv|parquet)$').
 
     Returns
     -------
@@ -461,15 +656,128 @@ def combinedMissleDF(missileFileList: list) -> pd.DataFrame:
     return df
 
 
+def loadMissileData(missileFileList: list) -> pd.DataFrame:
+    """
+    Loads the missile files into the single DataFrame used for plotting,
+    with human-readable columns. Rows are ordered by run, model, instance,
+    and then time, so each trajectory is stored contiguously and in time
+    order (see plotting_functions.TrajectoryIndex).
+
+    Parameters
+    ----------
+    missileFileList : list
+        The path to each file to be loaded
+
+    Returns
+    -------
+    pd.DataFrame
+        A Pandas DataFrame of all of the trajectory data
+
+    """
+    df = combinedMissleDF(missileFileList)
+    df.rename(columns=dictMap(), inplace=True)
+    sortCols = [col for col in ['RunNumber', 'Model', 'Instance', 'Time']
+                if col in df.columns]
+    with tm.timer('load.sort'):
+        df.sort_values(by=sortCols, inplace=True, kind='stable',
+                       ignore_index=True)
+    return df
+
+
+def loadAssetData(missileFileList: list,
+                  errors: list = None) -> dio.AssetTable:
+    """
+    Loads the assets stored alongside each missile file.
+
+    Parameters
+    ----------
+    missileFileList : list
+        The path to each missile file whose assets should be loaded
+    errors : list, optional
+        If given, an AssetParseError is appended for every line or
+        asset that could not be parsed. The default is None.
+
+    Returns
+    -------
+    dio.AssetTable
+        A table containing the assets for every missile file
+
+    """
+    assetDirs = [os.path.abspath(os.path.join(x, os.pardir))
+                 for x in missileFileList]
+    return allAssets(assetDirs, errors=errors)
+
+
+def dataVersion(missileFileList: list,
+                assetFile: str = 'assets.txt', runs: list = None) -> str:
+    """
+    Identifies a set of loaded data by the name, size, and modification
+    time of each missile file and the asset file next to it. The
+    version changes whenever any of those files change, and stays the
+    same between sessions otherwise, so it can key cached plots.
+
+    Parameters
+    ----------
+    missileFileList : list
+        The path to each missile file
+    assetFile : str, optional
+        The name of the asset file stored alongside each missile file.
+        The default is 'assets.txt'.
+    runs : list, optional
+        The runs kept from the files, if not all of them.
+        The default is None.
+
+    Returns
+    -------
+    str
+        A hexadecimal digest of the files
+
+    """
+    digest = hashlib.sha1()
+    for missileFile in sorted(missileFileList):
+        assetPath = os.path.join(os.path.dirname(missileFile), assetFile)
+        for path in (missileFile, assetPath):
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            digest.update(f'{os.path.abspath(path)}|{stat.st_size}|'
+                          f'{stat.st_mtime_ns}\n'.encode())
+    if runs is not None:
+        digest.update(f'runs|{",".join(map(str, runs))}\n'.encode())
+    return digest.hexdigest()
+
+
+def cacheDir(topDir: str, name: str = '') -> str:
+    """
+    The directory that derived data (summaries, plot bitmaps) is cached
+    in, kept next to the data it was derived from.
+
+    Parameters
+    ----------
+    topDir : str
+        The directory the data was loaded from
+    name : str, optional
+        A subdirectory for one kind of cached data.
+        The default is '' (the cache directory itself).
+
+    Returns
+    -------
+    str
+        The path of the cache directory, which may not exist yet
+
+    """
+    return os.path.join(topDir, '.etesim_cache', name)
+
+
 def makeDataFrameAddPath(inFile: str) -> pd.DataFrame:
     """
-    Makes a DataFrame from an Excel file and adds the path
+    Makes a DataFrame from a data file and adds the path
     of the file as a new column
 
     Parameters
     ----------
     inFile : str
-        An Excel spreadsheet that has panel data
+        An Excel, CSV, or Parquet file that has panel data
 
     Returns
     -------
@@ -477,11 +785,35 @@ def makeDataFrameAddPath(inFile: str) -> pd.DataFrame:
         A Pandas DataFrame of the data with one additional column added
 
     """
-    df = pd.read_excel(inFile)
+    df = readTable(inFile)
     df['Path'] = inFile
     return df
 
 
+def readTable(inFile: str) -> pd.DataFrame:
+    """
+    Reads a file of panel data, choosing the reader by file extension.
+    Excel is assumed for anything other than CSV and Parquet.
+
+    Parameters
+    ----------
+    inFile : str
+        An Excel, CSV, or Parquet file
+
+    Returns
+    -------
+    pd.DataFrame
+        The data in the file
+
+    """
+    ext = os.path.splitext(inFile)[1].lower()
+    if ext == '.csv':
+        return pd.read_csv(inFile)
+    elif ext == '.parquet':
+        return pd.read_parquet(inFile)
+    return pd.read_excel(inFile)
+
+
 def makeDF(inFile: str) -> pd.DataFrame:
     """
     Generates a DataFrame from an ETESim input and does some data
@@ -499,9 +831,11 @@ def makeDF(inFile: str) -> pd.DataFrame:
 
     """
 
-    df = pd.read_excel(inFile).rename(columns=dictMap())
-    model, instance = list(zip(*[recordExtractor(r, 'ETESim') for
-                                 r in df['Data Record ID'].values]))
+    with tm.timer('load.parse'):
+        df = readTable(inFile).rename(columns=dictMap())
+    with tm.timer('load.extract'):
+        model, instance = list(zip(*[recordExtractor(r, 'ETESim') for
+                                     r in df['Data Record ID'].values]))
     df['Model'] = model
     df['Instance'] = instance
     df['Path'] = inFile
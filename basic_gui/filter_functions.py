@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+Downselection of trajectories by their metadata.
+
+A TrajectoryFilter is built once when data is loaded. It keeps one value
+per trajectory (run, model, instance, first and last time, and maximum
+altitude, taken from the run summary when one has been computed) and a
+boolean mask per model and per instance, so any
+combination of criteria is answered with a few vectorized comparisons
+over trajectories instead of a query over every row.
+"""
+
+# File Imports
+import data_input_objects as dio
+
+# Module-Level Imports
+import numpy as np
+import pandas as pd
+
+# The trajectory position columns, which hold ECEF coordinates
+# (See extra_functions.assetColMap)
+defaultPositionCols = ('Missile Position - East',
+                       'Missile Position - North',
+                       'Missile Position - Up')
+
+
+class TrajectoryFilter():
+    def __init__(self, missileDF: pd.DataFrame, index,
+                 positionCols: tuple = defaultPositionCols,
+                 summary: pd.DataFrame = None) -> None:
+        """
+        Summarizes every trajectory for filtering.
+
+        Parameters
+        ----------
+        missileDF : pd.DataFrame
+            All of the loaded trajectory data
+        index : TrajectoryIndex
+            The trajectories of missileDF
+            (see plotting_functions.TrajectoryIndex)
+        positionCols : tuple, optional
+            The columns holding the ECEF position used for altitude.
+            The default is the missile East/North/Up position.
+        summary : pd.DataFrame, optional
+            The summary of the same trajectories
+            (see summary_functions.trajectorySummary). If given, its
+            times and apogees are used instead of being computed again.
+            The default is None.
+
+        Returns
+        -------
+        None
+
+        """
+        self.index = index
+        N = len(index)
+        keys = pd.MultiIndex.from_tuples(index.keys, names=['RunNumber',
+                                                            'Model',
+                                                            'Instance'])
+        self.runs = np.asarray(index.runs)
+        self.models = (keys.get_level_values(1).to_numpy(dtype=object)
+                       if N > 0 else np.array([], dtype=object))
+        self.instances = (keys.get_level_values(2).to_numpy(dtype=object)
+                          if N > 0 else np.array([], dtype=object))
+
+        # Boolean mask indexes for the categorical metadata
+        self.modelMasks = {model: self.models == model
+                           for model in pd.unique(self.models)}
+        self.instanceMasks = {inst: self.instances == inst
+                              for inst in pd.unique(self.instances)}
+
+        # Per-trajectory reductions over the rows of each trajectory
+        self.startTimes = np.full(N, np.nan)
+        self.endTimes = np.full(N, np.nan)
+        self.maxAlts = np.full(N, np.nan)
+        if N == 0:
+            return
+        if summary is not None:
+            self.startTimes = summary['Start Time'].to_numpy(dtype='float64')
+            self.endTimes = summary['End Time'].to_numpy(dtype='float64')
+            self.maxAlts = summary['Apogee'].to_numpy(dtype='float64')
+            return
+
+        starts = index.offsets[:-1]
+        if 'Time' in missileDF.columns:
+            times = missileDF['Time'].to_numpy(dtype='float64')[index.order]
+            self.startTimes = np.fmin.reduceat(times, starts)
+            self.endTimes = np.fmax.reduceat(times, starts)
+        if set(positionCols).issubset(missileDF.columns):
+            x, y, z = (missileDF[col].to_numpy(dtype='float64')[index.order]
+                       for col in positionCols)
+            _, _, alts = dio.ecef2lla(x, y, z)
+            self.maxAlts = np.fmax.reduceat(np.asarray(alts, dtype='float64'),
+                                            starts)
+
+    def __len__(self) -> int:
+        """
+        The number of trajectories.
+
+        Returns
+        -------
+        int
+            The number of trajectories
+
+        """
+        return len(self.runs)
+
+    def categoryMask(self, masks: dict, values) -> np.ndarray:
+        """
+        Combines the masks of several category values.
+
+        Parameters
+        ----------
+        masks : dict
+            A mapping of value to trajectory mask
+            (e.g. self.modelMasks)
+        values : iterable
+            The values to keep
+
+        Returns
+        -------
+        np.ndarray
+            True for trajectories matching any of the values
+
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        for value in values:
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+    def mask(self, models: tuple = (), instances: tuple = (),
+             runRange: tuple = (None, None),
+             timeWindow: tuple = (None, None),
+             altRange: tuple = (None, None)) -> np.ndarray:
+        """
+        Finds the trajectories matching every criterion given. Empty
+        criteria (and None bounds) match everything.
+
+        Parameters
+        ----------
+        models : tuple, optional
+            The models to keep. The default is () (all).
+        instances : tuple, optional
+            The instances to keep. The default is () (all).
+        runRange : tuple, optional
+            The (min, max) run numbers to keep, inclusive.
+            The default is (None, None).
+        timeWindow : tuple, optional
+            A (start, end) time window; trajectories with any data in
+            the window are kept. The default is (None, None).
+        altRange : tuple, optional
+            The (min, max) maximum altitude, in meters, of trajectories
+            to keep. The default is (None, None).
+
+        Returns
+        -------
+        np.ndarray
+            True for each trajectory matching
+
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if len(models) > 0:
+            mask &= self.categoryMask(self.modelMasks, models)
+        if len(instances) > 0:
+            mask &= self.categoryMask(self.instanceMasks, instances)
+
+        lo, hi = runRange
+        if lo is not None:
+            mask &= self.runs >= lo
+        if hi is not None:
+            mask &= self.runs <= hi
+
+        start, end = timeWindow
+        if start is not None:
+            mask &= self.endTimes >= start
+        if end is not None:
+            mask &= self.startTimes <= end
+
+        lo, hi = altRange
+        if lo is not None:
+            mask &= self.maxAlts >= lo
+        if hi is not None:
+            mask &= self.maxAlts <= hi
+        return mask
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Accounting of the memory held by loaded data, against a budget.
+
+The GUI holds the trajectory DataFrame, the structures built from it
+(trajectory index, run summary, assets), and rendered figures. Each is
+measured here so the total can be compared to a budget the user sets on
+the Diagnostics tab. When the budget would be exceeded, the GUI
+degrades in steps rather than pushing the machine into swap:
+
+    1. A load whose estimated size does not fit is refused
+    2. Cached figures and asset plot data are dropped
+    3. Plots are thinned to a number of points per trajectory
+
+The size of a load is estimated from the size of its files on disk,
+since reading them is exactly what is to be avoided. Columns mapped from
+a trajectory store (see store_functions) are counted apart: their pages
+belong to the page cache, shared with other instances, and can be
+dropped by the operating system at any time.
+"""
+
+# File Imports
+import store_functions as stf
+
+# Module-Level Imports
+import os
+import numpy as np
+import pandas as pd
+
+# Roughly how many bytes a DataFrame takes per byte of each file format
+# (measured on generated campaigns: xlsx is compressed, csv is text)
+loadExpansion = {'.xlsx': 4.0, '.csv': 2.5, '.parquet': 6.0, }
+
+# The points per trajectory drawn once the budget has been exceeded
+degradedPoints = 500
+
+
+def defaultBudget() -> int:
+    """
+    The memory budget used until the user sets one: half of the
+    physical memory, or 4 GiB where that cannot be found.
+
+    Returns
+    -------
+    int
+        The budget in MiB
+
+    """
+    try:
+        total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 4096
+    return max(int(total / 2**21), 256)
+
+
+def frameBytes(df: pd.DataFrame) -> int:
+    """
+    The memory held by a DataFrame, including the strings it refers to.
+    Columns mapped from a trajectory store are not counted
+    (see mappedBytes).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame, or None
+
+    Returns
+    -------
+    int
+        The size in bytes
+
+    """
+    if df is None:
+        return 0
+    usage = df.memory_usage(deep=True, index=False)
+    total = int(df.memory_usage(index=True, deep=True).sum() - usage.sum())
+    for name, size in usage.items():
+        if not columnMapped(df[name]):
+            total += int(size)
+    return total
+
+
+def mappedBytes(df: pd.DataFrame) -> int:
+    """
+    The size of the columns of a DataFrame that are mapped from a
+    trajectory store, rather than held by the process.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame, or None
+
+    Returns
+    -------
+    int
+        The size in bytes
+
+    """
+    if df is None:
+        return 0
+    return sum(int(df[name].nbytes) for name in df.columns
+               if columnMapped(df[name]))
+
+
+def columnMapped(series: pd.Series) -> bool:
+    """
+    Whether a column is backed by a memory-mapped file. Categorical
+    columns are mapped through their codes.
+
+    Parameters
+    ----------
+    series : pd.Series
+        The column
+
+    Returns
+    -------
+    bool
+        True if the column's values are a view of a np.memmap
+
+    """
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        return stf.isMapped(values.codes)
+    return stf.isMapped(getattr(values, '_ndarray', None))
+
+
+def arrayBytes(obj) -> int:
+    """
+    The memory held by the numpy arrays an object refers to directly,
+    e.g. a TrajectoryIndex.
+
+    Parameters
+    ----------
+    obj : object
+        The object, or None
+
+    Returns
+    -------
+    int
+        The size in bytes
+
+    """
+    if obj is None:
+        return 0
+    return sum(int(value.nbytes) for value in vars(obj).values()
+               if isinstance(value, np.ndarray))
+
+
+def figureBytes(figure) -> int:
+    """
+    Estimates the memory held by a rendered figure from its RGBA pixel
+    buffer. The artists hold copies of the data drawn as well, but
+    those are bounded by the points drawn (see degradedPoints).
+
+    Parameters
+    ----------
+    figure : matplotlib.figure.Figure
+        The figure, or None
+
+    Returns
+    -------
+    int
+        The size in bytes
+
+    """
+    if figure is None:
+        return 0
+    return int(4 * figure.bbox.width * figure.bbox.height)
+
+
+def estimateLoadBytes(missileFiles: list) -> int:
+    """
+    Estimates the memory the trajectory data of some files will take once
+    loaded, from their size on disk.
+
+    Parameters
+    ----------
+    missileFiles : list
+        The missile files (see extra_functions.allMissileFiles)
+
+    Returns
+    -------
+    int
+        The estimated size in bytes
+
+    """
+    total = 0.0
+    for missileFile in missileFiles:
+        ext = os.path.splitext(missileFile)[1].lower()
+        try:
+            size = os.path.getsize(missileFile)
+        except OSError:
+            continue
+        total += size * loadExpansion.get(ext, 4.0)
+    return int(total)
+
+
+def formatBytes(size: float) -> str:
+    """
+    Formats a size for display.
+
+    Parameters
+    ----------
+    size : float
+        The size in bytes
+
+    Returns
+    -------
+    str
+        The size in MiB, e.g. '12.3 MB'
+
+    """
+    return f'{size / 2**20:.1f} MB'
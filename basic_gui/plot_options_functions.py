@@ -1,50 +1,155 @@
 # -*- coding: utf-8 -*-
 
 
-def getLimits(gui, ax) -> tuple:
+def userLimits(gui) -> tuple:
     """
-    Returns the limits to be used in a plot based upon the default
-    limits given by pyplot and the limits (potentially) specified
-    by the user in the GUI
+    Reads the limits (potentially) specified by the user in the GUI
+
+    Returns
+    -------
+    tuple
+        The (min, max) pairs for x, y, and z, where None means no limit
+        was given and the pyplot default should be used
+
+    """
+    limits = []
+    for axis in ('x', 'y', 'z'):
+        lo, hi = None, None
+        if getattr(gui, f'{axis}Limits').get():
+            minVal = getattr(gui, f'{axis}Min').get()
+            maxVal = getattr(gui, f'{axis}Max').get()
+            if minVal not in ['', 'Min']:
+                lo = float(minVal)
+            if maxVal not in ['', 'Max']:
+                hi = float(maxVal)
+        limits.append((lo, hi))
+    return tuple(limits)
+
+
+def entryBound(text: str):
+    """
+    Reads a bound typed into a filter entry.
+
+    Parameters
+    ----------
+    text : str
+        The text of the entry
+
+    Returns
+    -------
+    float or None
+        The value, or None if the entry is blank or not a number
+
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def userFilters(gui) -> dict:
+    """
+    Reads the run filters (potentially) specified by the user in the GUI
+
+    Returns
+    -------
+    dict
+        A mapping of PlotSpec filter field (and the time range) to value.
+        Models and instances are tuples (empty keeps all); the rest are
+        (min, max) pairs where None means no bound was given
+
+    """
+    def names(text):
+        return tuple(v.strip() for v in text.split(',') if v.strip() != '')
+
+    filters = {'filterModels': names(gui.filterModels.get()),
+               'filterInstances': names(gui.filterInstances.get()), }
+    for field in ('Runs', 'Times', 'Alts'):
+        minVal = getattr(gui, f'filter{field}Min').get()
+        maxVal = getattr(gui, f'filter{field}Max').get()
+        filters[f'filter{field}'] = (entryBound(minVal), entryBound(maxVal))
+
+    # A slider left at the end of the data does not limit the range
+    first, last = gui.timeBounds
+    start, end = gui.timeStart.get(), gui.timeEnd.get()
+    filters['timeRange'] = (start if start > first else None,
+                            end if end < last else None)
+    return filters
+
+
+def connectAssetHover(canvas, ax, collections: list) -> None:
+    """
+    Shows the name and ID of an asset when the mouse hovers over
+    its marker.
 
     Parameters
     ----------
+    canvas : FigureCanvasTkAgg
+        The canvas the plot is drawn on
     ax : matplotlib.axes._subplots.AxesSubplot
-        A handle to the subplot which will have new limits
-        This cannot be type hinted because the type is created
-        on the fly
+        The subplot the assets are drawn on
+    collections : list
+        Pairs of (PathCollection, labels) where each label describes
+        the marker at the same position in the collection
 
     Returns
     -------
-    tuple
-        A six-element tuple of the minimum and maximum values for
-        x, y, and z, respectively
-
-    """
-    xMin, xMax = ax.get_xlim()
-    if gui.xLimits.get():
-        if gui.xMin.get() not in ['', 'Min']:
-            xMin = float(gui.xMin.get())
-        if gui.xMax.get() not in ['', 'Max']:
-            xMax = float(gui.xMax.get())
-
-    yMin, yMax = ax.get_ylim()
-    if gui.yLimits.get():
-        if gui.yMin.get() not in ['', 'Min']:
-            yMin = float(gui.yMin.get())
-        if gui.yMax.get() not in ['', 'Max']:
-            yMax = float(gui.yMax.get())
-
-    if gui.dimensions == 3:
-        zMin, zMax = ax.get_zlim()
-        if gui.zLimits.get():
-            if gui.zMin.get() not in ['', 'Min']:
-                zMin = float(gui.zMin.get())
-            if gui.zMax.get() not in ['', 'Max']:
-                zMax = float(gui.zMax.get())
-    else:
-        # This guarantees a six-element return tuple each time
-        zMin, zMax = (0, 0)
-
-    xyzLimits = (xMin, xMax, yMin, yMax, zMin, zMax)
-    return xyzLimits
+    None
+
+    """
+    # Cached plots are shown again on new canvases, so the annotation
+    # made the first time is reused
+    annotation = getattr(ax, 'assetAnnotation', None)
+    if annotation is None:
+        annotation = ax.annotate('', xy=(0, 0), xytext=(15, 15),
+                                 textcoords='offset points',
+                                 bbox={'boxstyle': 'round', 'fc': 'w'},
+                                 arrowprops={'arrowstyle': '->'})
+        ax.assetAnnotation = annotation
+    annotation.set_visible(False)
+
+    # The figure keeps its handlers between canvases; only one is wanted
+    disconnectAssetHover(canvas, ax)
+
+    def onHover(event):
+        if event.inaxes != ax:
+            return
+        for coll, labels in collections:
+            found, info = coll.contains(event)
+            if found:
+                annotation.xy = (event.xdata, event.ydata)
+                annotation.set_text(labels[info['ind'][0]])
+                annotation.set_visible(True)
+                event.canvas.draw_idle()
+                return
+        if annotation.get_visible():
+            annotation.set_visible(False)
+            event.canvas.draw_idle()
+
+    ax.assetHoverCid = canvas.mpl_connect('motion_notify_event', onHover)
+
+
+def disconnectAssetHover(canvas, ax) -> None:
+    """
+    Stops showing asset names on hover, if connectAssetHover was used on
+    the subplot before (possibly on another canvas).
+
+    Parameters
+    ----------
+    canvas : FigureCanvasTkAgg
+        The canvas the plot is drawn on
+    ax : matplotlib.axes._subplots.AxesSubplot
+        The subplot the assets are drawn on
+
+    Returns
+    -------
+    None
+
+    """
+    cid = getattr(ax, 'assetHoverCid', None)
+    if cid is not None:
+        canvas.mpl_disconnect(cid)
+        ax.assetHoverCid = None
+    annotation = getattr(ax, 'assetAnnotation', None)
+    if annotation is not None:
+        annotation.set_visible(False)
@@ -0,0 +1,931 @@
+# -*- coding: utf-8 -*-
+
+# File Imports
+import extra_functions as ef
+import filter_functions as flt
+import timing_functions as tm
+
+# Module-Level Imports
+import json
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# matplotlib is imported by the functions that draw, the first time they
+# are called, so the GUI can start without it. No backend is chosen here
+# so the same code can render to a Tk canvas in the GUI or to an
+# off-screen (Agg) canvas from the command line.
+
+# matplotlib's style (rcParams) is global to the process, and the xkcd
+# style is applied through it. It is only changed while this lock is held,
+# and the GUI holds it while it draws, so a figure drawn on one thread
+# never picks up a style applied for a render on another (see plotStyle)
+styleLock = threading.RLock()
+
+# Marker colors for each asset category, cycled if there are more categories
+assetColors = ('green', 'darkorange', 'purple', 'saddlebrown', 'magenta')
+
+# The columns identifying an individual trajectory
+trajectoryCols = ['RunNumber', 'Model', 'Instance']
+
+
+class PlotSpec(namedtuple('PlotSpec', [
+        'xCol', 'yCol', 'zCol',
+        'plotStyle', 'lineStyle', 'scatterStyle', 'autoColor', 'plotColor',
+        'showAllRuns', 'transparentRuns', 'run',
+        'filterModels', 'filterInstances', 'filterRuns', 'filterTimes',
+        'filterAlts', 'timeRange', 'maxPoints',
+        'showLegend', 'legendLoc', 'showXLabel', 'showYLabel', 'showZLabel',
+        'gridMajor', 'gridMinor', 'limits',
+        'title', 'titleSize', 'titleColor', 'titleBold', 'titleItalic',
+        'showAssets', 'xkcd', ],
+        defaults=['', '', '',
+                  'line', '-', 'o', True, '#1f77b4',
+                  True, True, None,
+                  (), (), (None, None), (None, None),
+                  (None, None), (None, None), None,
+                  True, 'Best', True, True, True,
+                  True, False, ((None, None), (None, None), (None, None)),
+                  '', 15, '#000000', False, False,
+                  True, False, ])):
+    """
+    Everything needed to draw a plot: the fields on each axis, the axis
+    limits, the plot style, the title, and which runs are selected.
+
+    The defaults match the widgets in the GUI editor pane. Being an
+    immutable tuple, a PlotSpec is hashable (so it can be used as a cache
+    key) and can be passed to other threads or processes. Specs can be
+    saved to and restored from JSON as plot presets.
+
+    The limits are ((xMin, xMax), (yMin, yMax), (zMin, zMax)), where None
+    means the pyplot default is kept.
+
+    The filter fields downselect the trajectories drawn (see
+    filter_functions.TrajectoryFilter.mask): the models and instances to
+    keep (empty keeps all), and (min, max) bounds on the run number, the
+    time window, and the maximum altitude.
+
+    The time range (start, end) cuts every trajectory drawn down to the
+    points inside it, where None leaves that end open.
+
+    The maximum points (if not None) thins every trajectory drawn down to
+    that many points, evenly spaced and keeping both ends.
+    """
+    __slots__ = ()
+
+    def effective(self):
+        """
+        Resets the fields that have no effect on the plot to their
+        defaults, e.g. the run when all runs are shown or the title style
+        when there is no title. Specs that would draw the same plot then
+        compare (and hash) equal.
+
+        Returns
+        -------
+        PlotSpec
+            A spec drawing the same plot as this one
+
+        """
+        defaults = PlotSpec()
+        unused = []
+        if self.showAllRuns:
+            unused += ['run', 'transparentRuns']
+        if self.autoColor:
+            unused += ['plotColor']
+        unused += ['scatterStyle' if self.plotStyle == 'line'
+                   else 'lineStyle']
+        if not self.showLegend:
+            unused += ['legendLoc']
+        if self.title == '':
+            unused += ['titleSize', 'titleColor', 'titleBold', 'titleItalic']
+
+        dimensions = plotDimensions(self)
+        limits = self.limits
+        if dimensions != 3:
+            unused += ['showZLabel']
+            limits = limits[:2] + defaults.limits[2:]
+        if dimensions == 3:
+            unused += ['gridMajor', 'gridMinor']
+
+        changes = {field: getattr(defaults, field) for field in unused}
+        return self._replace(limits=limits, **changes)
+
+    def toDict(self) -> dict:
+        """
+        Represents the spec as a dictionary of JSON-compatible values.
+
+        Returns
+        -------
+        dict
+            A mapping of field name to value
+
+        """
+        def toList(value):
+            if isinstance(value, tuple):
+                return [toList(v) for v in value]
+            return value
+
+        return {k: toList(v) for k, v in self._asdict().items()}
+
+    @classmethod
+    def fromDict(cls, dict_: dict):
+        """
+        Builds a spec from a dictionary. Unknown keys are ignored and
+        missing keys take their default values.
+
+        Parameters
+        ----------
+        dict_ : dict
+            A mapping of field name to value (see toDict)
+
+        Returns
+        -------
+        PlotSpec
+            The spec described by the dictionary
+
+        """
+        def toTuple(value):
+            # JSON turns tuples into lists, which are not hashable
+            if isinstance(value, list):
+                return tuple(toTuple(v) for v in value)
+            return value
+
+        kwargs = {k: toTuple(v) for k, v in dict_.items()
+                  if k in cls._fields}
+        return cls(**kwargs)
+
+    def save(self, outFile: str) -> None:
+        """
+        Writes the spec to a JSON file so it can be used as a preset.
+
+        Parameters
+        ----------
+        outFile : str
+            The path of the file to write
+
+        Returns
+        -------
+        None
+
+        """
+        with open(outFile, 'w') as out:
+            json.dump(self.toDict(), out, indent=4)
+
+    @classmethod
+    def load(cls, inFile: str):
+        """
+        Reads a spec from a JSON file written by save().
+
+        Parameters
+        ----------
+        inFile : str
+            The path of the file to read
+
+        Returns
+        -------
+        PlotSpec
+            The spec stored in the file
+
+        """
+        with open(inFile, 'r') as in_:
+            return cls.fromDict(json.load(in_))
+
+
+def plotDimensions(spec: PlotSpec) -> int:
+    """
+    Determines the dimension of the plot from the selected columns.
+    See callback_functions.setDimensions for the rules.
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The plot configuration
+
+    Returns
+    -------
+    int
+        0 (nothing to plot), 2, or 3
+
+    """
+    xCol, yCol, zCol = spec.xCol, spec.yCol, spec.zCol
+    if xCol == '' or yCol == '':
+        return 0
+    dimensions = 2 if zCol == '' else 3
+
+    # If any two columns match, there is no need to plot
+    cols = [xCol, yCol] + ([zCol] if dimensions == 3 else [])
+    if len(set(cols)) < len(cols):
+        return 0
+    return dimensions
+
+
+class TrajectoryIndex():
+    def __init__(self, missileDF: pd.DataFrame) -> None:
+        """
+        Groups the rows of the trajectory data by trajectory once, so
+        plotting does not have to group (or copy) the data each time.
+
+        Trajectories are identified by (RunNumber, Model, Instance) and
+        kept in sorted order. The rows of trajectory k are
+        order[offsets[k]:offsets[k + 1]], in time order, and their times
+        are times[offsets[k]:offsets[k + 1]].
+
+        When the data is already stored in that order (see
+        extra_functions.loadMissileData), order is every row in turn and
+        the rows of a trajectory are returned as a slice, so selecting
+        them makes views instead of copies.
+
+        Parameters
+        ----------
+        missileDF : pd.DataFrame
+            All of the loaded trajectory data
+
+        Returns
+        -------
+        None
+
+        """
+        if len(missileDF) == 0 or not set(trajectoryCols).issubset(
+                                                        missileDF.columns):
+            self.keys = []
+            self.runs = np.array([], dtype='int64')
+            self.order = np.array([], dtype='int64')
+            self.offsets = np.zeros(1, dtype='int64')
+            self.times = None
+            self.contiguous = True
+            return
+
+        trajIndex = pd.MultiIndex.from_frame(missileDF[trajectoryCols])
+        codes, keys = trajIndex.factorize(sort=True)
+        times = (missileDF['Time'].to_numpy(dtype='float64')
+                 if 'Time' in missileDF.columns else None)
+
+        # Rows missing a trajectory column belong to no trajectory
+        valid = np.flatnonzero(codes >= 0)
+        if times is None:
+            self.order = valid[np.argsort(codes[valid], kind='stable')]
+        else:
+            self.order = valid[np.lexsort((times[valid], codes[valid]))]
+        counts = np.bincount(codes[valid], minlength=len(keys))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.keys = list(keys)
+        self.runs = keys.get_level_values(0).to_numpy()
+
+        # Sorted data needs no gathering at all
+        self.contiguous = (len(self.order) == len(missileDF) and
+                           bool(np.all(np.diff(self.order) == 1)))
+        if times is not None and not self.contiguous:
+            times = times[self.order]
+        self.times = times
+
+    @classmethod
+    def fromOffsets(cls, missileDF: pd.DataFrame, keys: list,
+                    offsets: np.ndarray):
+        """
+        Rebuilds the index of data already stored in trajectory order
+        from its offset table, without grouping or sorting the data again
+        (see store_functions).
+
+        Parameters
+        ----------
+        missileDF : pd.DataFrame
+            The trajectory data, stored contiguously by trajectory
+        keys : list
+            The (RunNumber, Model, Instance) of each trajectory, in order
+        offsets : np.ndarray
+            The first row of each trajectory, followed by the number of
+            rows
+
+        Returns
+        -------
+        TrajectoryIndex
+            The index of missileDF
+
+        """
+        index = cls.__new__(cls)
+        index.keys = [tuple(key) for key in keys]
+        index.runs = np.array([key[0] for key in index.keys], dtype='int64')
+        index.offsets = np.asarray(offsets, dtype='int64')
+        index.order = np.arange(len(missileDF), dtype='int64')
+        index.contiguous = True
+        index.times = (missileDF['Time'].to_numpy(dtype='float64')
+                       if 'Time' in missileDF.columns else None)
+        return index
+
+    def __len__(self) -> int:
+        """
+        The number of trajectories.
+
+        Returns
+        -------
+        int
+            The number of trajectories
+
+        """
+        return len(self.keys)
+
+    def rows(self, k: int):
+        """
+        The rows of a single trajectory.
+
+        Parameters
+        ----------
+        k : int
+            The trajectory number
+
+        Returns
+        -------
+        np.ndarray or slice
+            The row positions in the trajectory data
+
+        """
+        return self.span(self.offsets[k], self.offsets[k + 1])
+
+    def span(self, lo: int, hi: int):
+        """
+        The rows at positions lo to hi (exclusive) of order.
+
+        Parameters
+        ----------
+        lo : int
+            The first position
+        hi : int
+            One past the last position
+
+        Returns
+        -------
+        np.ndarray or slice
+            The row positions in the trajectory data. A slice is returned
+            when the data is stored in trajectory order.
+
+        """
+        if self.contiguous:
+            return slice(lo, hi)
+        return self.order[lo:hi]
+
+    def window(self, start: float = None, end: float = None) -> tuple:
+        """
+        Cuts every trajectory down to a time window. Each trajectory is
+        sorted by time, so its ends are found by binary search, run for
+        every trajectory at once (see searchSpans): the work grows with
+        the number of trajectories and the log of their length, not with
+        the number of rows.
+
+        Parameters
+        ----------
+        start : float, optional
+            The earliest time kept. The default is None (no limit).
+        end : float, optional
+            The latest time kept. The default is None (no limit).
+
+        Returns
+        -------
+        tuple
+            Arrays (lo, hi) such that the rows of trajectory k inside
+            the window are span(lo[k], hi[k])
+
+        """
+        starts, ends = self.offsets[:-1], self.offsets[1:]
+        lo, hi = starts.copy(), ends.copy()
+        if self.times is None or (start is None and end is None):
+            return lo, hi
+
+        if start is not None:
+            lo = searchSpans(self.times, starts, ends, start, side='left')
+        if end is not None:
+            hi = searchSpans(self.times, starts, ends, end, side='right')
+        return lo, np.maximum(lo, hi)
+
+    def select(self, spec: PlotSpec,
+               trajFilter: flt.TrajectoryFilter = None) -> np.ndarray:
+        """
+        The trajectories to draw for a plot.
+
+        Parameters
+        ----------
+        spec : PlotSpec
+            The plot configuration
+        trajFilter : TrajectoryFilter, optional
+            The metadata of these trajectories, used to apply the
+            filters in the spec. If None, the filters are ignored.
+            The default is None.
+
+        Returns
+        -------
+        np.ndarray
+            The trajectory numbers to draw
+
+        """
+        keep = np.ones(len(self.keys), dtype=bool)
+
+        # If we don't want to show all the runs and don't
+        # want them to be transparent, only the chosen run is drawn
+        if not spec.showAllRuns and not spec.transparentRuns:
+            keep &= self.runs == spec.run
+
+        if trajFilter is not None:
+            keep &= trajFilter.mask(models=spec.filterModels,
+                                    instances=spec.filterInstances,
+                                    runRange=spec.filterRuns,
+                                    timeWindow=spec.filterTimes,
+                                    altRange=spec.filterAlts)
+        return np.flatnonzero(keep)
+
+
+# The data plotted for the trajectories
+# xyz holds the full x, y, and (for 3D plots) z columns of the trajectory
+# data; index and trajectories pick out the trajectories drawn, and
+# bounds = (lo, hi) the part of each inside the time range
+# (see TrajectoryIndex.window)
+PlotData = namedtuple('PlotData', ['xyz', 'index', 'trajectories',
+                                   'bounds'])
+
+
+def missilePlotData(missileDF: pd.DataFrame, spec: PlotSpec,
+                    index: TrajectoryIndex = None,
+                    trajFilter: flt.TrajectoryFilter = None) -> PlotData:
+    """
+    Gathers the data for plotting the trajectories. The selected
+    columns are handed over as arrays backed by the trajectory data,
+    so nothing is copied until each trajectory is drawn.
+
+    Parameters
+    ----------
+    missileDF : pd.DataFrame
+        All of the loaded trajectory data
+    spec : PlotSpec
+        The plot configuration
+    index : TrajectoryIndex, optional
+        The trajectories of missileDF. If None, it is built here.
+        The default is None.
+    trajFilter : TrajectoryFilter, optional
+        The metadata of the trajectories in index. If None, it is built
+        here when the spec has filters to apply. The default is None.
+
+    Returns
+    -------
+    PlotData
+        The columns to plot and the trajectories to draw
+
+    """
+    if index is None:
+        index = TrajectoryIndex(missileDF)
+    if trajFilter is None and hasFilters(spec):
+        trajFilter = flt.TrajectoryFilter(missileDF, index)
+
+    plotCols = [spec.xCol, spec.yCol]
+    if plotDimensions(spec) == 3:
+        plotCols.append(spec.zCol)
+    xyz = tuple(missileDF[col].to_numpy() for col in plotCols)
+
+    # Trajectories with no points in the time range are not drawn
+    lo, hi = index.window(*spec.timeRange)
+    trajectories = index.select(spec, trajFilter)
+    trajectories = trajectories[hi[trajectories] > lo[trajectories]]
+    return PlotData(xyz, index, trajectories, (lo, hi))
+
+
+def hasFilters(spec: PlotSpec) -> bool:
+    """
+    Whether a spec downselects trajectories by their metadata.
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The plot configuration
+
+    Returns
+    -------
+    bool
+        True if any filter field differs from its default
+
+    """
+    defaults = PlotSpec()
+    return any(getattr(spec, field) != getattr(defaults, field)
+               for field in ('filterModels', 'filterInstances', 'filterRuns',
+                             'filterTimes', 'filterAlts'))
+
+
+def assetPlotDF(assets: pd.DataFrame, spec: PlotSpec) -> pd.DataFrame:
+    """
+    The DataFrame used to plot fixed assets on top of trajectories.
+
+    Parameters
+    ----------
+    assets : pd.DataFrame
+        The asset DataFrame (see extra_functions.assetsDF)
+    spec : PlotSpec
+        The plot configuration
+
+    Returns
+    -------
+    Pandas DataFrame
+        The de-duplicated locations and metadata of the assets to plot,
+        or None if the assets cannot be placed on the selected axes
+
+    """
+    dimensions = plotDimensions(spec)
+    xCol, yCol, zCol = map(ef.assetColMap,
+                           [spec.xCol, spec.yCol, spec.zCol])
+
+    if xCol is None or yCol is None:
+        return None
+    elif dimensions == 3 and zCol is None:
+        return None
+
+    if not spec.showAllRuns:
+        assets = assets[assets.run.values == spec.run]
+
+    dict_ = {'x': assets[xCol].values,
+             'y': assets[yCol].values,
+             'name': assets.name.values,
+             'id': assets.id.values,
+             'category': assets.category.values, }
+    if dimensions == 3:
+        dict_['z'] = assets[zCol].values
+
+    return pd.DataFrame(dict_).drop_duplicates().dropna(subset=['x', 'y'])
+
+
+def makePlot(ax, itPack: tuple, spec: PlotSpec, colors) -> None:
+    """
+    Generates a plot for the specified packed data with given options on
+    the supplied plot handle
+
+    Parameters
+    ----------
+    ax : matplotlib.axes._subplots.AxesSubplot
+        A handle for the figure to plot upon
+    itPack : tuple
+        A pack containing the following:
+            k:          An index for keeping track of colors/progress
+            run:        The run number of the trajectory
+            model:      The model of the object whose trajectory is plotted
+            instance:   The simulation instance of the object
+            xyz:        The x, y, and (for 3D plots) z values to plot
+    spec : PlotSpec
+        The plot configuration (style, colors, and run selection)
+    colors : np.ndarray
+        The colors to use if spec.autoColor is set to True
+
+    Returns
+    -------
+    None
+
+    """
+
+    k, ((run, model, instance), xyz) = itPack
+
+    shouldFade = (not spec.showAllRuns and spec.transparentRuns
+                  and run != spec.run)
+
+    plot_kwargs = {'label': f'{run}: {model} - {instance}',
+                   'alpha': 1.0 - (0.8 * shouldFade),
+                   'color': colors[k] if spec.autoColor else spec.plotColor,
+                   }
+
+    if spec.plotStyle == 'line':
+        ax.plot(*xyz, **plot_kwargs, linestyle=spec.lineStyle)
+    else:
+        ax.scatter(*xyz, **plot_kwargs, marker=spec.scatterStyle)
+    return
+
+
+def drawAssets(ax, aDF: pd.DataFrame, dimensions: int) -> list:
+    """
+    Draws the assets on the plot as one collection per category.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes._subplots.AxesSubplot
+        The subplot to draw upon
+    aDF : pd.DataFrame
+        The assets to draw (see assetPlotDF)
+    dimensions : int
+        Choices are 2 or 3
+
+    Returns
+    -------
+    list
+        Pairs of (PathCollection, labels) where each label describes
+        the marker at the same position in the collection
+
+    """
+    assetCollections = []
+    categories = sorted(aDF.category.unique())
+    for k, category in enumerate(categories):
+        cDF = aDF[aDF.category.values == category]
+        assetArgs = [cDF.x.values, cDF.y.values]
+        if dimensions == 3:
+            assetArgs += [cDF.z.values]
+        color = assetColors[k % len(assetColors)]
+        label = f'{category} ({len(cDF)})'
+        coll = ax.scatter(*assetArgs, marker='*', color=color,
+                          s=400, label=label)
+        names = [f'{n} - {i}' for n, i in zip(cDF.name, cDF.id)]
+        assetCollections.append((coll, names))
+    return assetCollections
+
+
+def resolveLimits(ax, limits: tuple, dimensions: int) -> tuple:
+    """
+    Returns the limits to be used in a plot based upon the default
+    limits given by pyplot and the limits (potentially) specified
+    by the user
+
+    Parameters
+    ----------
+    ax : matplotlib.axes._subplots.AxesSubplot
+        A handle to the subplot which will have new limits
+    limits : tuple
+        The (min, max) pairs for x, y, and z, where None means the
+        default limit is kept (see PlotSpec.limits)
+    dimensions : int
+        Choices are 2 or 3
+
+    Returns
+    -------
+    tuple
+        A six-element tuple of the minimum and maximum values for
+        x, y, and z, respectively
+
+    """
+    getters = [ax.get_xlim, ax.get_ylim]
+    if dimensions == 3:
+        getters.append(ax.get_zlim)
+
+    xyzLimits = []
+    for k, user in enumerate(limits):
+        if k >= len(getters):
+            # This guarantees a six-element return tuple each time
+            xyzLimits += [0, 0]
+            continue
+        defaults = getters[k]()
+        xyzLimits += [d if u is None else u for d, u in zip(defaults, user)]
+    return tuple(xyzLimits)
+
+
+def searchSpans(values: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                target: float, side: str = 'left') -> np.ndarray:
+    """
+    np.searchsorted within many sorted spans of an array at once. Every
+    span is bisected in step, so each step is one vectorized comparison
+    per span and no element outside the bisection is read.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The array, sorted within each span. NaN sorts last, as in
+        np.searchsorted.
+    starts : np.ndarray
+        The first index of each span
+    ends : np.ndarray
+        The index after the last of each span
+    target : float
+        The value to find
+    side : str, optional
+        'left' for the first index where values >= target, 'right' for
+        the first where values > target. The default is 'left'.
+
+    Returns
+    -------
+    np.ndarray
+        The index in values of the position found in each span
+
+    """
+    lo = np.array(starts, dtype='int64')
+    hi = np.array(ends, dtype='int64')
+    active = np.flatnonzero(lo < hi)
+    while len(active) > 0:
+        mid = (lo[active] + hi[active]) // 2
+        if side == 'left':
+            below = values[mid] < target
+        else:
+            below = values[mid] <= target
+        lo[active] = np.where(below, mid + 1, lo[active])
+        hi[active] = np.where(below, hi[active], mid)
+        active = active[lo[active] < hi[active]]
+    return lo
+
+
+def thinned(values: np.ndarray, maxPoints: int = None) -> np.ndarray:
+    """
+    Thins the points of a trajectory down to evenly spaced samples,
+    keeping the first and last points.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The values of one column of the trajectory
+    maxPoints : int, optional
+        The most points to keep. If None, every point is kept.
+        The default is None.
+
+    Returns
+    -------
+    np.ndarray
+        The values kept (values itself when nothing is dropped)
+
+    """
+    if maxPoints is None or len(values) <= maxPoints:
+        return values
+    keep = np.linspace(0, len(values) - 1, max(maxPoints, 2))
+    return values[keep.round().astype('int64')]
+
+
+def renderFigure(figure, pData: PlotData, aDF: pd.DataFrame,
+                 spec: PlotSpec, progress=None) -> tuple:
+    """
+    Draws trajectories and assets onto a figure along with the legend,
+    axis labels, gridlines, limits, and title described by the spec.
+    This does not depend on the GUI, so it can be used both for the
+    viewer pane and for batch plotting.
+
+    Parameters
+    ----------
+    figure : matplotlib.figure.Figure
+        The (empty) figure to draw upon
+    pData : PlotData
+        The trajectories to draw (see missilePlotData)
+    aDF : pd.DataFrame
+        The assets to draw (see assetPlotDF), or None
+    spec : PlotSpec
+        The plot configuration
+    progress : function, optional
+        Called as progress(k, total) every 20 trajectories so the caller
+        can update the user. The default is None.
+
+    Returns
+    -------
+    myplot : matplotlib.axes._subplots.AxesSubplot
+        The subplot that was drawn
+    assetCollections : list
+        The asset collections that were drawn (see drawAssets)
+
+    """
+    from matplotlib import cm
+    dimensions = plotDimensions(spec)
+    if dimensions == 3:
+        # Importing it registers the 3D projection
+        import mpl_toolkits.mplot3d  # noqa: F401
+
+    # Setting up subplot for showing all the plots
+    subplot_kwargs = {'projection': '3d' if dimensions == 3 else None}
+    myplot = figure.add_subplot(111, **subplot_kwargs)
+
+    # Every trajectory gets its own color. This guarantees the spectrum
+    # remains the same regardless of how many items you plot
+    numDFs = len(pData.trajectories)
+    colors = cm.rainbow(np.linspace(0, 1, numDFs))
+
+    # Looping through all possible unique IDs and model numbers
+    # and plotting each individual trajectory
+    lo, hi = pData.bounds
+    with tm.timer('plot.trajectories'):
+        for k, traj in enumerate(pData.trajectories):
+            if progress is not None and k % 20 == 0:
+                progress(k, numDFs)
+            rows = pData.index.span(lo[traj], hi[traj])
+            xyz = [thinned(values[rows], spec.maxPoints)
+                   for values in pData.xyz]
+            makePlot(myplot, (k, (pData.index.keys[traj], xyz)), spec,
+                     colors)
+
+    # Plotting the assets alongside the trajectories
+    assetCollections = []
+    if aDF is not None and spec.showAssets:
+        with tm.timer('plot.assets'):
+            assetCollections = drawAssets(myplot, aDF, dimensions)
+
+    # Show legend if selected
+    if spec.showLegend:
+        legend_kwargs = {'title': 'Run Number: Element - Instance',
+                         'fancybox': True, 'shadow': True, }
+
+        # Setting the location for the legend based on user input
+        if spec.legendLoc == 'Outside Right':
+            legend_kwargs['bbox_to_anchor'] = (1.1, 1.0)
+
+        with tm.timer('plot.legend'):
+            myplot.legend(**legend_kwargs)
+
+    # Adding Axes Labels
+    if spec.showXLabel:
+        myplot.set_xlabel(spec.xCol)
+    if spec.showYLabel:
+        myplot.set_ylabel(spec.yCol)
+    if dimensions == 3 and spec.showZLabel:
+        myplot.set_zlabel(spec.zCol)
+
+    # Adding gridlines, if necessary
+    if spec.gridMajor and dimensions == 2:
+        myplot.grid(True, which='major', alpha=0.8)
+    if spec.gridMinor and dimensions == 2:
+        myplot.minorticks_on()
+        myplot.grid(True, which='minor', alpha=0.2, linestyle='--',)
+
+    # Setting the min/max values for each variable
+    (xMin, xMax, yMin, yMax, zMin, zMax) = resolveLimits(myplot,
+                                                         spec.limits,
+                                                         dimensions)
+    myplot.set_xlim(xMin, xMax)
+    myplot.set_ylim(yMin, yMax)
+    if dimensions == 3:
+        myplot.set_zlim(zMin, zMax)
+
+    # Adding title with options, if necessary
+    if spec.title != '':
+        fontdict = {'fontsize': int(spec.titleSize),
+                    'color': spec.titleColor,
+                    'style': 'italic' if spec.titleItalic else 'normal',
+                    'fontweight': 'bold' if spec.titleBold else 'normal'}
+        myplot.set_title(spec.title, fontdict=fontdict)
+
+    return myplot, assetCollections
+
+
+def newFigure(spec: PlotSpec, figsize: tuple = None):
+    """
+    Creates an empty figure. Any xkcd styling must already be active
+    (see plotStyle).
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The plot configuration
+    figsize : tuple, optional
+        The figure size in inches. If None, the GUI defaults are used.
+        The default is None.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The new figure
+
+    """
+    from matplotlib.figure import Figure
+    if figsize is None:
+        figsize = (6, 4) if spec.xkcd else (3, 2)
+    return Figure(figsize=figsize)
+
+
+@contextmanager
+def plotStyle(spec: PlotSpec):
+    """
+    Applies the style a spec asks for (xkcd) to the figures created and
+    drawn inside the with-statement. An xkcd render holds styleLock
+    throughout, so it waits for (and holds off) drawing on other threads.
+
+    Parameters
+    ----------
+    spec : PlotSpec
+        The plot configuration
+
+    Yields
+    ------
+    None
+
+    """
+    if not spec.xkcd:
+        yield
+        return
+    import matplotlib.pyplot as plt
+    with styleLock, plt.xkcd():
+        yield
+
+
+def plotFigure(missileDF: pd.DataFrame, assets: pd.DataFrame, spec: PlotSpec,
+               figsize: tuple = None) -> tuple:
+    """
+    Creates a new figure and renders the plot described by the spec.
+    The xkcd style (if requested) applies to everything drawn.
+
+    Parameters
+    ----------
+    missileDF : pd.DataFrame
+        All of the loaded trajectory data
+    assets : pd.DataFrame
+        The asset DataFrame (see extra_functions.assetsDF), or None
+    spec : PlotSpec
+        The plot configuration
+    figsize : tuple, optional
+        The figure size in inches. If None, the GUI defaults are used.
+        The default is None.
+
+    Returns
+    -------
+    figure : matplotlib.figure.Figure
+        The rendered figure
+    myplot : matplotlib.axes._subplots.AxesSubplot
+        The subplot that was drawn
+
+    """
+    pData = missilePlotData(missileDF, spec)
+    aDF = None if assets is None else assetPlotDF(assets, spec)
+
+    with plotStyle(spec):
+        figure = newFigure(spec, figsize)
+        myplot, _ = renderFigure(figure, pData, aDF, spec)
+    return figure, myplot
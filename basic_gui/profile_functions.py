@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+One-off profiling of a single load or plot.
+
+A ProfileCapture is started when the user asks for the next load or plot
+to be profiled. Python code run inside capture.profiled() is profiled
+with cProfile, from any thread, and every allocation made while the
+capture is open is traced with tracemalloc. Finishing the capture writes
+
+    <label>-<date>.prof        the cProfile statistics, which can be
+                               read with pstats or snakeviz
+    <label>-<date>-alloc.txt   the lines that allocated the most memory
+
+and summarizes the functions that took the most time and where the
+reports were saved, for the status bar. Both tools slow the profiled
+code down noticeably, so a capture covers one operation and is never
+left running.
+"""
+
+# Module-Level Imports
+import cProfile
+import datetime
+import os
+import pstats
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+# What finishing a capture produced
+ProfileReport = namedtuple('ProfileReport',
+                           ['profFile', 'allocFile', 'summary'])
+
+# Allocations made by the tracing machinery itself are not reported
+ignoredFrames = (tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                 '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+class ProfileCapture():
+    def __init__(self, label: str, frames: int = 1) -> None:
+        """
+        Starts tracing allocations. Code is only profiled inside
+        profiled().
+
+        Parameters
+        ----------
+        label : str
+            What is being profiled, e.g. 'load' or 'plot'. Used to name
+            the report files.
+        frames : int, optional
+            The number of stack frames stored with each allocation.
+            The default is 1.
+
+        Returns
+        -------
+        None
+
+        """
+        self.label = label
+        self.profiles = []
+        self.startTime = time.time()
+
+        # Someone else may already be tracing; they keep doing so
+        self._ownsTracing = not tracemalloc.is_tracing()
+        if self._ownsTracing:
+            tracemalloc.start(frames)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def profiled(self):
+        """
+        Profiles the code run inside the with-statement, in the calling
+        thread. Each use adds to the statistics of the capture.
+
+        Yields
+        ------
+        None
+
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (from Python 3.12 a profiler
+            # sees every thread, so the code is already being profiled)
+            yield
+            return
+        self.profiles.append(profile)
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def finish(self, outDir: str, top: int = 20) -> ProfileReport:
+        """
+        Stops the capture and writes its reports.
+
+        Parameters
+        ----------
+        outDir : str
+            The directory to write the reports to. Created if needed.
+        top : int, optional
+            The number of allocating lines to report. The default is 20.
+
+        Returns
+        -------
+        ProfileReport
+            The report files and a one-line summary of the functions that
+            took the most time and where the reports were saved
+
+        """
+        elapsed = time.time() - self.startTime
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._ownsTracing:
+            tracemalloc.stop()
+
+        os.makedirs(outDir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        baseName = os.path.join(outDir, f'{self.label}-{stamp}')
+
+        # Profiles that saw no calls have no statistics to merge
+        stats = pstats.Stats()
+        for profile in self.profiles:
+            profile.create_stats()
+            if len(profile.stats) > 0:
+                stats.add(profile)
+        profFile = baseName + '.prof'
+        stats.dump_stats(profFile)
+
+        allocFile = baseName + '-alloc.txt'
+        writeAllocations(allocFile, snapshot, peak, top)
+
+        names = [name for name, _ in topFunctions(stats, 3)]
+        summary = (f'Profiled {self.label} ({elapsed:.1f}s), slowest: '
+                   + (', '.join(names) or 'none') +
+                   f'. Saved {os.path.basename(profFile)} and '
+                   f'{os.path.basename(allocFile)} to {outDir}')
+        return ProfileReport(profFile, allocFile, summary)
+
+
+def topFunctions(stats: pstats.Stats, count: int) -> list:
+    """
+    The functions that spent the most time in their own code.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The profile statistics
+    count : int
+        The number of functions to return
+
+    Returns
+    -------
+    list
+        (name, seconds) of each function, slowest first
+
+    """
+    # Each entry is (calls, primitive calls, own time, total time, callers)
+    entries = getattr(stats, 'stats', {})
+    slowest = sorted(entries.items(), key=lambda item: item[1][2],
+                     reverse=True)[:count]
+    functions = []
+    for (fileName, line, func), entry in slowest:
+        # Built-in functions have no file
+        if fileName != '~':
+            func = f'{func} ({os.path.basename(fileName)}:{line})'
+        functions.append((func, entry[2]))
+    return functions
+
+
+def writeAllocations(outFile: str, snapshot: tracemalloc.Snapshot,
+                     peak: int, top: int) -> None:
+    """
+    Writes the lines that allocated the most memory still held.
+
+    Parameters
+    ----------
+    outFile : str
+        The path of the report
+    snapshot : tracemalloc.Snapshot
+        The allocations traced
+    peak : int
+        The peak traced memory in bytes
+    top : int
+        The number of lines to report
+
+    Returns
+    -------
+    None
+
+    """
+    filters = [tracemalloc.Filter(False, pattern)
+               for pattern in ignoredFrames]
+    lines = snapshot.filter_traces(filters).statistics('lineno')
+    total = sum(stat.size for stat in lines)
+
+    with open(outFile, 'w') as out:
+        out.write(f'Peak traced memory: {peak / 2**20:.1f} MiB\n')
+        out.write(f'Still allocated: {total / 2**20:.1f} MiB '
+                  f'in {len(lines)} lines\n\n')
+        for k, stat in enumerate(lines[:top]):
+            out.write(f'#{k+1}: {stat}\n')
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+"""
+Spatial queries between fixed assets and trajectories.
+
+The AssetIndex bins asset positions into a uniform grid so that radius
+queries only have to look at nearby cells, and computes the closest
+approach of every trajectory to every asset with chunked, vectorized
+distance calculations reduced per trajectory, instead of nested Python
+loops.
+"""
+
+# File Imports
+import plotting_functions as plf
+
+# Module-Level Imports
+import itertools as it
+import numpy as np
+import pandas as pd
+
+# The trajectory columns matching the asset x/y/z columns
+# (See extra_functions.assetColMap)
+defaultTrajCols = ('Missile Position - East',
+                   'Missile Position - North',
+                   'Missile Position - Up')
+defaultAssetCols = ('x', 'y', 'z')
+
+
+class AssetIndex():
+    def __init__(self, assets: pd.DataFrame,
+                 cols: tuple = defaultAssetCols,
+                 cellSize: float = 1000.0) -> None:
+        """
+        A uniform grid over asset positions for proximity queries.
+
+        Parameters
+        ----------
+        assets : pd.DataFrame
+            The asset DataFrame (see extra_functions.assetsDF)
+        cols : tuple, optional
+            The columns of the asset DataFrame holding the positions.
+            The default is ('x', 'y', 'z').
+        cellSize : float, optional
+            The edge length of each grid cell in meters.
+            The default is 1000.0.
+
+        Returns
+        -------
+        None
+
+        """
+        self.assets = assets.reset_index(drop=True)
+        self.cols = tuple(cols)
+        self.cellSize = float(cellSize)
+
+        positions = self.assets[list(self.cols)]
+        self.positions = positions.to_numpy(dtype='float64')
+        self.runs = self.assets['run'].to_numpy(dtype='int64')
+
+        # Assets without a position in these columns cannot be indexed
+        self.valid = ~np.isnan(self.positions).any(axis=1)
+
+        self.grid = {}
+        cells = np.floor(self.positions / self.cellSize)
+        for k in np.flatnonzero(self.valid):
+            cell = tuple(cells[k].astype('int64').tolist())
+            self.grid.setdefault(cell, []).append(k)
+        self.cells = np.array(list(self.grid), dtype='int64').reshape(-1, 3)
+
+    def __len__(self) -> int:
+        """
+        The number of assets in the index.
+
+        Returns
+        -------
+        int
+            The number of assets
+
+        """
+        return len(self.assets)
+
+    def _candidates(self, cells: np.ndarray, radius: float) -> np.ndarray:
+        """
+        Collects the assets in every grid cell within reach of the
+        given cells.
+
+        Parameters
+        ----------
+        cells : np.ndarray
+            An (n, 3) array of integer grid cells
+        radius : float
+            The search radius in meters
+
+        Returns
+        -------
+        np.ndarray
+            The sorted, unique indices of the candidate assets
+
+        """
+        reach = int(np.ceil(radius / self.cellSize))
+
+        # A wide search is cheaper to check against the occupied cells
+        # than to list every cell it touches
+        if (2 * reach + 1) ** 3 > len(self.cells):
+            step = max(2**20 // max(len(self.cells), 1), 1)
+            reached = np.zeros(len(self.cells), dtype=bool)
+            for start in range(0, len(cells), step):
+                chunk = cells[start:start + step]
+                gaps = np.abs(self.cells[None, :, :] - chunk[:, None, :])
+                reached |= (gaps.max(axis=2) <= reach).any(axis=0)
+            touched = self.cells[reached]
+        else:
+            offsets = np.array(list(it.product(range(-reach, reach + 1),
+                                               repeat=3)))
+
+            # Every cell touched by the search, without repeats
+            touched = np.unique((cells[:, None, :]
+                                 + offsets[None, :, :]).reshape(-1, 3),
+                                axis=0)
+
+        found = [self.grid[cell] for cell in map(tuple, touched.tolist())
+                 if cell in self.grid]
+        if len(found) == 0:
+            return np.array([], dtype='int64')
+        return np.unique(np.concatenate(found))
+
+    def near(self, point, radius: float) -> np.ndarray:
+        """
+        Finds the assets within a radius of a single point.
+
+        Parameters
+        ----------
+        point : Vector
+            The location to search around
+        radius : float
+            The search radius in meters
+
+        Returns
+        -------
+        np.ndarray
+            The indices (rows of self.assets) of the assets found
+
+        """
+        return self.passedNear(np.atleast_2d(point), radius)
+
+    def passedNear(self, points: np.ndarray, radius: float) -> np.ndarray:
+        """
+        Finds the assets that any of the given points pass within a
+        radius of. Only assets in grid cells near the points are
+        checked, and the distance checks are vectorized.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            An (n, 3) array of trajectory points
+        radius : float
+            The search radius in meters
+
+        Returns
+        -------
+        np.ndarray
+            The indices (rows of self.assets) of the assets found
+
+        """
+        points = np.asarray(points, dtype='float64')
+        points = points[~np.isnan(points).any(axis=1)]
+        if len(points) == 0 or len(self.grid) == 0:
+            return np.array([], dtype='int64')
+
+        cells = np.unique(np.floor(points / self.cellSize).astype('int64'),
+                          axis=0)
+        candidates = self._candidates(cells, radius)
+        if len(candidates) == 0:
+            return candidates
+
+        dists = minDistances(points, self.positions[candidates])
+        return candidates[dists <= radius]
+
+    def closestApproach(self, trajDF: pd.DataFrame,
+                        trajCols: tuple = defaultTrajCols,
+                        sameRun: bool = True,
+                        radius: float = None,
+                        index=None,
+                        chunkSize: int = 2**20) -> pd.DataFrame:
+        """
+        Finds the closest approach of every trajectory to every asset.
+
+        Trajectories are identified by (RunNumber, Model, Instance) and
+        taken from a TrajectoryIndex, so the rows of each trajectory are
+        a span of the index order. Distances are computed for a chunk of
+        rows against the assets of interest at once and reduced per
+        trajectory with np.minimum.reduceat over the trajectory offsets,
+        so memory is bounded by the chunk size rather than by the number
+        of points times the number of assets.
+
+        Parameters
+        ----------
+        trajDF : pd.DataFrame
+            The trajectory data (see SimpleGUI.missileDF)
+        trajCols : tuple, optional
+            The trajectory columns matching the asset position columns.
+            The default is the missile East/North/Up position.
+        sameRun : bool, optional
+            Whether trajectories are only compared against assets from
+            the same run. The default is True.
+        radius : float, optional
+            If given, only closest approaches within this distance
+            (in meters) are returned, and only assets in grid cells the
+            trajectories pass near are measured. The default is None.
+        index : TrajectoryIndex, optional
+            The trajectories of trajDF. If None, it is built here.
+            The default is None.
+        chunkSize : int, optional
+            The number of point/asset distances computed at once.
+            The default is 2**20.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per trajectory/asset pair, sorted by distance
+
+        """
+        outCols = list(plf.trajectoryCols) + ['Asset', 'Asset ID',
+                                              'Category', 'Distance', 'Time']
+        if index is None:
+            index = plf.TrajectoryIndex(trajDF)
+        if len(index) == 0 or not self.valid.any():
+            return pd.DataFrame({col: [] for col in outCols})
+
+        # Points and times in index order, so trajectory k is the span
+        # offsets[k]:offsets[k + 1]
+        points = trajDF[list(trajCols)].to_numpy(dtype='float64')
+        times = (trajDF['Time'].to_numpy(dtype='float64')
+                 if 'Time' in trajDF.columns
+                 else np.full(len(trajDF), np.nan))
+        if not index.contiguous:
+            points, times = points[index.order], times[index.order]
+
+        # Trajectories are sorted by run, so each run is a span of them
+        if sameRun:
+            runVals, firsts = np.unique(index.runs, return_index=True)
+            bounds = np.append(firsts, len(index))
+        else:
+            runVals, bounds = [None], np.array([0, len(index)])
+
+        validAssets = np.flatnonzero(self.valid)
+        found = []
+        for run, k0, k1 in zip(runVals, bounds[:-1], bounds[1:]):
+            assetRows = (validAssets if run is None
+                         else validAssets[self.runs[validAssets] == run])
+            offsets = index.offsets[k0:k1 + 1]
+            if radius is not None and len(assetRows) > 0:
+                near = self.passedNear(points[offsets[0]:offsets[-1]],
+                                       radius)
+                assetRows = np.intersect1d(assetRows, near)
+            if len(assetRows) == 0:
+                continue
+
+            dists, rows = nearestPoints(points, offsets,
+                                        self.positions[assetRows],
+                                        chunkSize)
+            traj, asset = np.nonzero(np.isfinite(dists))
+            found.append((traj + k0, assetRows[asset],
+                          dists[traj, asset], rows[traj, asset]))
+
+        if len(found) == 0:
+            return pd.DataFrame({col: [] for col in outCols})
+        traj, asset, dists, rows = (np.concatenate(part)
+                                    for part in zip(*found))
+        if radius is not None:
+            keep = dists <= radius
+            traj, asset, dists, rows = (traj[keep], asset[keep],
+                                        dists[keep], rows[keep])
+
+        keys = pd.MultiIndex.from_tuples(index.keys)[traj]
+        assets = self.assets.iloc[asset]
+        out = pd.DataFrame({
+            'RunNumber': keys.get_level_values(0),
+            'Model': keys.get_level_values(1),
+            'Instance': keys.get_level_values(2),
+            'Asset': assets.name.to_numpy(),
+            'Asset ID': assets.id.to_numpy(),
+            'Category': assets.category.to_numpy(),
+            'Distance': dists,
+            'Time': times[rows], })
+        return out.sort_values('Distance', ignore_index=True)
+
+
+def nearestPoints(points: np.ndarray, offsets: np.ndarray,
+                  targets: np.ndarray, chunkSize: int = 2**20) -> tuple:
+    """
+    Finds, for each trajectory and each target, the trajectory point
+    nearest the target. Rows are processed in chunks of about chunkSize
+    distances, each reduced per trajectory with np.minimum.reduceat.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        An (n, 3) array of points, stored trajectory by trajectory
+    offsets : np.ndarray
+        The first row of each trajectory, followed by the row after the
+        last one. Every trajectory has at least one row.
+    targets : np.ndarray
+        An (m, 3) array of targets
+
+    Returns
+    -------
+    dists : np.ndarray
+        A (trajectories, m) array of the smallest distances, inf where a
+        trajectory has no valid point
+    rows : np.ndarray
+        A (trajectories, m) array of the rows of the nearest points
+
+    """
+    nTraj = len(offsets) - 1
+    dists = np.full((nTraj, len(targets)), np.inf)
+    rows = np.zeros((nTraj, len(targets)), dtype='int64')
+    step = max(chunkSize // max(len(targets), 1), 1)
+    noRow = np.iinfo('int64').max
+
+    for start in range(offsets[0], offsets[-1], step):
+        stop = min(start + step, offsets[-1])
+
+        # The trajectories with rows in this chunk, cut to the chunk
+        k0 = np.searchsorted(offsets, start, side='right') - 1
+        k1 = np.searchsorted(offsets, stop, side='left')
+        edges = np.clip(offsets[k0:k1 + 1], start, stop) - start
+
+        diffs = points[start:stop, None, :] - targets[None, :, :]
+        chunk = np.sqrt(np.einsum('ijk,ijk->ij', diffs, diffs))
+        chunk[np.isnan(chunk)] = np.inf
+        chunkMin = np.minimum.reduceat(chunk, edges[:-1], axis=0)
+
+        # The first row of each trajectory reaching its minimum
+        segment = np.repeat(np.arange(k1 - k0), np.diff(edges))
+        chunkRows = np.where(chunk == chunkMin[segment],
+                             np.arange(start, stop)[:, None], noRow)
+        chunkRows = np.minimum.reduceat(chunkRows, edges[:-1], axis=0)
+
+        # A trajectory split between chunks keeps its earliest minimum
+        better = chunkMin < dists[k0:k1]
+        dists[k0:k1][better] = chunkMin[better]
+        rows[k0:k1][better] = chunkRows[better]
+    return dists, rows
+
+
+def minDistances(points: np.ndarray, targets: np.ndarray,
+                 chunkSize: int = 100000) -> np.ndarray:
+    """
+    Computes, for each target, the smallest distance to any point.
+    Points are processed in chunks to bound the memory used by the
+    intermediate distance matrix.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        An (n, 3) array of points
+    targets : np.ndarray
+        An (m, 3) array of targets
+    chunkSize : int, optional
+        The number of points processed at once. The default is 100000.
+
+    Returns
+    -------
+    np.ndarray
+        An array of length m containing the smallest distances
+
+    """
+    best = np.full(len(targets), np.inf)
+    for start in range(0, len(points), chunkSize):
+        chunk = points[start:start + chunkSize]
+        diffs = chunk[:, None, :] - targets[None, :, :]
+        dists = np.sqrt(np.einsum('ijk,ijk->ij', diffs, diffs))
+        best = np.minimum(best, dists.min(axis=0))
+    return best
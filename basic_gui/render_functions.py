@@ -0,0 +1,717 @@
+# -*- coding: utf-8 -*-
+
+"""
+Background rendering of plots.
+
+A PlotRenderer draws each requested plot onto an off-screen figure in a
+worker thread, so the GUI stays responsive while trajectories are added.
+While a render is running, snapshots of the partially drawn figure are
+posted as PNG images for the GUI to display. Submitting a new plot
+cancels the render in flight, and messages from superseded renders are
+dropped.
+
+The renderer does not know about tkinter. The GUI polls for messages
+with poll() from its own thread and decides how to display them.
+
+Finished plots are kept in a FigureCache, keyed by the version of the
+loaded data and the plot spec, so going back to an earlier view does not
+need to render again.
+"""
+
+# File Imports
+import plotting_functions as plf
+
+# Module-Level Imports
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# matplotlib is imported where it is used, so the GUI can start without it
+
+
+class RenderCancelled(Exception):
+    """
+    Raised inside a worker thread when its render has been superseded.
+    """
+
+
+class RenderJob():
+    def __init__(self, number: int, spec: plf.PlotSpec, pData, aDF,
+                 figsize: tuple, dpi: float, capture=None) -> None:
+        """
+        A single plot to be rendered in the background.
+
+        Parameters
+        ----------
+        number : int
+            Identifies the job. Increases with every submitted job.
+        spec : PlotSpec
+            The plot configuration
+        pData : PlotData
+            The trajectories to draw
+            (see plotting_functions.missilePlotData)
+        aDF : pd.DataFrame
+            The assets to draw (see plotting_functions.assetPlotDF)
+        figsize : tuple
+            The figure size in inches
+        dpi : float
+            The figure resolution
+        capture : ProfileCapture, optional
+            Profiles the render (see profile_functions). If None, the
+            render is not profiled. The default is None.
+
+        Returns
+        -------
+        None
+
+        """
+        self.number = number
+        self.spec = spec
+        self.pData = pData
+        self.aDF = aDF
+        self.figsize = figsize
+        self.dpi = dpi
+        self.capture = capture
+        self.cancelled = threading.Event()
+
+
+class PlotRenderer():
+    def __init__(self, previewInterval: float = 0.5) -> None:
+        """
+        Renders plots in worker threads, one job at a time being current.
+
+        Parameters
+        ----------
+        previewInterval : float, optional
+            The minimum number of seconds between snapshots of a partially
+            drawn figure. Snapshots cost a full draw, so they are throttled.
+            The default is 0.5.
+
+        Returns
+        -------
+        None
+
+        """
+        self.previewInterval = previewInterval
+        self.messages = queue.Queue()
+        self._lock = threading.Lock()
+        self._count = 0
+        self._current = None
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether a job is currently being rendered.
+
+        Returns
+        -------
+        bool
+            True if a job has been submitted and not yet finished
+
+        """
+        with self._lock:
+            return self._current is not None
+
+    def submit(self, spec: plf.PlotSpec, pData, aDF, figsize: tuple,
+               dpi: float = 100, capture=None) -> int:
+        """
+        Starts rendering a plot in a worker thread, cancelling any render
+        already in flight.
+
+        Parameters
+        ----------
+        spec : PlotSpec
+            The plot configuration
+        pData : PlotData
+            The trajectories to draw
+            (see plotting_functions.missilePlotData)
+        aDF : pd.DataFrame
+            The assets to draw (see plotting_functions.assetPlotDF)
+        figsize : tuple
+            The figure size in inches
+        dpi : float, optional
+            The figure resolution. The default is 100.
+        capture : ProfileCapture, optional
+            Profiles the render (see profile_functions). If None, the
+            render is not profiled. The default is None.
+
+        Returns
+        -------
+        int
+            The job number, which tags every message about this job
+
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current.cancelled.set()
+            self._count += 1
+            job = RenderJob(self._count, spec, pData, aDF, figsize, dpi,
+                            capture)
+            self._current = job
+
+        worker = threading.Thread(target=self._run, args=(job, ),
+                                  daemon=True)
+        worker.start()
+        return job.number
+
+    def cancel(self) -> None:
+        """
+        Cancels the render in flight, if any.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current.cancelled.set()
+                self._current = None
+
+    def poll(self) -> list:
+        """
+        Collects the messages posted by the worker threads since the last
+        poll. Messages from superseded jobs are discarded.
+
+        Each message is a tuple starting with its kind and job number:
+            ('progress', number, k, total, image)
+                image is a base64 PNG snapshot, or None if no snapshot
+                was taken
+            ('done', number, figure, myplot, assetCollections)
+            ('error', number, exception)
+
+        Returns
+        -------
+        list
+            The messages of the current job, oldest first
+
+        """
+        found = []
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                current = self._current
+                isCurrent = (current is not None
+                             and message[1] == current.number)
+                if isCurrent and message[0] in ('done', 'error'):
+                    self._current = None
+            if isCurrent:
+                found.append(message)
+        return found
+
+    def _run(self, job: RenderJob) -> None:
+        """
+        Renders a job and posts its progress and result. Runs in a
+        worker thread.
+
+        Parameters
+        ----------
+        job : RenderJob
+            The job to render
+
+        Returns
+        -------
+        None
+
+        """
+        lastPreview = [time.time()]
+
+        def progress(k, total):
+            if job.cancelled.is_set():
+                raise RenderCancelled()
+            image = None
+            if time.time() - lastPreview[0] >= self.previewInterval:
+                image = figureImage(figure)
+                lastPreview[0] = time.time()
+            self.messages.put(('progress', job.number, k, total, image))
+
+        # Only the render is profiled, not posting its result
+        profiling = (contextlib.nullcontext() if job.capture is None
+                     else job.capture.profiled())
+        try:
+            with profiling, plf.plotStyle(job.spec):
+                figure = plf.newFigure(job.spec, job.figsize)
+                figure.set_dpi(job.dpi)
+                result = plf.renderFigure(figure, job.pData, job.aDF,
+                                          job.spec, progress=progress)
+        except RenderCancelled:
+            return
+        except Exception as err:
+            self.messages.put(('error', job.number, err))
+            return
+
+        if not job.cancelled.is_set():
+            self.messages.put(('done', job.number, figure) + tuple(result))
+
+
+def figureImage(figure) -> str:
+    """
+    Draws a figure off-screen and encodes it for display.
+
+    Parameters
+    ----------
+    figure : matplotlib.figure.Figure
+        The figure to draw
+
+    Returns
+    -------
+    str
+        The figure as a base64-encoded PNG, which tk.PhotoImage accepts
+        as its data
+
+    """
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=figure.dpi)
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def canvasImage(canvas) -> str:
+    """
+    Encodes what an Agg-based canvas last drew, without drawing again.
+
+    Parameters
+    ----------
+    canvas : FigureCanvasAgg
+        A canvas (such as FigureCanvasTkAgg) that has already been drawn
+
+    Returns
+    -------
+    str
+        The canvas contents as a base64-encoded PNG
+
+    """
+    import matplotlib.image as mpimg
+    buffer = io.BytesIO()
+    mpimg.imsave(buffer, canvas.buffer_rgba(), format='png')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def specKey(dataVersion: str, spec: plf.PlotSpec, size: tuple = None) -> str:
+    """
+    Builds the cache key for a plot.
+
+    Parameters
+    ----------
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+    spec : PlotSpec
+        The plot configuration
+    size : tuple, optional
+        The size of the image in pixels, for keys of bitmaps.
+        The default is None.
+
+    Returns
+    -------
+    str
+        A hexadecimal digest of the arguments
+
+    """
+    size = None if size is None else [int(v) for v in size]
+    text = json.dumps([dataVersion, spec.toDict(), size], sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class FigureCache():
+    def __init__(self, maxEntries: int = 8, cacheDir: str = None,
+                 maxFiles: int = 200) -> None:
+        """
+        A cache of rendered plots.
+
+        Finished figures are held in memory, the least recently used
+        being dropped once there are more than maxEntries. If a cacheDir
+        is given, bitmaps of the plots are also written there as PNG
+        files, so they can be shown right away in later sessions while
+        the figure itself is rendered again.
+
+        Parameters
+        ----------
+        maxEntries : int, optional
+            The number of figures held in memory. The default is 8.
+        cacheDir : str, optional
+            The directory for bitmaps. If None, nothing is written to
+            disk. The default is None.
+        maxFiles : int, optional
+            The number of bitmaps kept in cacheDir, the oldest being
+            deleted first. The default is 200.
+
+        Returns
+        -------
+        None
+
+        """
+        self.maxEntries = maxEntries
+        self.cacheDir = cacheDir
+        self.maxFiles = maxFiles
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        The number of figures held in memory.
+
+        Returns
+        -------
+        int
+            The number of figures
+
+        """
+        return len(self.entries)
+
+    def get(self, dataVersion: str, spec: plf.PlotSpec):
+        """
+        Looks up a rendered figure.
+
+        Parameters
+        ----------
+        dataVersion : str
+            Identifies the loaded data (see extra_functions.dataVersion)
+        spec : PlotSpec
+            The plot configuration
+
+        Returns
+        -------
+        tuple or None
+            (figure, myplot, assetCollections) if the plot is cached,
+            otherwise None
+
+        """
+        key = specKey(dataVersion, spec)
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, dataVersion: str, spec: plf.PlotSpec,
+            rendered: tuple) -> None:
+        """
+        Stores a rendered figure, dropping the least recently used
+        figures if the cache is full.
+
+        Parameters
+        ----------
+        dataVersion : str
+            Identifies the loaded data (see extra_functions.dataVersion)
+        spec : PlotSpec
+            The plot configuration
+        rendered : tuple
+            (figure, myplot, assetCollections)
+
+        Returns
+        -------
+        None
+
+        """
+        key = specKey(dataVersion, spec)
+        self.entries[key] = tuple(rendered)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def imagePath(self, dataVersion: str, spec: plf.PlotSpec,
+                  size: tuple) -> str:
+        """
+        The file a bitmap of a plot is stored in.
+
+        Parameters
+        ----------
+        dataVersion : str
+            Identifies the loaded data (see extra_functions.dataVersion)
+        spec : PlotSpec
+            The plot configuration
+        size : tuple
+            The size of the image in pixels
+
+        Returns
+        -------
+        str
+            The path of the PNG file, or None if there is no cacheDir
+
+        """
+        if self.cacheDir is None:
+            return None
+        key = specKey(dataVersion, spec, size)
+        return os.path.join(self.cacheDir, f'{key}.png')
+
+    def getImage(self, dataVersion: str, spec: plf.PlotSpec,
+                 size: tuple) -> str:
+        """
+        Looks up a bitmap of a plot on disk.
+
+        Parameters
+        ----------
+        dataVersion : str
+            Identifies the loaded data (see extra_functions.dataVersion)
+        spec : PlotSpec
+            The plot configuration
+        size : tuple
+            The size of the image in pixels
+
+        Returns
+        -------
+        str
+            The base64-encoded PNG, or None if it is not cached
+
+        """
+        path = self.imagePath(dataVersion, spec, size)
+        if path is None or not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'rb') as in_:
+                data = in_.read()
+        except OSError:
+            return None
+        return base64.b64encode(data).decode('ascii')
+
+    def putImage(self, dataVersion: str, spec: plf.PlotSpec,
+                 size: tuple, image: str) -> None:
+        """
+        Writes a bitmap of a plot to disk, deleting the oldest bitmaps
+        if there are more than maxFiles. Failing to write is not an
+        error; the plot simply is not cached.
+
+        Parameters
+        ----------
+        dataVersion : str
+            Identifies the loaded data (see extra_functions.dataVersion)
+        spec : PlotSpec
+            The plot configuration
+        size : tuple
+            The size of the image in pixels
+        image : str
+            The base64-encoded PNG
+
+        Returns
+        -------
+        None
+
+        """
+        path = self.imagePath(dataVersion, spec, size)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with open(path, 'wb') as out:
+                out.write(base64.b64decode(image))
+
+            files = [os.path.join(self.cacheDir, f)
+                     for f in os.listdir(self.cacheDir)
+                     if f.endswith('.png')]
+            if len(files) > self.maxFiles:
+                files.sort(key=os.path.getmtime)
+                for oldFile in files[:len(files) - self.maxFiles]:
+                    os.remove(oldFile)
+        except OSError:
+            return
+
+    def clear(self) -> None:
+        """
+        Drops every figure held in memory. Bitmaps on disk are kept,
+        since their keys include the data version.
+
+        Returns
+        -------
+        None
+
+        """
+        self.entries.clear()
+
+
+class PlotScheduler():
+    def __init__(self, after, afterCancel, plotFunc,
+                 minDelay: int = 50, maxDelay: int = 1000,
+                 typingDelay: int = 1500, renderFactor: float = 0.5) -> None:
+        """
+        Coalesces plot requests into at most one pending plot.
+
+        Every change to a plot option requests a plot. Instead of
+        plotting right away, the request (re)starts a short timer, so a
+        burst of changes results in a single plot once the changes stop.
+        The wait grows with the time the last plot took to render, since
+        slow plots are the ones most worth not repeating.
+
+        Parameters
+        ----------
+        after : function
+            Schedules a call, as tk.Misc.after(ms, func)
+        afterCancel : function
+            Cancels a scheduled call, as tk.Misc.after_cancel(id)
+        plotFunc : function
+            Called with no arguments to make the plot
+        minDelay : int, optional
+            The shortest wait in milliseconds. The default is 50.
+        maxDelay : int, optional
+            The longest wait in milliseconds for an option change.
+            The default is 1000.
+        typingDelay : int, optional
+            The wait in milliseconds while the user is typing.
+            The default is 1500.
+        renderFactor : float, optional
+            The wait, as a fraction of the last render time.
+            The default is 0.5.
+
+        Returns
+        -------
+        None
+
+        """
+        self.after = after
+        self.afterCancel = afterCancel
+        self.plotFunc = plotFunc
+        self.minDelay = minDelay
+        self.maxDelay = maxDelay
+        self.typingDelay = typingDelay
+        self.renderFactor = renderFactor
+
+        self._after_id = None
+        self.lastRenderTime = 0.0
+        self.requests = 0
+        self.plots = 0
+        self.renders = 0
+        self.skipped = 0
+
+    @property
+    def pending(self) -> bool:
+        """
+        Whether a plot is waiting to be made.
+
+        Returns
+        -------
+        bool
+            True if a plot has been requested but not yet started
+
+        """
+        return self._after_id is not None
+
+    def delay(self, typing: bool = False) -> int:
+        """
+        The time to wait before plotting.
+
+        Parameters
+        ----------
+        typing : bool, optional
+            Whether the request came from the user typing.
+            The default is False.
+
+        Returns
+        -------
+        int
+            The wait in milliseconds
+
+        """
+        wait = int(1000 * self.renderFactor * self.lastRenderTime)
+        wait = min(self.maxDelay, max(self.minDelay, wait))
+        if typing:
+            wait = max(wait, self.typingDelay)
+        return wait
+
+    def request(self, typing: bool = False) -> None:
+        """
+        Asks for a plot, replacing any plot that is still waiting.
+
+        Parameters
+        ----------
+        typing : bool, optional
+            Whether the request came from the user typing, which waits
+            longer for the user to finish. The default is False.
+
+        Returns
+        -------
+        None
+
+        """
+        self.requests += 1
+        self.cancel()
+        self._after_id = self.after(self.delay(typing), self._fire)
+
+    def cancel(self) -> None:
+        """
+        Drops the plot that is waiting, if any.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._after_id is not None:
+            self.afterCancel(self._after_id)
+            self._after_id = None
+
+    def _fire(self) -> None:
+        """
+        Makes the plot once the wait is over.
+
+        Returns
+        -------
+        None
+
+        """
+        self._after_id = None
+        self.plots += 1
+        self.plotFunc()
+
+    def rendered(self, seconds: float) -> None:
+        """
+        Records how long a plot took to render, which sets the wait
+        for the next request.
+
+        Parameters
+        ----------
+        seconds : float
+            The render time
+
+        Returns
+        -------
+        None
+
+        """
+        self.renders += 1
+        self.lastRenderTime = seconds
+
+    def unchanged(self) -> None:
+        """
+        Records that a plot was not made because nothing on screen
+        would change.
+
+        Returns
+        -------
+        None
+
+        """
+        self.skipped += 1
+
+    def stats(self) -> dict:
+        """
+        Summarizes the requests made and the work done.
+
+        Returns
+        -------
+        dict
+            requests: plot requests made
+            plots: plots started (requests left after coalescing)
+            renders: plots that finished rendering
+            skipped: plots not made because nothing changed
+            coalesced: requests that did not lead to a plot
+            lastRenderTime: the last render time in seconds
+            delay: the current wait in milliseconds
+
+        """
+        return {'requests': self.requests,
+                'plots': self.plots,
+                'renders': self.renders,
+                'skipped': self.skipped,
+                'coalesced': self.requests - self.plots - self.pending,
+                'lastRenderTime': self.lastRenderTime,
+                'delay': self.delay(), }
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+A binary store of loaded trajectory data, opened as memory maps.
+
+Once a campaign has been read, its trajectory data is written to the load
+cache as one .npy file per column, with the rows in trajectory order,
+alongside an offset table giving the first row of each trajectory. Text
+columns (model, instance, path, ...) are stored as categorical codes and
+decoded to their original dtype when opened, so data opened from a store
+has the same dtypes as data read from the files.
+
+Opening the store maps the numeric column files read-only (np.load with
+mmap_mode), so the DataFrame built from them holds no private copy of
+that data: selecting a trajectory for plotting is a slice of the mapped
+file, pages are read from disk only when drawn, and every instance of
+the GUI on the same machine shares the operating system's page cache
+instead of holding the data itself.
+
+Stores are keyed by the data version (see extra_functions.dataVersion),
+so a store is never out of date, and only the most recent few are kept.
+"""
+
+# File Imports
+import plotting_functions as plf
+
+# Module-Level Imports
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+# Bumped whenever the layout changes. The version is part of the name of
+# each store, so older stores are never opened and are pruned in time
+storeVersion = 2
+
+# The description of the columns and trajectories in each store
+metaFile = 'meta.json'
+offsetsFile = 'offsets.npy'
+
+
+def storePath(storeDir: str, dataVersion: str) -> str:
+    """
+    The directory a store is kept in.
+
+    Parameters
+    ----------
+    storeDir : str
+        The directory holding every store of a campaign
+        (see extra_functions.cacheDir)
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    str
+        The path of the store, which may not exist yet
+
+    """
+    return os.path.join(storeDir, f'store-v{storeVersion}-{dataVersion}')
+
+
+def hasStore(storeDir: str, dataVersion: str) -> bool:
+    """
+    Whether a complete store exists for some data.
+
+    Parameters
+    ----------
+    storeDir : str
+        The directory holding every store of a campaign
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    bool
+        True if the store was written in full
+
+    """
+    path = storePath(storeDir, dataVersion)
+    return os.path.isfile(os.path.join(path, metaFile))
+
+
+def isMapped(values) -> bool:
+    """
+    Whether an array is a view of a memory-mapped file.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The array
+
+    Returns
+    -------
+    bool
+        True if the array (or an array it is a view of) is a np.memmap
+
+    """
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+
+def saveStore(missileDF: pd.DataFrame, index, storeDir: str,
+              dataVersion: str, maxStores: int = 4) -> bool:
+    """
+    Writes trajectory data to a store. The store is written under a
+    temporary name and renamed once complete, so a store that exists is
+    always whole. Failing to write is not an error; the data simply
+    stays in memory.
+
+    Parameters
+    ----------
+    missileDF : pd.DataFrame
+        All of the loaded trajectory data
+    index : TrajectoryIndex
+        The trajectories of missileDF, which must be stored contiguously
+        (see plotting_functions.TrajectoryIndex)
+    storeDir : str
+        The directory holding every store of a campaign
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+    maxStores : int, optional
+        The number of stores kept, the least recently written being
+        deleted first. The default is 4.
+
+    Returns
+    -------
+    bool
+        True if the store exists afterwards
+
+    """
+    if not index.contiguous or len(index.order) != len(missileDF):
+        return False
+    path = storePath(storeDir, dataVersion)
+    if hasStore(storeDir, dataVersion):
+        return True
+
+    tempPath = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(tempPath, exist_ok=True)
+        columns = []
+        for k, (name, series) in enumerate(missileDF.items()):
+            fileName = f'col{k}.npy'
+            column = {'name': name, 'file': fileName}
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                values = series.to_numpy()
+            else:
+                categorical = pd.Categorical(series)
+                values = categorical.codes
+                column['categories'] = categorical.categories.tolist()
+                column['dtype'] = str(series.dtype)
+            np.save(os.path.join(tempPath, fileName), values)
+            columns.append(column)
+
+        np.save(os.path.join(tempPath, offsetsFile), index.offsets)
+        meta = {'version': storeVersion,
+                'rows': len(missileDF),
+                'columns': columns,
+                'keys': [list(key) for key in index.keys], }
+
+        # The description is written last; it marks the store complete.
+        # numpy scalars (run numbers, categories) are written as numbers
+        with open(os.path.join(tempPath, metaFile), 'w') as out:
+            json.dump(meta, out, default=lambda value: value.item())
+        os.replace(tempPath, path)
+    except (OSError, TypeError, ValueError, AttributeError):
+        shutil.rmtree(tempPath, ignore_errors=True)
+        return hasStore(storeDir, dataVersion)
+
+    pruneStores(storeDir, maxStores)
+    return True
+
+
+def openStore(storeDir: str, dataVersion: str) -> tuple:
+    """
+    Opens a store as memory-mapped trajectory data.
+
+    Parameters
+    ----------
+    storeDir : str
+        The directory holding every store of a campaign
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    tuple
+        (missileDF, index), the trajectory data backed by the store and
+        its TrajectoryIndex, or None if there is no usable store
+
+    """
+    path = storePath(storeDir, dataVersion)
+    try:
+        with open(os.path.join(path, metaFile), 'r') as in_:
+            meta = json.load(in_)
+        if meta['version'] != storeVersion:
+            return None
+
+        data = {}
+        for column in meta['columns']:
+            values = np.load(os.path.join(path, column['file']),
+                             mmap_mode='r')
+            if len(values) != meta['rows']:
+                return None
+            if 'categories' in column:
+                values = decodeColumn(values, column['categories'],
+                                      column['dtype'])
+            data[column['name']] = values
+        offsets = np.load(os.path.join(path, offsetsFile))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    # Building the DataFrame without copying keeps the columns mapped
+    missileDF = pd.DataFrame(data, copy=False)
+    if offsets[-1] != len(missileDF):
+        return None
+    index = plf.TrajectoryIndex.fromOffsets(missileDF, meta['keys'],
+                                            offsets)
+    return missileDF, index
+
+
+def decodeColumn(codes: np.ndarray, categories: list,
+                 dtype: str) -> pd.Series:
+    """
+    Rebuilds a text column from its categorical codes, with the dtype it
+    had when stored. The decoded column is held in memory.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        The code of each row, -1 where the value was missing
+    categories : list
+        The value of each code
+    dtype : str
+        The dtype of the column when it was stored, e.g. 'str'
+
+    Returns
+    -------
+    pd.Series
+        The column (a Series, so pandas keeps an object dtype as it is
+        rather than inferring strings)
+
+    """
+    values = np.array(categories + [None], dtype=object)[codes]
+    return pd.Series(values, dtype=dtype)
+
+
+def pruneStores(storeDir: str, maxStores: int) -> None:
+    """
+    Deletes all but the most recently written stores. A store still
+    mapped by another instance may not be deletable; it is left for a
+    later prune.
+
+    Parameters
+    ----------
+    storeDir : str
+        The directory holding every store of a campaign
+    maxStores : int
+        The number of stores kept
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        stores = [entry.path for entry in os.scandir(storeDir)
+                  if entry.is_dir() and entry.name.startswith('store-')]
+    except OSError:
+        return
+    stores.sort(key=os.path.getmtime)
+    for oldStore in stores[:max(len(stores) - maxStores, 0)]:
+        shutil.rmtree(oldStore, ignore_errors=True)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-trajectory summary statistics.
+
+The summary is computed once when data is loaded, with one row per
+(RunNumber, Model, Instance): flight time, apogee, final miss distance,
+and the minimum range to any asset of the same run. Every statistic is
+a vectorized reduction over the rows of each trajectory, so thousands of
+runs can be triaged without plotting them.
+
+Summaries are saved to the load cache next to the data, keyed by the
+data version, so loading unchanged data again reads them back instead
+of computing them. They are stored as plain arrays (.npz, read without
+pickle), since the cache sits in a campaign directory others may write.
+"""
+
+# File Imports
+import data_input_objects as dio
+
+# Module-Level Imports
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+# The trajectory position columns, which hold ECEF coordinates
+# (See extra_functions.assetColMap)
+missileCols = ('Missile Position - East',
+               'Missile Position - North',
+               'Missile Position - Up')
+targetCols = ('Target Position - East',
+              'Target Position - North',
+              'Target Position - Up')
+
+# Bumped whenever summaries already saved may be wrong or laid out
+# differently; older files are then never read. Version 2 fixed the
+# minimum asset range, which merged identical assets of different runs
+summaryVersion = 2
+
+# The columns of the summary table, in display order
+summaryCols = ['RunNumber', 'Model', 'Instance', 'Points', 'Start Time',
+               'End Time', 'Flight Time', 'Apogee', 'Final Miss',
+               'Min Asset Range']
+
+
+def trajectorySummary(missileDF: pd.DataFrame, index,
+                      assetIndex=None) -> pd.DataFrame:
+    """
+    Computes the summary statistics of every trajectory.
+
+    Parameters
+    ----------
+    missileDF : pd.DataFrame
+        All of the loaded trajectory data
+    index : TrajectoryIndex
+        The trajectories of missileDF
+        (see plotting_functions.TrajectoryIndex)
+    assetIndex : AssetIndex, optional
+        The assets to measure ranges to
+        (see proximity_functions.AssetIndex). If None, the minimum
+        asset range is left empty. The default is None.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per trajectory, in the order of index.keys, with the
+        columns in summaryCols. Statistics that cannot be computed
+        from the loaded columns are NaN.
+
+    """
+    N = len(index)
+    keys = pd.MultiIndex.from_tuples(index.keys) if N > 0 else None
+    summary = pd.DataFrame({
+        'RunNumber': np.asarray(index.runs),
+        'Model': keys.get_level_values(1) if N > 0 else [],
+        'Instance': keys.get_level_values(2) if N > 0 else [],
+        'Points': np.diff(index.offsets), })
+    for col in summaryCols[4:]:
+        summary[col] = np.full(N, np.nan)
+    if N == 0:
+        return summary
+
+    order = index.order
+    starts = index.offsets[:-1]
+    lasts = order[index.offsets[1:] - 1]
+
+    def columns(cols):
+        return [missileDF[col].to_numpy(dtype='float64') for col in cols]
+
+    if 'Time' in missileDF.columns:
+        times = missileDF['Time'].to_numpy(dtype='float64')[order]
+        summary['Start Time'] = np.fmin.reduceat(times, starts)
+        summary['End Time'] = np.fmax.reduceat(times, starts)
+        summary['Flight Time'] = summary['End Time'] - summary['Start Time']
+
+    hasMissile = set(missileCols).issubset(missileDF.columns)
+    if hasMissile:
+        missile = columns(missileCols)
+        _, _, alts = dio.ecef2lla(*(values[order] for values in missile))
+        summary['Apogee'] = np.fmax.reduceat(np.asarray(alts), starts)
+
+    # The miss distance is taken at the last point of each trajectory
+    if hasMissile and set(targetCols).issubset(missileDF.columns):
+        target = columns(targetCols)
+        diffs = [m[lasts] - t[lasts] for m, t in zip(missile, target)]
+        summary['Final Miss'] = np.sqrt(sum(d ** 2 for d in diffs))
+
+    if hasMissile and assetIndex is not None and len(assetIndex) > 0:
+        ranges = assetIndex.closestApproach(missileDF, missileCols,
+                                            sameRun=True, index=index)
+        if len(ranges) > 0:
+            nearest = ranges.groupby(['RunNumber', 'Model', 'Instance'],
+                                     sort=False).Distance.min()
+            found = nearest.reindex(keys)
+            summary['Min Asset Range'] = found.to_numpy(dtype='float64')
+
+    return summary[summaryCols]
+
+
+def summaryPath(cacheDir: str, dataVersion: str) -> str:
+    """
+    The file a summary is stored in within the load cache.
+
+    Parameters
+    ----------
+    cacheDir : str
+        The load cache directory
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    str
+        The path of the summary file
+
+    """
+    fileName = f'summary-v{summaryVersion}-{dataVersion}.npz'
+    return os.path.join(cacheDir, fileName)
+
+
+def loadSummary(cacheDir: str, dataVersion: str, index) -> pd.DataFrame:
+    """
+    Reads a summary from the load cache.
+
+    Parameters
+    ----------
+    cacheDir : str
+        The load cache directory
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+    index : TrajectoryIndex
+        The trajectories the summary must describe
+
+    Returns
+    -------
+    pd.DataFrame
+        The cached summary, or None if there is none or it does not
+        match the trajectories
+
+    """
+    path = summaryPath(cacheDir, dataVersion)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if not set(summaryCols).issubset(data.files):
+                return None
+            summary = pd.DataFrame({col: data[col] for col in summaryCols})
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+    # A stale or damaged file is ignored rather than trusted
+    if list(summary.columns) != summaryCols or len(summary) != len(index):
+        return None
+    cachedKeys = list(zip(summary.RunNumber, summary.Model,
+                          summary.Instance))
+    if cachedKeys != [tuple(key) for key in index.keys]:
+        return None
+    return summary
+
+
+def saveSummary(summary: pd.DataFrame, cacheDir: str,
+                dataVersion: str) -> None:
+    """
+    Writes a summary to the load cache. Failing to write is not an
+    error; the summary is simply computed again next time.
+
+    Parameters
+    ----------
+    summary : pd.DataFrame
+        The summary (see trajectorySummary)
+    cacheDir : str
+        The load cache directory
+    dataVersion : str
+        Identifies the loaded data (see extra_functions.dataVersion)
+
+    Returns
+    -------
+    None
+
+    """
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        # Text columns are saved as fixed-width strings, not objects
+        columns = {col: (summary[col].to_numpy(dtype=str)
+                         if col in ('Model', 'Instance')
+                         else summary[col].to_numpy())
+                   for col in summaryCols}
+        np.savez(summaryPath(cacheDir, dataVersion), **columns)
+    except OSError:
+        return
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lightweight timing of the hot paths of loading and plotting.
+
+Code to be measured is wrapped in ``with tm.timer('load.parse'):``. Each
+pass adds one sample to the statistics of that operation (count, total,
+minimum, maximum, and last time), which the Diagnostics tab displays
+and which can be dumped to JSON. A timer costs two clock reads and a
+lock, so timers are always on.
+
+Operations are named '<stage>.<step>', e.g. 'load.walk' or 'plot.draw',
+so related operations sort together.
+"""
+
+# Module-Level Imports
+import datetime
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Timings():
+    def __init__(self) -> None:
+        """
+        Collects timing statistics per operation. Timers may be used from
+        any thread (e.g. the background renderer).
+
+        Returns
+        -------
+        None
+
+        """
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Times the code run inside the with-statement, even if it raises.
+
+        Parameters
+        ----------
+        name : str
+            The operation being timed
+
+        Yields
+        ------
+        None
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Adds a sample for an operation timed elsewhere.
+
+        Parameters
+        ----------
+        name : str
+            The operation
+        seconds : float
+            The time it took
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = [1, seconds, seconds, seconds, seconds]
+                return
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = min(stats[2], seconds)
+            stats[3] = max(stats[3], seconds)
+            stats[4] = seconds
+
+    def snapshot(self) -> dict:
+        """
+        The statistics of every operation so far.
+
+        Returns
+        -------
+        dict
+            A mapping of operation name (in sorted order) to a dict of
+            count, total, mean, min, max, and last, in seconds
+
+        """
+        with self._lock:
+            items = sorted((name, list(stats))
+                           for name, stats in self._stats.items())
+        return {name: {'count': count, 'total': total,
+                       'mean': total / count, 'min': min_, 'max': max_,
+                       'last': last}
+                for name, (count, total, min_, max_, last) in items}
+
+    def reset(self) -> None:
+        """
+        Forgets every sample.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._stats.clear()
+
+    def dump(self, outFile: str, extra: dict = None) -> None:
+        """
+        Writes the statistics to a JSON file.
+
+        Parameters
+        ----------
+        outFile : str
+            The path of the file to write
+        extra : dict, optional
+            Other diagnostics to store alongside the timings (e.g. the
+            plot scheduler statistics). The default is None.
+
+        Returns
+        -------
+        None
+
+        """
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        report = {'date': now, 'operations': self.snapshot()}
+        report.update(extra or {})
+        with open(outFile, 'w') as out:
+            json.dump(report, out, indent=4)
+
+
+# The timings shared by the whole application
+timings = Timings()
+timer = timings.timer
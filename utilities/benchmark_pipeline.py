@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Benchmarks for the load -> plot pipeline on synthetic campaigns.
+
+Campaigns of several sizes (number of runs) and trajectory lengths
+(points per shot) are generated once with output_file_generator and
+reused. Each stage of the pipeline is then timed on every campaign:
+finding the files, reading them, parsing the assets, the geodesy
+conversions, and rendering the figure off-screen the way the Viewer
+tab does. The start-up time of the GUI itself is measured in fresh
+interpreters, since imports are only slow the first time.
+
+Results are written to a JSON file so later runs can be compared
+against them, and a comparison flags any stage that slowed down.
+
+
+Example
+-------
+    A quick benchmark of small campaigns:
+
+        $ python benchmark_pipeline.py --runs 10 100 --points 50
+
+    The full grid, compared against an earlier result:
+
+        $ python benchmark_pipeline.py \\
+              --compare benchmark_results/baseline.json
+"""
+
+# Imports and settings for rendering off-screen
+# The backend must be chosen before the plotting code imports pyplot
+import matplotlib
+matplotlib.use("Agg")
+
+# Module-Level Imports
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# The GUI modules are imported from their own directory
+utilitiesDir = os.path.dirname(os.path.abspath(__file__))
+guiDir = os.path.join(utilitiesDir, os.pardir, 'basic_gui')
+sys.path.insert(0, guiDir)
+
+# File Imports
+import data_input_objects as dio  # noqa: E402
+import extra_functions as ef  # noqa: E402
+import output_file_generator as ofg  # noqa: E402
+import plotting_functions as plf  # noqa: E402
+
+# The trajectory shown in the timed render
+benchmarkSpec = plf.PlotSpec(xCol='Missile Position - East',
+                             yCol='Missile Position - North',
+                             zCol='Missile Position - Up')
+
+# Run in a fresh interpreter to time starting the GUI. The window can only
+# be built where there is a display; otherwise only the import is timed and
+# Tk's error is reported. Any other error fails the script.
+startupScript = '''
+import json
+import time
+import tkinter as tk
+start = time.perf_counter()
+import etesim_pp_gui
+times = {'startImport': time.perf_counter() - start}
+error = None
+try:
+    app = etesim_pp_gui.SimpleGUI()
+    app.update()
+    times['startWindow'] = time.perf_counter() - start
+    app.buildViewer()
+    app.update()
+    times['startViewer'] = time.perf_counter() - start
+    app.destroy()
+except tk.TclError as err:
+    error = f'TclError: {err}'
+print(json.dumps({'times': times, 'error': error}))
+'''
+
+
+def parseArgs(argv: list = None) -> argparse.Namespace:
+    """
+    Reads the command-line arguments.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The arguments to parse. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments
+
+    """
+    parser = argparse.ArgumentParser(
+                description='Time the load and plot pipeline on synthetic '
+                            'campaigns')
+
+    # Campaigns
+    parser.add_argument('--runs', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000],
+                        help='Number of runs in each campaign')
+    parser.add_argument('--points', type=int, nargs='+',
+                        default=[50, 500, 5000],
+                        help='Points per trajectory in each campaign')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed for generating the campaigns')
+    parser.add_argument('--format', choices=sorted(ofg.fileExtensions),
+                        default='xlsx', help='Missile file format')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of processes generating campaigns')
+    parser.add_argument('--work-dir',
+                        default=os.path.join(tempfile.gettempdir(),
+                                             'etesim_benchmark'),
+                        help='Directory the campaigns are generated in '
+                             '(and reused from)')
+    parser.add_argument('--template',
+                        default=os.path.join(guiDir,
+                                             'NotionalETEOutput000.xlsx'),
+                        help='Missile file the campaigns are made from')
+
+    # Timing
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Times each stage is run (the fastest counts)')
+    parser.add_argument('--no-render', action='store_true',
+                        help='Do not time rendering')
+    parser.add_argument('--no-startup', action='store_true',
+                        help='Do not time starting the GUI')
+
+    # Results
+    parser.add_argument('-o', '--out',
+                        default=os.path.join(utilitiesDir,
+                                             'benchmark_results'),
+                        help='Directory to write the results to')
+    parser.add_argument('--compare', default=None,
+                        help='Earlier results (JSON) to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.2,
+                        help='Slowdown ratio reported as a regression')
+
+    return parser.parse_args(argv)
+
+
+def campaign(workDir: str, template: str, runs: int, points: int,
+             seed: int, fmt: str = 'xlsx', workers: int = None) -> str:
+    """
+    Generates a campaign of runs, unless it was generated before.
+
+    Parameters
+    ----------
+    workDir : str
+        The directory campaigns are generated in
+    template : str
+        The path of the template missile file
+    runs : int
+        The number of runs
+    points : int
+        The number of points per trajectory
+    seed : int
+        The seed for the random numbers used to generate the runs
+    fmt : str, optional
+        The missile file format (see output_file_generator).
+        The default is 'xlsx'.
+    workers : int, optional
+        The number of processes generating runs. If None, the
+        ProcessPoolExecutor default is used. The default is None.
+
+    Returns
+    -------
+    str
+        The directory of the campaign
+
+    """
+    outDir = os.path.join(workDir,
+                          f'runs{runs}_points{points}_seed{seed}_{fmt}')
+    doneFile = os.path.join(outDir, '.complete')
+    if os.path.isfile(doneFile):
+        return outDir
+
+    os.makedirs(outDir, exist_ok=True)
+    ofg.generateMissileOutput(outDir, template, dirnums=np.arange(runs),
+                              points=points, fmt=fmt, seed=seed,
+                              workers=workers, assets=True)
+
+    # An interrupted campaign is generated again next time
+    open(doneFile, 'w').close()
+    return outDir
+
+
+def timeit(func, repeat: int) -> tuple:
+    """
+    Times a function.
+
+    Parameters
+    ----------
+    func : function
+        The function to time, called without arguments
+    repeat : int
+        The number of times to call it
+
+    Returns
+    -------
+    tuple
+        (result, times), the result of the last call and the time of
+        each call in seconds
+
+    """
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def renderFigure(missileDF: pd.DataFrame, assets: pd.DataFrame) -> None:
+    """
+    Renders the benchmark plot off-screen, the same work the Viewer tab
+    does in finishMatPlot before the figure is shown.
+
+    Parameters
+    ----------
+    missileDF : pd.DataFrame
+        All of the loaded trajectory data
+    assets : pd.DataFrame
+        The asset DataFrame (see extra_functions.assetsDF)
+
+    Returns
+    -------
+    None
+
+    """
+    figure, _ = plf.plotFigure(missileDF, assets, benchmarkSpec,
+                               figsize=(8, 6))
+    figure.canvas.draw()
+
+
+def benchmarkCampaign(topDir: str, repeat: int, render: bool = True) -> dict:
+    """
+    Times every stage of the pipeline on one campaign.
+
+    Parameters
+    ----------
+    topDir : str
+        The directory of the campaign
+    repeat : int
+        The number of times each stage is run
+    render : bool, optional
+        Whether to time rendering. The default is True.
+
+    Returns
+    -------
+    dict
+        A mapping of stage name to the time of each call in seconds
+
+    """
+    timings = {}
+
+    def stage(name, func):
+        result, timings[name] = timeit(func, repeat)
+        return result
+
+    tree = stage('dirTree', lambda: ef.dirTree(topDir))
+    files = stage('allMissileFiles', lambda: ef.allMissileFiles(tree))
+    stage('combinedMissleDF', lambda: ef.combinedMissleDF(files))
+    missileDF = stage('loadMissileData', lambda: ef.loadMissileData(files))
+    stage('TrajectoryIndex', lambda: plf.TrajectoryIndex(missileDF))
+    table = stage('allAssets', lambda: ef.allAssets(tree))
+    assets = stage('assetsDF', lambda: ef.assetsDF(table))
+
+    # Geodesy over every missile position
+    xyz = [missileDF[col].to_numpy(dtype='float64') for col in
+           ('Missile Position - East', 'Missile Position - North',
+            'Missile Position - Up')]
+    lla = stage('ecef2lla', lambda: dio.ecef2lla(*xyz))
+    stage('lla2ecef', lambda: dio.lla2ecef(*lla))
+
+    if render:
+        stage('render', lambda: renderFigure(missileDF, assets))
+    return timings
+
+
+def coldStart(repeat: int) -> tuple:
+    """
+    Times starting the GUI, each time in a new Python process so nothing
+    has been imported yet: importing it (startImport), showing the window
+    on the Data Input tab (startWindow), and building the Viewer tab
+    (startViewer). Each time is measured from the start of the import.
+
+    Parameters
+    ----------
+    repeat : int
+        The number of times to start the GUI
+
+    Returns
+    -------
+    timings : dict
+        A mapping of stage name to the time of each start in seconds.
+        Stages that could not be run (e.g. without a display) are left
+        out.
+    error : str
+        Why starting the GUI stopped early (no display, or the GUI
+        failing to start), or None if every stage was timed
+
+    """
+    timings = {}
+    for _ in range(max(repeat, 1)):
+        try:
+            process = subprocess.run([sys.executable, '-c', startupScript],
+                                     cwd=guiDir, capture_output=True,
+                                     text=True)
+        except OSError as err:
+            return timings, str(err)
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            return timings, lines[-1] if lines else (
+                            f'exit status {process.returncode}')
+        try:
+            output = json.loads(process.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            return timings, 'No timings were reported'
+        for stage, seconds in output['times'].items():
+            timings.setdefault(stage, []).append(seconds)
+        if output['error'] is not None:
+            return timings, output['error']
+    return timings, None
+
+
+def environment() -> dict:
+    """
+    Describes the machine and code being benchmarked, so results from
+    different machines are not mistaken for regressions.
+
+    Returns
+    -------
+    dict
+        The platform, library versions, and git commit
+
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=utilitiesDir, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'machine': platform.node(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__, }
+
+
+def compare(results: list, baseline: list, tolerance: float,
+            floor: float = 1e-3) -> list:
+    """
+    Compares results against an earlier set.
+
+    Parameters
+    ----------
+    results : list
+        The results of this benchmark (see main)
+    baseline : list
+        The results to compare against
+    tolerance : float
+        The slowdown ratio above which a stage has regressed
+    floor : float, optional
+        Slowdowns smaller than this many seconds are treated as timing
+        noise. The default is 1e-3.
+
+    Returns
+    -------
+    list
+        Rows of (stage, runs, points, baseline time, time, ratio,
+        regressed) for every stage found in both sets
+
+    """
+    def key(result):
+        return (result['stage'], result['runs'], result['points'],
+                result.get('format', 'xlsx'))
+
+    earlier = {key(result): result['min'] for result in baseline}
+    rows = []
+    for result in results:
+        if key(result) not in earlier:
+            continue
+        before, after = earlier[key(result)], result['min']
+        ratio = after / before if before > 0 else float('inf')
+        regressed = ratio > tolerance and after - before > floor
+        rows.append(key(result)[:3] + (before, after, ratio, regressed))
+    return rows
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs every benchmark and saves the results.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command-line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    int
+        The exit code (1 if a stage regressed against --compare)
+
+    """
+    args = parseArgs(argv)
+    if not os.path.isfile(args.template):
+        print(f'{args.template} is not a valid file', file=sys.stderr)
+        return 1
+
+    baseline = None
+    if args.compare is not None:
+        try:
+            with open(args.compare, 'r') as in_:
+                baseline = json.load(in_)['results']
+        except (OSError, ValueError, KeyError) as err:
+            print(f'Could not read {args.compare}: {err}', file=sys.stderr)
+            return 1
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = []
+
+    # Starting the GUI does not depend on the campaign. A start that
+    # stopped early is recorded with the results, so its times are never
+    # mistaken for a fast start
+    startupError = None
+    if not args.no_startup:
+        print('Starting the GUI')
+        startTimes, startupError = coldStart(args.repeat)
+        if startupError is not None:
+            print(f'  stopped early: {startupError}')
+        for stage, times in startTimes.items():
+            results.append({'stage': stage, 'runs': 0, 'points': 0,
+                            'format': None, 'min': min(times),
+                            'median': float(np.median(times)),
+                            'times': times, })
+            print(f'  {stage:<18}{min(times):>10.4f}s')
+
+    for points in args.points:
+        for runs in args.runs:
+            print(f'Campaign of {runs} runs, {points} points per shot')
+            startTime = time.time()
+            topDir = campaign(args.work_dir, args.template, runs, points,
+                              args.seed, args.format, args.workers)
+            print(f'  ready in {time.time() - startTime:.1f}s')
+
+            timings = benchmarkCampaign(topDir, args.repeat,
+                                        render=not args.no_render)
+            for stage, times in timings.items():
+                results.append({'stage': stage, 'runs': runs,
+                                'points': points, 'format': args.format,
+                                'min': min(times),
+                                'median': float(np.median(times)),
+                                'times': times, })
+                print(f'  {stage:<18}{min(times):>10.4f}s')
+
+    # Results are named so they sort by date
+    env = environment()
+    os.makedirs(args.out, exist_ok=True)
+    stamp = env['date'].replace(':', '')
+    outFile = os.path.join(args.out,
+                           f'{stamp}_{env["commit"] or "unknown"}.json')
+    with open(outFile, 'w') as out:
+        json.dump({'environment': env, 'startupError': startupError,
+                   'results': results}, out, indent=4)
+    print(f'Results written to {outFile}')
+
+    if baseline is None:
+        return 0
+
+    rows = compare(results, baseline, args.tolerance)
+    print(f'\n{"Stage":<18}{"Runs":>7}{"Points":>8}'
+          f'{"Before":>10}{"After":>10}{"Ratio":>8}')
+    for stage, runs, points, before, after, ratio, regressed in rows:
+        flag = '  SLOWER' if regressed else ''
+        print(f'{stage:<18}{runs:>7}{points:>8}'
+              f'{before:>10.4f}{after:>10.4f}{ratio:>8.2f}{flag}')
+    return int(any(row[-1] for row in rows))
+
+
+# To prevent this running automatically if imported
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,52 @@
 # -*- coding: utf-8 -*-
 
+"""
+
+Synthetic campaign generator.
+
+Fabricates run directories, each with a missile file holding one or
+more shots and an assets file. Shots are either copies of a template
+missile file with a little noise added, or synthesized boost/ballistic
+trajectories whose duration and sample rate vary from shot to shot
+(see ballisticDF). Every shot of a run is built at once, and runs are
+written concurrently across processes.
+
+Every run draws from its own random stream, derived from a master seed
+and the run number (see runGenerators). Given a seed, a run is the same
+no matter how many processes write the campaign, which other runs are
+generated with it, or which machine it is generated on.
+CSV and Parquet files are then byte-identical; Excel files hold the same
+data but record the time they were written.
+
+
+Example
+-------
+    1000 runs of 1 to 8 template shots, 500 points per shot, as CSV:
+
+        $ python output_file_generator.py ../campaign --runs 1000 \\
+              --shots 1 8 --points 500 --format csv --seed 1
+
+    100 runs of ballistic shots flying 2 to 10 minutes, sampled at
+    1 to 50 Hz:
+
+        $ python output_file_generator.py ../campaign --runs 100 \\
+              --model ballistic --duration 120 600 --rate 1 50
+"""
+
+import argparse
 import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 
+# The geodesy functions are shared with the GUI
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, 'basic_gui'))
+import data_input_objects as dio  # noqa: E402
+
 # These polynomials may be used to generate the lat/lon values necessary
 # to produce a value x kilometers away from an object
 polylat = np.array([9.00818164e-03, 9.90032277e-06])
@@ -18,15 +60,49 @@ default_ecef = np.array([1116578.706, 4841123.275, 3985227.184])
 default_lla = np.array([38.92261772, 77.0121658, -652.68192316])
 
 
+def runGenerators(seed, dirNum: int) -> tuple:
+    """
+    The random streams of a single run.
+
+    The run's SeedSequence is the child of the master SeedSequence whose
+    spawn key is the run number, so it is independent of every other
+    run and does not depend on the order runs are generated in. It is
+    spawned again into separate streams for the missiles and the assets,
+    so the assets are the same whether or not they are generated along
+    with the missiles.
+
+    Parameters
+    ----------
+    seed : int or np.random.SeedSequence
+        The master seed. If None, fresh entropy is used.
+    dirNum : int
+        The run number
+
+    Returns
+    -------
+    tuple
+        (missileRNG, assetRNG), each an np.random.Generator
+
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    runSeed = np.random.SeedSequence(seed.entropy,
+                                     spawn_key=seed.spawn_key + (dirNum,))
+    return tuple(np.random.default_rng(s) for s in runSeed.spawn(2))
+
+
 def randomAsset(run_number,
                 baseLLA=np.array([38.92261772, 77.0121658, -652.68192316]),
-                kmdiff=1, move=True, position='random'):
+                kmdiff=1, move=True, position='random', rng=None):
+
+    if rng is None:
+        rng = np.random.default_rng()
 
     lat, lon, alt = baseLLA
     if move:
         if position == 'random':
-            position = np.random.choice(['none', 'north', 'south',
-                                         'east', 'west'])
+            position = rng.choice(['none', 'north', 'south',
+                                   'east', 'west'])
         if position == 'north':
             lat += (kmdiff * km_lat)
         elif position == 'south':
@@ -41,16 +117,16 @@ def randomAsset(run_number,
     names = {'Radar': ['NICK', 'Sentinel', 'Patriot'],
              'Launcher': ['Launcher'], }
 
-    category = np.random.choice(categories)
-    name = np.random.choice(names[category])
+    category = str(rng.choice(categories))
+    name = str(rng.choice(names[category]))
 
-    id_ = np.random.randint(1000, 10000)
+    id_ = int(rng.integers(1000, 10000))
 
     return (category, name, id_, run_number, (lat, lon, alt))
 
 
-def makeAssets(numAssets, run_number):
-    return (randomAsset(run_number) for _ in range(numAssets))
+def makeAssets(numAssets, run_number, rng=None):
+    return (randomAsset(run_number, rng=rng) for _ in range(numAssets))
 
 
 def writeAssets(outFile, assetList):
@@ -86,88 +162,537 @@ def stringAsset(category, name, uniqueID, run, *,
     return asset
 
 
-def main():
-    d1 = os.path.abspath(os.path.join(os.path.split(sys.argv[0])[0],
-                                      os.pardir, '100runs'))
-    d2 = os.path.abspath(os.path.join(os.path.split(sys.argv[0])[0],
-                                      os.pardir, 'runs'))
-    file1 = os.path.abspath(os.path.join(os.path.split(sys.argv[0])[0],
-                                         os.pardir, 'basic_gui',
-                                         'NotionalETEOutput000.xlsx'))
-    file2 = os.path.abspath(os.path.join(os.path.split(sys.argv[0])[0],
-                                         os.pardir, 'basic_gui',
-                                         'notionalasset.txt'))
-    generateMissileOutput(d2, file1,)
-    generateAssetOutput(d2, file2,)
+# The missile types substituted for the template's
+missileTypes = ['BRAVER', 'SOMERSAULT', 'HIGHWIND', 'HELLMASKER']
+
+# The substitutions made to the template's metadata for each shot
+metaPatterns = {'datatype': [(r'SAMP\d', '{mtype}')],
+                'datarec_id': [(r'SAMP\d_\d', '{mtype}_{id}'),
+                               (r'SAMP\d\.\d', '{mtype}_{id}')],
+                'header_swmodel': [(r'SAMP\d', '{mtype}')], }
+
+# The file written for each output format
+fileExtensions = {'xlsx': 'xlsx', 'csv': 'csv', 'parquet': 'parquet'}
+
+# Acceleration due to gravity, in m/s^2
+gravity = 9.80665
+
+
+def parseArgs(argv: list = None) -> argparse.Namespace:
+    """
+    Reads the command-line arguments.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The arguments to parse. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments
+
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(
+                description='Generate a synthetic campaign of runs')
+
+    parser.add_argument('outDir', nargs='?',
+                        default=os.path.join(here, os.pardir, 'runs'),
+                        help='Directory to write the runs to')
+    parser.add_argument('--template',
+                        default=os.path.join(here, os.pardir, 'basic_gui',
+                                             'NotionalETEOutput000.xlsx'),
+                        help='Missile file the shots are made from')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='Number of runs to generate')
+    parser.add_argument('--first-run', type=int, default=0,
+                        help='Number of the first run')
+    parser.add_argument('--shots', type=int, nargs=2, default=(1, 4),
+                        metavar=('MIN', 'MAX'),
+                        help='Range of shots per run (inclusive)')
+    parser.add_argument('--model', choices=['ballistic', 'template'],
+                        default='ballistic',
+                        help='Synthesize trajectories or copy the template')
+    parser.add_argument('--points', type=int, default=None,
+                        help='Points per template shot (the template\'s '
+                             'if not given)')
+    parser.add_argument('--duration', type=float, nargs=2, default=(60, 300),
+                        metavar=('MIN', 'MAX'),
+                        help='Range of ballistic flight times in seconds')
+    parser.add_argument('--rate', type=float, nargs=2, default=(1, 10),
+                        metavar=('MIN', 'MAX'),
+                        help='Range of ballistic sample rates in Hz')
+    parser.add_argument('--format', choices=sorted(fileExtensions),
+                        default='xlsx', help='Missile file format')
+    parser.add_argument('--no-assets', action='store_true',
+                        help='Do not write asset files')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for a reproducible campaign')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of processes writing runs')
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    """
+    Generates the campaign described by the command-line arguments.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command-line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    int
+        The exit code
+
+    """
+    args = parseArgs(argv)
+    if not os.path.isfile(args.template):
+        print(f'{args.template} is not a valid file', file=sys.stderr)
+        return 1
+    if args.runs < 1 or not 1 <= args.shots[0] <= args.shots[1]:
+        print('Need at least one run and 1 <= MIN <= MAX shots',
+              file=sys.stderr)
+        return 1
+    if not (0 < args.duration[0] <= args.duration[1] and
+            0 < args.rate[0] <= args.rate[1]):
+        print('Durations and rates need 0 < MIN <= MAX', file=sys.stderr)
+        return 1
+
+    startTime = time.time()
+    dirnums = np.arange(args.first_run, args.first_run + args.runs)
+    try:
+        written = generateMissileOutput(args.outDir, args.template,
+                                        dirnums=dirnums,
+                                        shots=tuple(args.shots),
+                                        points=args.points,
+                                        model=args.model,
+                                        duration=tuple(args.duration),
+                                        rate=tuple(args.rate),
+                                        fmt=args.format, seed=args.seed,
+                                        workers=args.workers,
+                                        assets=not args.no_assets)
+    except ImportError as err:
+        # Parquet needs an engine (pyarrow or fastparquet) installed
+        print(f'Cannot write {args.format} files: {err}', file=sys.stderr)
+        return 1
+
+    N = len(written)
+    totalTime = time.time() - startTime
+    print(f'Generated {N} run' + 's' * (N != 1) + f' in {totalTime:.1f}s')
+    return 0
 
 
 def generateAssetOutput(outDir, assetFile,
-                        dirnums=np.array([954, 971, 708, 443, 947])):
+                        dirnums=np.array([954, 971, 708, 443, 947]),
+                        seed=None):
 
+    master = np.random.SeedSequence(seed)
     for k, dirNum in enumerate(dirnums):
-        numAssets = np.random.randint(1, 5)
+        _, rng = runGenerators(master, int(dirNum))
+        numAssets = rng.integers(1, 5)
         newdir = os.path.join(outDir, f'run{dirNum:03d}')
         newFile = os.path.join(newdir, 'assets.txt')
-        newAssets = makeAssets(numAssets, dirNum)
+        newAssets = makeAssets(numAssets, dirNum, rng=rng)
         writeAssets(newFile, newAssets)
 
     return
 
 
-def generateMissileOutput(outDir, missileFile,
-                          dirnums=np.array([954, 971, 708, 443, 947])):
-    mtypes = ['BRAVER', 'SOMERSAULT', 'HIGHWIND', 'HELLMASKER']
+def generateMissileOutput(outDir: str, missileFile: str,
+                          dirnums=np.array([954, 971, 708, 443, 947]),
+                          shots: tuple = (1, 4), points: int = None,
+                          model: str = 'template',
+                          duration: tuple = (60, 300),
+                          rate: tuple = (1, 10),
+                          fmt: str = 'xlsx', seed: int = None,
+                          workers: int = None, assets: bool = False) -> list:
+    """
+    Writes a missile file (and optionally an assets file) for each run.
+
+    Parameters
+    ----------
+    outDir : str
+        The directory the run directories are made in
+    missileFile : str
+        The template missile file. Synthesized shots take their
+        metadata from its first row.
+    dirnums : np.ndarray, optional
+        The run numbers to generate.
+        The default is np.array([954, 971, 708, 443, 947]).
+    shots : tuple, optional
+        The (min, max) number of shots per run, inclusive.
+        The default is (1, 4).
+    points : int, optional
+        The number of points per template shot. If None, the template
+        is used as it is. The default is None.
+    model : str, optional
+        'template' copies the template for each shot; 'ballistic'
+        synthesizes each shot (see ballisticDF).
+        The default is 'template'.
+    duration : tuple, optional
+        The (min, max) flight time of ballistic shots, in seconds.
+        The default is (60, 300).
+    rate : tuple, optional
+        The (min, max) sample rate of ballistic shots, in Hz.
+        The default is (1, 10).
+    fmt : str, optional
+        The missile file format (see fileExtensions).
+        The default is 'xlsx'.
+    seed : int, optional
+        The master seed each run's random streams are derived from
+        (see runGenerators). If None, fresh entropy is used.
+        The default is None.
+    workers : int, optional
+        The maximum number of processes writing runs. If None, the
+        ProcessPoolExecutor default is used. The default is None.
+    assets : bool, optional
+        Whether to write an assets file for each run.
+        The default is False.
+
+    Returns
+    -------
+    list
+        The path of each missile file written
+
+    """
     df = pd.read_excel(missileFile)
+    if points is not None:
+        df = resampleTemplate(df, points)
+
+    master = np.random.SeedSequence(seed)
+    motion = (model, duration, rate)
+    jobs = [(outDir, int(dirNum), df, shots, motion, fmt, master, assets)
+            for dirNum in dirnums]
+    if len(jobs) > 1 and workers != 1:
+        chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count())))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(generateRun, jobs, chunksize=chunksize))
+    return [generateRun(job) for job in jobs]
+
+
+def generateRun(job: tuple) -> str:
+    """
+    Writes the files of a single run. Runs in a worker process.
+
+    Parameters
+    ----------
+    job : tuple
+        (outDir, dirNum, template, shots, (model, duration, rate), fmt,
+        master, assets), where master is the master SeedSequence
+        (see generateMissileOutput)
+
+    Returns
+    -------
+    str
+        The path of the missile file written
+
+    """
+    outDir, dirNum, df, shots, motion, fmt, master, assets = job
+    model, duration, rate = motion
+    missileRNG, assetRNG = runGenerators(master, dirNum)
+
+    # Making directory for files and filename for new file
+    newdir = os.path.join(outDir, f'run{dirNum:03}')
+    newfile = os.path.join(newdir, f'NotionalETEOutput{dirNum:03}.'
+                                   f'{fileExtensions[fmt]}')
+    rcspath = os.path.join(newdir, 'rcs')
+    os.makedirs(rcspath, exist_ok=True)
+
     floatcols = [x for x in df.columns if df[x].dtype == 'float64']
     notTime = [x for x in floatcols if x != 'time']
+    numShots = missileRNG.integers(shots[0], shots[1] + 1)
+    if model == 'ballistic':
+        shotsDF = ballisticDF(df, missileTypes, dirNum, numShots,
+                              duration=duration, rate=rate, rng=missileRNG)
+    else:
+        shotsDF = dummyDF(df, missileTypes, dirNum, notTime, numShots,
+                          rng=missileRNG)
+    writeTable(shotsDF, newfile, fmt)
+
+    # Matches generateAssetOutput for the same seed
+    if assets:
+        numAssets = assetRNG.integers(1, 5)
+        writeAssets(os.path.join(newdir, 'assets.txt'),
+                    makeAssets(numAssets, dirNum, rng=assetRNG))
+    return newfile
+
+
+def writeTable(df: pd.DataFrame, outFile: str, fmt: str) -> None:
+    """
+    Writes a missile file in the given format.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The missile data
+    outFile : str
+        The path of the file to write
+    fmt : str
+        One of fileExtensions
+
+    Returns
+    -------
+    None
+
+    """
+    if fmt == 'csv':
+        df.to_csv(outFile, index=False)
+    elif fmt == 'parquet':
+        df.to_parquet(outFile, index=False)
+    else:
+        df.to_excel(outFile, index=False)
+
+
+def resampleTemplate(df: pd.DataFrame, points: int) -> pd.DataFrame:
+    """
+    Changes the number of points in the template, interpolating over
+    the same span of time.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The template missile data
+    points : int
+        The number of rows wanted
+
+    Returns
+    -------
+    pd.DataFrame
+        The resampled template
+
+    """
+    times = df.time.to_numpy(dtype='float64')
+    newTimes = np.linspace(times.min(), times.max(), points)
+
+    # Metadata is the same on every row, so the first row is repeated
+    newDF = df.iloc[np.zeros(points, dtype=int)].reset_index(drop=True)
+    for col in df.columns:
+        if df[col].dtype == 'float64':
+            newDF[col] = np.interp(newTimes, times, df[col].to_numpy())
+    return newDF
+
+
+def dummyDF(df, mtypes, dirNum, notTime, numShots=1, rng=None):
+    """
+    Builds every shot of a run from the template at once.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The template missile data
+    mtypes : list
+        The missile types to choose from for each shot
+    dirNum : int
+        The run number
+    notTime : list
+        The float columns to add noise to
+    numShots : int, optional
+        The number of shots. The default is 1.
+    rng : np.random.Generator, optional
+        The random stream of the run. If None, fresh entropy is used.
+        The default is None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows of every shot, one shot after another
+
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = len(df)
+    shot = np.repeat(np.arange(numShots), n)
+
+    # Missile type and instance for each shot
+    mtype = rng.choice(mtypes, numShots)
+    myID = rng.integers(0, 500, numShots)
+
+    df2 = pd.DataFrame({col: np.tile(df[col].to_numpy(), numShots)
+                        for col in df.columns})
+
+    # Replacing missile metadata in the columns. Only the distinct
+    # values of the template are substituted, once per shot
+    for col, patterns in metaPatterns.items():
+        if col not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[col])
+        table = np.array([[substitute(u, patterns, m, i) for u in uniques]
+                          for m, i in zip(mtype, myID)], dtype=object)
+        df2[col] = table[shot, np.tile(codes, numShots)]
 
-    # dirnums = np.array([954, 971, 708, 443, 947])
-    # dirnums = np.arange(100)
-    numShots = np.random.randint(1, 5, len(dirnums))
-
-    for k, dirNum in enumerate(dirnums):
-
-        # Making directory for files and filename for new file
-        newdir = os.path.join(outDir, f'run{dirNum:03}')
-        newfile = os.path.join(newdir, f'NotionalETEOutput{dirNum:03}.xlsx')
-        rcspath = os.path.join(newdir, 'rcs')
-        os.makedirs(rcspath, exist_ok=True)
+    # Adds "noise" to each output file so it is familiar with
+    # the original but will not match exactly. Every column of every
+    # shot is scaled by its own factor
+    r = rng.normal(loc=1, scale=0.000001, size=(numShots, len(notTime)))
+    noisy = df[notTime].to_numpy()[np.newaxis, :, :] * r[:, np.newaxis, :]
+    df2[notTime] = noisy.reshape(numShots * n, len(notTime))
+    df2['uniqueid'] = dirNum
 
-        df2 = pd.concat((dummyDF(df, mtypes, dirNum, notTime)
-                         for _ in range(numShots[k])))
+    return df2
 
-        df2.to_excel(newfile, index=False)
 
+def ballisticDF(df, mtypes, dirNum, numShots=1, duration=(60, 300),
+                rate=(1, 10), rng=None, baseLLA=default_lla):
+    """
+    Synthesizes every shot of a run at once.
+
+    Each shot's missile launches within a few kilometers of the base
+    location on a random heading and elevation, accelerates for a boost
+    phase, and then coasts ballistically (flat Earth, no drag). Its
+    thrust is chosen so the missile would land somewhat after the
+    shot's flight time, so it is still in the air when the shot ends.
+    The target flies in from the opposite direction on a descending
+    ballistic path that passes within a few tens of meters of the
+    missile's final position.
+
+    Flight times and sample rates are drawn per shot from the given
+    ranges, so shots differ in length. Positions are written in ECEF
+    like the template.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The template missile data, whose first row supplies the columns
+        and metadata
+    mtypes : list
+        The missile types to choose from for each shot
+    dirNum : int
+        The run number
+    numShots : int, optional
+        The number of shots. The default is 1.
+    duration : tuple, optional
+        The (min, max) flight time, in seconds. The default is (60, 300).
+    rate : tuple, optional
+        The (min, max) sample rate, in Hz. The default is (1, 10).
+    rng : np.random.Generator, optional
+        The random stream of the run. If None, fresh entropy is used.
+        The default is None.
+    baseLLA : np.ndarray, optional
+        The latitude, longitude, and altitude shots launch around.
+        The default is default_lla.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows of every shot, one shot after another
+
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Per-shot parameters
+    T = rng.uniform(*duration, numShots)
+    hz = rng.uniform(*rate, numShots)
+    launchTime = rng.uniform(0, 60, numShots)
+    mtype = rng.choice(mtypes, numShots)
+    myID = rng.integers(0, 500, numShots)
+    heading = rng.uniform(0, 2 * np.pi, numShots)
+    elevation = np.radians(rng.uniform(30, 75, numShots))
+    launchEN = rng.uniform(-5000, 5000, (numShots, 2))
+    burnTime = T * rng.uniform(0.1, 0.25, numShots)
+    overshoot = rng.uniform(1.1, 1.6, numShots)
+    miss = rng.normal(0, 20, (numShots, 3))
+    targetSpeed = rng.uniform(200, 800, numShots)
+    targetClimb = -rng.uniform(50, 300, numShots)
+
+    # Thrust acceleration landing the missile at overshoot * T
+    coast = overshoot * T - burnTime
+    sinEl = np.sin(elevation)
+    thrust = 0.5 * gravity * coast ** 2 / (
+                sinEl * (0.5 * burnTime ** 2 + burnTime * coast))
+
+    # Every sample of every shot, flattened
+    counts = np.floor(T * hz).astype(int) + 1
+    shot = np.repeat(np.arange(numShots), counts)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    t = (np.arange(counts.sum()) - starts[shot]) / hz[shot]
+
+    # Distance along the launch direction and height
+    tb, a, el = burnTime[shot], thrust[shot], elevation[shot]
+    boosting = t < tb
+    tau = np.where(boosting, 0, t - tb)
+    boostDist = 0.5 * a * np.minimum(t, tb) ** 2
+    burnout = a * tb
+    along = boostDist + burnout * tau
+    up = along * np.sin(el) - 0.5 * gravity * tau ** 2
+    ground = along * np.cos(el)
+    east = launchEN[shot, 0] + ground * np.sin(heading[shot])
+    north = launchEN[shot, 1] + ground * np.cos(heading[shot])
+    missile = np.stack([east, north, up])
+
+    # The target meets the missile's final position (plus a miss) at T
+    last = starts + counts - 1
+    meet = missile[:, last].T + miss
+    dt = t - T[shot]
+    v = targetSpeed[shot]
+    target = np.stack([
+        meet[shot, 0] - v * np.sin(heading[shot]) * dt,
+        meet[shot, 1] - v * np.cos(heading[shot]) * dt,
+        np.maximum(meet[shot, 2] + targetClimb[shot] * dt
+                   - 0.5 * gravity * dt ** 2, 0)])
+
+    # Local East/North/Up to ECEF around the base location
+    lat, lon, alt = baseLLA
+    rotation = np.asarray(dio.enu2ecefMatrix(lat, lon))
+    origin = np.asarray(dio.lla2ecef(lat, lon, alt))[:, np.newaxis]
+    missile = rotation @ missile + origin
+    target = rotation @ target + origin
+
+    # The template supplies the metadata and the order of the columns
+    first = df.iloc[0]
+    df2 = pd.DataFrame({col: np.repeat(first[col], len(t))
+                        for col in df.columns})
+    for col, patterns in metaPatterns.items():
+        if col in df.columns:
+            values = [substitute(first[col], patterns, m, i)
+                      for m, i in zip(mtype, myID)]
+            df2[col] = np.asarray(values, dtype=object)[shot]
+
+    positions = {'mEast': missile[0], 'mNorth': missile[1],
+                 'mUp': missile[2], 'tEast': target[0],
+                 'tNorth': target[1], 'tUp': target[2],
+                 'time': launchTime[shot] + t, }
+    for col, values in positions.items():
+        df2[col] = values
+    df2['uniqueid'] = dirNum
 
-def dummyDF(df, mtypes, dirNum, notTime):
-    # Generating temporary DataFrame
-    df2 = df.copy(deep=True)
+    return df2
 
-    # Missile type to substitute
-    mtype = np.random.choice(mtypes)
 
-    # Instance for mtype
-    myID = np.random.randint(0, 500)
+def substitute(value: str, patterns: list, mtype: str, myID: int) -> str:
+    """
+    Applies the metadata substitutions for one shot to a template value.
 
-    # Replacing missile metadata in the columns
-    df2.datatype.replace('SAMP\d',f'{mtype}',
-                         regex=True, inplace=True)
-    df2.datarec_id.replace('SAMP\d_\d',f'{mtype}_{myID}',
-                           regex=True, inplace=True)
-    df2.datarec_id.replace('SAMP\d\.\d',f'{mtype}_{myID}',
-                           regex=True, inplace=True)
-    df2.header_swmodel.replace('SAMP\d', f'{mtype}',
-                               regex=True, inplace=True)
+    Parameters
+    ----------
+    value : str
+        The template value
+    patterns : list
+        Pairs of (regex, replacement) (see metaPatterns)
+    mtype : str
+        The missile type of the shot
+    myID : int
+        The instance of the shot
 
-    # Adds "noise" to each output file so it is familiar with
-    # the original but will not match exactly
-    for col in notTime:
-        r = np.random.normal(loc=1, scale=0.000001)
-        df2[col] = df[col] * r
-    df2.uniqueid = dirNum
+    Returns
+    -------
+    str
+        The value for the shot
 
-    return df2
+    """
+    for regex, replacement in patterns:
+        value = re.sub(regex, replacement.format(mtype=mtype, id=myID),
+                       value)
+    return value
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())